@@ -153,6 +153,31 @@ class ActionError(Exception):
         return "Action error: %s" % self.message
 
 
+class IndexedAttribute(object):  # pylint: disable=too-few-public-methods
+    """Data descriptor used for the action attributes that the scheduler indexes on
+
+    The value is stored in the instance dictionary, exactly as a plain attribute would be,
+    but the scheduler index the action is attached to (if any) is told about each change.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+    def __set__(self, obj, value):
+        old_value = obj.__dict__.get(self.name)
+        obj.__dict__[self.name] = value
+        index = obj.__dict__.get('_index')
+        if index is not None and old_value != value:
+            index.action_changed(obj, self.name, old_value)
+
+
 class ActionBase(AlignakObject):
     # pylint: disable=too-many-instance-attributes
     """
@@ -167,6 +192,10 @@ class ActionBase(AlignakObject):
     """
     process = None
 
+    # The status and the launch time are indexed by the scheduler (see ActionQueue)
+    status = IndexedAttribute('status')
+    t_to_go = IndexedAttribute('t_to_go')
+
     properties = {
         'is_a':
             StringProp(default=u''),
@@ -371,6 +400,31 @@ class ActionBase(AlignakObject):
                 if self.perf_data:
                     logger.info("Performance data for '%s': %s", self.command, self.perf_data)
 
+    def read_output(self, stream):
+        """Read the data available on one of the process output streams.
+        Used by the event driven workers when the stream is ready for reading.
+
+        :param stream: process stdout or stderr
+        :type stream: file
+        :return: False if the stream reached its end, else True
+        :rtype: bool
+        """
+        data = no_block_read(stream)
+        if data is None:
+            # Nothing available currently
+            return True
+        if not data:
+            return False
+        try:
+            data = data.decode("utf-8", "replace")
+        except AttributeError:
+            pass
+        if stream is self.process.stdout:
+            self.stdoutdata += data
+        else:
+            self.stderrdata += data
+        return True
+
     def check_finished(self, max_plugins_output_length):
         # pylint: disable=too-many-branches
         """Handle action if it is finished (get stdout, stderr, exit code...)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the ActionQueue class. It is used by the scheduler to index its
+checks and actions so that it does not need to scan all of them on each loop turn.
+
+The scheduled actions are stored in some min-heaps keyed on their launch time (t_to_go).
+There is one heap per bucket, a bucket being defined by the (tag, module type) couple of
+the action. Internal checks and master notifications, that are not intended to be executed
+by a satellite, have their own buckets.
+
+The heaps are lazily maintained: an action is pushed again each time it is (re)scheduled
+or its launch time changes, and the outdated entries are simply dropped when they are popped.
+
+The queue also maintains a set of actions per status. This allows the scheduler to get the
+checks waiting to be consumed, waiting for dependencies or the zombie ones without scanning
+all its checks and actions.
+"""
+import heapq
+import itertools
+
+from alignak.action import ACT_STATUS_SCHEDULED
+
+# Buckets for the actions that are not launched by a satellite
+BUCKET_INTERNAL = (u'_internal', )
+BUCKET_MASTER = (u'_master', )
+
+
+class ActionQueue(object):
+    """Launch queue and status index of the scheduler checks or actions.
+
+    An action is attached to the queue when it is added to the scheduler. Its `status` and
+    `t_to_go` attributes then notify the queue about their changes (see ActionBase).
+    """
+
+    def __init__(self):
+        # bucket -> heap of (t_to_go, sequence, action)
+        self.launch_heaps = {}
+        # action uuid -> sequence of its valid heap entry
+        self.sequences = {}
+        self._counter = itertools.count(1)
+        # status -> {action uuid: action}
+        self.by_status = {}
+
+    def __len__(self):
+        return len(self.sequences)
+
+    @staticmethod
+    def get_bucket(action):
+        """Get the bucket an action belongs to
+
+        :param action: action to get the bucket for
+        :type action: alignak.action.Action
+        :return: bucket key
+        :rtype: tuple
+        """
+        if action.internal:
+            return BUCKET_INTERNAL
+        if action.is_a == u'check':
+            return (action.poller_tag, action.module_type)
+        if action.is_a == u'notification' and not action.contact:
+            return BUCKET_MASTER
+        return (action.reactionner_tag, action.module_type)
+
+    def attach(self, action):
+        """Attach an action to this queue and push it if it is scheduled
+
+        :param action: action to attach
+        :type action: alignak.action.Action
+        :return: None
+        """
+        action._index = self  # pylint: disable=protected-access
+        self.by_status.setdefault(action.status, {})[action.uuid] = action
+        self.push(action)
+
+    def detach(self, action):
+        """Detach an action from this queue. Its heap entry, if any, is no more valid.
+
+        :param action: action to detach
+        :type action: alignak.action.Action
+        :return: None
+        """
+        if action.__dict__.get('_index') is self:
+            del action._index  # pylint: disable=protected-access
+        self.sequences.pop(action.uuid, None)
+        self.by_status.get(action.status, {}).pop(action.uuid, None)
+
+    def push(self, action):
+        """Push an action in its bucket heap, only if it is a scheduled one.
+        Any former heap entry of this action gets invalidated.
+
+        :param action: action to push
+        :type action: alignak.action.Action
+        :return: None
+        """
+        if action.status != ACT_STATUS_SCHEDULED or action.t_to_go is None:
+            return
+        sequence = next(self._counter)
+        self.sequences[action.uuid] = sequence
+        heapq.heappush(self.launch_heaps.setdefault(self.get_bucket(action), []),
+                       (action.t_to_go, sequence, action))
+
+    def action_changed(self, action, name, old_value):
+        """Called by an attached action when one of its indexed attributes changed
+
+        :param action: the modified action
+        :type action: alignak.action.Action
+        :param name: modified attribute name
+        :type name: str
+        :param old_value: attribute value before the change
+        :return: None
+        """
+        if name == 'status':
+            self.by_status.get(old_value, {}).pop(action.uuid, None)
+            self.by_status.setdefault(action.status, {})[action.uuid] = action
+
+        if action.status == ACT_STATUS_SCHEDULED:
+            self.push(action)
+
+    def get_by_status(self, status, actions):
+        """Get the actions that currently have the provided status
+
+        Only the actions that still belong to the `actions` dict are returned. The returned
+        list is a copy, the caller may change the actions status while iterating.
+
+        :param status: searched status
+        :type status: str
+        :param actions: the scheduler checks or actions dict
+        :type actions: dict
+        :return: actions list, ordered by the time they got this status
+        :rtype: list
+        """
+        return [action for uuid, action in list(self.by_status.get(status, {}).items())
+                if actions.get(uuid) is action]
+
+    def drain_status(self, status):
+        """Detach and get all the actions that currently have the provided status
+
+        :param status: searched status
+        :type status: str
+        :return: actions list
+        :rtype: list
+        """
+        actions = list(self.by_status.pop(status, {}).values())
+        for action in actions:
+            self.detach(action)
+        return actions
+
+    def pop_launchable(self, now, buckets, actions):
+        """Pop the actions of the provided buckets that are launchable at the `now` time
+
+        The returned actions are still scheduled and still belong to the `actions` dict;
+        the caller is in charge of changing their status.
+
+        :param now: time to compare the actions launch time with
+        :type now: float
+        :param buckets: buckets to pop actions from
+        :type buckets: list
+        :param actions: the scheduler checks or actions dict
+        :type actions: dict
+        :return: launchable actions, ordered by launch time in each bucket
+        :rtype: list
+        """
+        res = []
+        for bucket in buckets:
+            heap = self.launch_heaps.get(bucket)
+            while heap and heap[0][0] <= now:
+                _, sequence, action = heapq.heappop(heap)
+                if self.sequences.get(action.uuid) != sequence:
+                    continue
+                del self.sequences[action.uuid]
+                if action.status != ACT_STATUS_SCHEDULED \
+                        or actions.get(action.uuid) is not action:
+                    continue
+                res.append(action)
+        return res
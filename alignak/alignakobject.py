@@ -24,6 +24,8 @@
 import uuid
 from copy import copy
 
+from six import string_types
+
 
 def get_a_new_object_id():
     """
@@ -35,6 +37,40 @@ def get_a_new_object_id():
     return str(uuid.uuid4())
 
 
+def compact_value(value, cache):
+    """Get a compact representation of a property value: the strings and the tuples
+    of strings are replaced with the equal ones already met, and the containers
+    and objects content is compacted in place
+
+    :param value: the value to compact
+    :param cache: the values already met, shared by all the compacted objects
+    :type cache: dict
+    :return: the compacted value
+    """
+    if isinstance(value, string_types):
+        return cache.setdefault(value, value)
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, tuple):
+        if all(isinstance(elt, string_types) for elt in value):
+            return cache.setdefault(value, value)
+        return value
+    if isinstance(value, list):
+        value[:] = [compact_value(elt, cache) for elt in value]
+    elif isinstance(value, (set, dict)):
+        # Rebuild in place, the elements / keys are hashable
+        if isinstance(value, set):
+            elements = [compact_value(elt, cache) for elt in value]
+        else:
+            elements = [(compact_value(key, cache), compact_value(elt, cache))
+                        for key, elt in value.items()]
+        value.clear()
+        value.update(elements)
+    elif isinstance(value, AlignakObject):
+        value.compact(cache)
+    return value
+
+
 class AlignakObject(object):
     """This class provides a generic way to instantiate alignak objects.
     Attributes are serialized dynamically, whether we un-serialize
@@ -108,6 +144,25 @@ class AlignakObject(object):
 
         return res
 
+    def compact(self, cache):
+        """Compact the object properties values. The equal values of the compacted objects
+        are shared rather than duplicated (see compact_value).
+
+        :param cache: the values already met, shared by all the compacted objects
+        :type cache: dict
+        :return: None
+        """
+        for props in (self.__class__.properties,
+                      getattr(self.__class__, 'running_properties', {})):
+            for prop in props:
+                try:
+                    value = getattr(self, prop)
+                except AttributeError:
+                    continue
+                compacted = compact_value(value, cache)
+                if compacted is not value:
+                    setattr(self, prop, compacted)
+
     def fill_default(self):
         """
         Define the object properties with a default value when the property is not yet defined
@@ -81,5 +81,9 @@ class AutoSlots(type):
         if 'running_properties' in dct:
             props = dct['running_properties']
             slots.update((p for p in props if not props[p].no_slots))
+        # Do not shadow the class attributes (eg. a class level default value) nor the
+        # attributes and data descriptors of the base classes (eg. SynthesisAttribute)
+        slots = set(slot for slot in slots
+                    if slot not in dct and not any(hasattr(base, slot) for base in bases))
         dct['__slots__'] = tuple(slots)
         return type.__new__(mcs, name, bases, dct)
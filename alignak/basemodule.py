@@ -60,6 +60,8 @@ from multiprocessing import Queue, Process
 import logging
 
 from alignak.misc.common import setproctitle, SIGNALS_TO_NAMES_DICT
+from alignak.modulequeue import PipeQueue
+from alignak.util import to_bool
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -133,6 +135,15 @@ class BaseModule(object):
         # 60 seconds before killing a module abruptly
         self.kill_delay = int(getattr(mod_conf, 'kill_delay', '60'))
 
+        # External module queues transport: the daemon synchronization manager or a pipe,
+        # and for a pipe, the queue maximum size and the drop policy when it is full
+        self.queue_transport = getattr(mod_conf, 'queue_transport', 'manager')
+        self.queue_max_size = int(getattr(mod_conf, 'queue_max_size', '0'))
+        self.queue_drop_policy = getattr(mod_conf, 'queue_drop_policy', 'block')
+
+        # A broker module may get the full broks restored from the delta broks
+        self.full_status_broks = to_bool(str(getattr(mod_conf, 'full_status_broks', '0')))
+
         # Self module monitoring (cpu, memory)
         self.module_monitoring = False
         self.module_monitoring_period = 10
@@ -201,8 +212,11 @@ class BaseModule(object):
         :return: None
         """
         self.clear_queues(manager)
+        if self.queue_transport == 'pipe':
+            self.from_q = PipeQueue()
+            self.to_q = PipeQueue(self.queue_max_size, self.queue_drop_policy)
         # If no Manager() object, go with classic Queue()
-        if not manager:
+        elif not manager:
             self.from_q = Queue()
             self.to_q = Queue()
         else:
@@ -220,7 +234,7 @@ class BaseModule(object):
             if queue is None:
                 continue
             # If we got no manager, we directly call the clean
-            if not manager:
+            if not manager or isinstance(queue, PipeQueue):
                 try:
                     queue.close()
                     queue.join_thread()
@@ -347,6 +361,19 @@ class BaseModule(object):
         brok.prepare()
         return manage(brok)
 
+    def manage_broks(self, broks):
+        """Request the module to manage a batch of broks.
+
+        The default implementation calls `manage_brok` for each brok of the batch. An internal
+        module that is able to process several broks at once should redefine this function.
+
+        :param broks: list of broks to manage
+        :type broks: list
+        :return: None
+        """
+        for brok in broks:
+            self.manage_brok(brok)
+
     def manage_signal(self, sig, frame):  # pylint: disable=unused-argument
         """Generic function to handle signals
 
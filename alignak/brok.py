@@ -47,6 +47,10 @@
 """Brok module provide Brok class which is basically event for Alignak.
 Brok are filled depending on their type (check_result, initial_state ...)
 
+The hosts and services status update and check result broks may be sent as delta broks,
+containing only the properties that changed since the previous brok of the same type for
+the same item, and the properties identifying the item. The daemon building the broks
+and the daemon restoring the full broks each maintain the last state of the items.
 """
 import time
 from datetime import datetime
@@ -54,6 +58,31 @@ from datetime import datetime
 from alignak.alignakobject import get_a_new_object_id
 from alignak.misc.serialization import serialize, unserialize
 
+# Delta brok type suffix
+DELTA_SUFFIX = u'_delta'
+
+# Broks types that may be sent as delta broks -> properties identifying the item
+DELTA_BROKS = {
+    u'update_host_status': ('uuid',),
+    u'update_service_status': ('uuid',),
+    u'host_check_result': ('host_name',),
+    u'service_check_result': ('host_name', 'service_description'),
+}
+
+
+def get_state_value(value):
+    """Get a value of an item last state, as stored for the delta broks
+
+    The containers and the objects of the brok data are the item own ones and they may
+    change in place, their serialized value is stored rather than the value itself
+
+    :param value: brok data property value
+    :return: the value to store in the item last state
+    """
+    if isinstance(value, (list, set, dict)) or hasattr(value, 'serialize'):
+        return serialize(value)
+    return value
+
 
 class Brok(object):
     """A Brok is a piece of information exported by Alignak to the Broker.
@@ -76,6 +105,8 @@ class Brok(object):
 
     - update_host_status, update_service_status, initial_contact_status
     - host_check_result, service_check_result
+    - update_host_status_delta, update_service_status_delta,
+      host_check_result_delta, service_check_result_delta
     - host_next_schedule, service_next_scheduler
     - host_snapshot, service_snapshot
     - unknown_host_check_result, unknown_service_check_result
@@ -113,6 +144,12 @@ class Brok(object):
         self.data = params['data']
         # self.data = serialize(params['data'], no_json=True, printing=False)
 
+    def __getstate__(self):
+        # The full brok restored from a delta brok is only used by the broker
+        state = self.__dict__.copy()
+        state.pop('full_brok', None)
+        return state
+
     def __repr__(self):
         ct = datetime.fromtimestamp(self.creation_time).strftime("%Y-%m-%d %H:%M:%S.%f")
         return "Brok %s (%s) '%s': %s" % (self.uuid, ct, self.type, self.data)
@@ -132,12 +169,14 @@ class Brok(object):
         return self.creation_time, self.data['level'], self.data['message']
 
     # pylint: disable=unused-argument
-    def serialize(self, no_json=True, printing=False):
+    def serialize(self, no_json=True, printing=False, json_data=True):
         """This function serialize into a simple dict object.
         It is used when transferring data to other daemons over the network (http)
 
         Here we directly return all attributes
 
+        :param json_data: if False, the data is not json encoded (binary format)
+        :type json_data: bool
         :return: serialized Brok
         :rtype: dict
         """
@@ -147,7 +186,7 @@ class Brok(object):
             "creation_time": self.creation_time,
             "instance_id": self.instance_id,
             "type": self.type,
-            "data": serialize(self.data, no_json=False, printing=False)
+            "data": serialize(self.data, no_json=not json_data, printing=False)
         }
 
     def prepare(self):
@@ -168,3 +207,65 @@ class Brok(object):
         self.prepared = True
 
         return self.data
+
+    def set_delta(self, states):
+        """Make this brok a delta brok if its type allows it
+
+        The brok data is replaced with the properties that changed since the last
+        brok of the same type for the same item, and the properties identifying the item.
+        The brok type gets the '_delta' suffix. The first brok for an item contains
+        all its properties.
+
+        :param states: last state of the items, updated with this brok data (see
+                       get_state_value)
+        :type states: dict
+        :return: True if the brok is now a delta brok
+        :rtype: bool
+        """
+        keys = DELTA_BROKS.get(self.type, None)
+        if keys is None:
+            return False
+
+        data = self.data
+        ident = (self.type,) + tuple(data.get(key) for key in keys)
+        last = states.get(ident, None)
+        state = states[ident] = dict((prop, get_state_value(value))
+                                     for prop, value in data.items())
+        if last is None:
+            self.data = dict(data)
+        else:
+            self.data = dict((prop, data[prop]) for prop, value in state.items()
+                             if prop in keys or prop not in last or last[prop] != value)
+        self.type += DELTA_SUFFIX
+        return True
+
+    def get_full_brok(self, states):
+        """Get the full brok of a delta brok
+
+        The brok data is merged into the last state of its item. A brok of a type that
+        may be sent as a delta brok updates the last state of its item. Any other brok
+        is returned as is.
+
+        :param states: last state of the items
+        :type states: dict
+        :return: the full brok
+        :rtype: alignak.brok.Brok
+        """
+        brok_type = self.type
+        if brok_type.endswith(DELTA_SUFFIX):
+            brok_type = brok_type[:-len(DELTA_SUFFIX)]
+        keys = DELTA_BROKS.get(brok_type, None)
+        if keys is None:
+            return self
+
+        data = self.prepare()
+        ident = (brok_type,) + tuple(data.get(key) for key in keys)
+        if brok_type == self.type:
+            states[ident] = data
+            return self
+
+        full = dict(states.get(ident, None) or {})
+        full.update(data)
+        states[ident] = full
+        return Brok({'uuid': self.uuid, 'prepared': True, 'creation_time': self.creation_time,
+                     'instance_id': self.instance_id, 'type': brok_type, 'data': full})
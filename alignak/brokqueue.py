@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the BrokQueue class. It is used by the satellite links to store
+the broks raised for a daemon.
+
+The broks are appended in their creation order and are never sorted. The queue is split
+in two segments: the broks that are pending, not yet sent to the scheduler external modules,
+and the broks that are ready to be sent to the broker. The boundary between the two segments
+is the "sent to externals" cursor: the pending broks are moved to the ready segment
+once they have been sent to the external modules.
+
+Handing the ready broks to a broker is a drain of the ready segment and dropping the oldest
+broks is done from the queue head, both without scanning the whole queue.
+"""
+import itertools
+from collections import deque
+
+
+class BrokQueue(object):
+    """Append-only queue of the broks raised for a daemon"""
+
+    def __init__(self, broks=None):
+        """
+        :param broks: initial broks
+        :type broks: list
+        """
+        # Broks not yet sent to the external modules
+        self.pending = deque()
+        # Broks sent to the external modules, to be sent to the broker
+        self.ready = deque()
+        if broks:
+            self.extend(broks)
+
+    def __len__(self):
+        return len(self.ready) + len(self.pending)
+
+    def __iter__(self):
+        return itertools.chain(self.ready, self.pending)
+
+    def __delitem__(self, key):
+        # Only `del queue[:]` is supported, as for the former broks lists
+        if key != slice(None):
+            raise TypeError("BrokQueue only supports the deletion of all its items")
+        self.clear()
+
+    def __repr__(self):  # pragma: no cover
+        return '<BrokQueue ready=%d pending=%d />' % (len(self.ready), len(self.pending))
+
+    def append(self, brok):
+        """Append a brok to the queue
+
+        :param brok: brok to append
+        :type brok: alignak.brok.Brok
+        :return: None
+        """
+        self.pending.append(brok)
+
+    def extend(self, broks):
+        """Append some broks to the queue
+
+        :param broks: broks to append
+        :type broks: list
+        :return: None
+        """
+        for brok in broks:
+            if getattr(brok, 'sent_to_externals', False):
+                self.ready.append(brok)
+            else:
+                self.pending.append(brok)
+
+    def clear(self):
+        """Remove all the broks from the queue
+
+        :return: None
+        """
+        self.pending.clear()
+        self.ready.clear()
+
+    def get_pending(self):
+        """Get the broks not yet sent to the external modules
+
+        :return: pending broks
+        :rtype: collections.deque
+        """
+        return self.pending
+
+    def set_sent_to_externals(self):
+        """Move the cursor after the pending broks: they have been sent to the
+        external modules and are now ready to be sent to the broker
+
+        :return: None
+        """
+        while self.pending:
+            brok = self.pending.popleft()
+            brok.sent_to_externals = True
+            self.ready.append(brok)
+
+    def drain(self):
+        """Get and remove the broks that are ready to be sent to the broker
+
+        :return: the ready broks, oldest first
+        :rtype: list
+        """
+        res = []
+        while self.ready:
+            res.append(self.ready.popleft())
+        return res
+
+    def truncate(self, max_size):
+        """Drop the oldest broks so that the queue holds at most max_size broks
+
+        :param max_size: maximum number of broks
+        :type max_size: int
+        :return: number of dropped broks
+        :rtype: int
+        """
+        dropped = 0
+        while len(self) > max_size:
+            if self.ready:
+                self.ready.popleft()
+            else:
+                self.pending.popleft()
+            dropped += 1
+        return dropped
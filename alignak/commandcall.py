@@ -189,6 +189,20 @@ class CommandCall(AlignakObject):
         #         res[prop] = getattr(self, prop)
         return res
 
+    def compact(self, cache):
+        """Compact the command call properties values and share its command
+        with the other command calls of the same command
+
+        :param cache: the values already met, shared by all the compacted objects
+        :type cache: dict
+        :return: None
+        """
+        command = getattr(self, 'command', None)
+        if isinstance(command, AlignakObject) and hasattr(command, 'uuid'):
+            # The key class is never a string, the key never equals a compacted value
+            self.command = cache.setdefault((command.__class__, command.uuid), command)
+        super(CommandCall, self).compact(cache)
+
     def get_command_and_args(self):
         """We want to get the command and the args with ! splitting.
         but don't forget to protect against the ! to avoid splitting on them
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the ConfigurationDigest class. It is used by the arbiter dispatcher
+to push only the changed monitored objects to a scheduler when the configuration is reloaded.
+
+A digest stores a content hash for each object of a configuration part. The objects are
+identified by their type and name because a reloaded configuration gets new objects uuid.
+For the same reason, the uuids found in the objects content are replaced with the
+referenced objects identifiers before hashing.
+
+When a digest is built from a former digest, the objects that still exist get back the uuid
+they were dispatched with. The configuration part then only differs from the one the scheduler
+manages by the added, changed and removed objects and, if only some hosts and services changed,
+the scheduler can update its objects in place with the configuration difference.
+"""
+import re
+import json
+import hashlib
+
+from six import string_types
+
+from alignak.misc.serialization import serialize
+
+# The objects collections that a scheduler can update in place
+DIFF_COLLECTIONS = ('hosts', 'services')
+
+# The configuration part properties that identify the part rather than describe its content
+IDENTITY_PROPERTIES = ('instance_id', 'uuid', 'push_flavor', 'config_name', 'magic_hash')
+
+UUID_REGEX = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+
+def get_hash(data):
+    """Get the sha1 hash of some data
+
+    :param data: data to hash
+    :type data: str
+    :return: hexadecimal digest
+    :rtype: str
+    """
+    try:
+        data = data.encode('utf-8')
+    except (UnicodeDecodeError, AttributeError):
+        pass
+    return hashlib.sha1(data).hexdigest()
+
+
+class ConfigurationDigest(object):
+    """Content hashes of the objects of a dispatched configuration part"""
+
+    def __init__(self):
+        # Hash of the whole serialized configuration part
+        self.push_flavor = ''
+        # Hash of the configuration part global properties
+        self.global_hash = ''
+        # Objects hashes: objects type -> {object key: hash}
+        self.hashes = {}
+        # Dispatched objects uuid: object key -> uuid
+        self.uuids = {}
+
+    def __repr__(self):  # pragma: no cover
+        return '<ConfigurationDigest %s, %d objects />' % (self.push_flavor, len(self.uuids))
+
+    @staticmethod
+    def get_objects_collections(conf_part):
+        """Get the objects collections of a configuration part
+
+        :param conf_part: configuration part
+        :type conf_part: alignak.objects.config.Config
+        :return: list of (objects type, items) tuples
+        :rtype: list
+        """
+        res = []
+        for _, _, strclss, _, _ in list(conf_part.types_creations.values()):
+            if strclss in ['arbiters', 'schedulers', 'brokers',
+                           'pollers', 'reactionners', 'receivers']:
+                continue
+            if getattr(conf_part, strclss, None) is None:
+                continue
+            res.append((strclss, getattr(conf_part, strclss)))
+        return res
+
+    @classmethod
+    def build(cls, conf_part, previous=None):
+        """Serialize a configuration part and build its digest
+
+        If a former digest is provided, the objects that it contains get back their
+        dispatched uuid in the serialized configuration part.
+
+        :param conf_part: configuration part
+        :type conf_part: alignak.objects.config.Config
+        :param previous: digest of the configuration part formerly dispatched
+        :type previous: ConfigurationDigest
+        :return: the digest and the serialized configuration part
+        :rtype: tuple
+        """
+        digest = cls()
+        objects_collections = cls.get_objects_collections(conf_part)
+        remapped = digest.identify_objects(objects_collections, previous)
+
+        # The configuration part is serialized as it is pushed, then dumped as json
+        s_conf_part = serialize(serialize(conf_part), no_json=False)
+        if remapped:
+            s_conf_part = UUID_REGEX.sub(lambda match: remapped.get(match.group(0),
+                                                                    match.group(0)),
+                                         s_conf_part)
+        digest.push_flavor = get_hash(s_conf_part)
+        s_conf_part = json.loads(s_conf_part)
+
+        digest.hash_objects(objects_collections, s_conf_part['content'])
+        return digest, s_conf_part
+
+    def identify_objects(self, objects_collections, previous=None):
+        """Identify all the objects of a configuration part and get back the uuid of the
+        objects formerly dispatched
+
+        Some objects names are built with other objects uuid (eg. dependencies) or with
+        a random uuid (eg. generated escalations), those uuids are replaced in the names.
+        An object which name is not unique is only identified by its uuid.
+
+        :param objects_collections: list of (objects type, items) tuples
+        :type objects_collections: list
+        :param previous: digest of the configuration part formerly dispatched
+        :type previous: ConfigurationDigest
+        :return: new uuid -> formerly dispatched uuid of the objects which uuid changed
+        :rtype: dict
+        """
+        full_names = {}
+        for strclss, items in objects_collections:
+            for item in items.items.values():
+                full_names[item.uuid] = '%s:%s' % (strclss, item.get_full_name())
+            for item in items.templates.values():
+                full_names[item.uuid] = '%s:template:%s' % (strclss, item.get_name())
+        keys = {}
+        for uuid, name in full_names.items():
+            keys.setdefault(UUID_REGEX.sub(lambda match: full_names.get(match.group(0), ''),
+                                           name), []).append(uuid)
+
+        remapped = {}
+        for key, uuids in keys.items():
+            if len(uuids) > 1:
+                for uuid in uuids:
+                    self.uuids['%s:%s' % (key.split(':')[0], uuid)] = uuid
+                continue
+            uuid = self.uuids[key] = uuids[0]
+            if previous is not None and previous.uuids.get(key, uuid) != uuid:
+                self.uuids[key] = remapped[uuid] = previous.uuids[key]
+        return remapped
+
+    def hash_objects(self, objects_collections, content):
+        """Hash the objects and the global properties of a serialized configuration part,
+        with the objects uuid replaced by the objects identifiers
+
+        :param objects_collections: list of (objects type, items) tuples
+        :type objects_collections: list
+        :param content: serialized configuration part content
+        :type content: dict
+        :return: None
+        """
+        names = dict((uuid, key) for key, uuid in self.uuids.items())
+        for strclss, _ in objects_collections:
+            objects = json.loads(content[strclss]['content'])
+            self.hashes[strclss] = {}
+            for uuid, obj in list(objects['items'].items()) + list(objects['templates'].items()):
+                self.hashes[strclss][names[uuid]] = self.get_content_hash(obj, names)
+        self.global_hash = self.get_content_hash(
+            dict((prop, value) for prop, value in content.items()
+                 if prop not in self.hashes and prop not in IDENTITY_PROPERTIES), names)
+
+    @classmethod
+    def get_content_hash(cls, content, names):
+        """Hash some content, independently of the objects uuid
+
+        :param content: serialized content
+        :type content: dict
+        :param names: objects uuid -> object identifier
+        :type names: dict
+        :return: content hash
+        :rtype: str
+        """
+        return get_hash(UUID_REGEX.sub(lambda match: names.get(match.group(0), ''),
+                                       json.dumps(cls.normalize(content, names),
+                                                  sort_keys=True)))
+
+    @classmethod
+    def normalize(cls, value, names):
+        """Replace the objects uuid with their identifier, a list of objects
+        is built from a set, its order is not significant
+
+        :param value: serialized value
+        :param names: objects uuid -> object identifier
+        :type names: dict
+        :return: normalized value
+        """
+        if isinstance(value, dict):
+            return dict((prop, cls.normalize(val, names)) for prop, val in value.items())
+        if isinstance(value, list):
+            if value and all(isinstance(val, string_types) and len(val) == 36
+                             and UUID_REGEX.match(val) for val in value):
+                return sorted(names.get(val, '') for val in value)
+            return [cls.normalize(val, names) for val in value]
+        return value
+
+    def get_diff(self, previous, s_conf_part):
+        """Get the difference between the formerly dispatched configuration part and
+        the serialized configuration part of this digest
+
+        The difference only exists if the configuration global properties and all the
+        objects but the hosts and services are the same. It contains, for the hosts and the
+        services, the serialized added or changed objects and the removed objects uuid:
+        {
+            'base': former push flavor,
+            'hosts': {'changed': {uuid: serialized host}, 'removed': [uuid]},
+            'services': {'changed': {uuid: serialized service}, 'removed': [uuid]}
+        }
+
+        :param previous: digest of the configuration part formerly dispatched
+        :type previous: ConfigurationDigest
+        :param s_conf_part: serialized configuration part, as returned by `build`
+        :type s_conf_part: dict
+        :return: the configuration difference or None if no difference can be used
+        :rtype: dict
+        """
+        if previous is None or previous.global_hash != self.global_hash:
+            return None
+
+        for strclss in set(self.hashes) | set(previous.hashes):
+            if strclss in DIFF_COLLECTIONS:
+                continue
+            if self.hashes.get(strclss) != previous.hashes.get(strclss):
+                return None
+
+        diff = {'base': previous.push_flavor}
+        content = s_conf_part['content']
+        for strclss in DIFF_COLLECTIONS:
+            hashes = self.hashes.get(strclss, {})
+            former_hashes = previous.hashes.get(strclss, {})
+
+            # The templates are not updated in place
+            template = '%s:template:' % strclss
+            if dict((key, value) for key, value in hashes.items()
+                    if key.startswith(template)) != \
+                    dict((key, value) for key, value in former_hashes.items()
+                         if key.startswith(template)):
+                return None
+
+            objects = json.loads(content[strclss]['content'])['items']
+            diff[strclss] = {
+                'changed': dict((self.uuids[key], objects[self.uuids[key]])
+                                for key in hashes if not key.startswith(template)
+                                and former_hashes.get(key) != hashes[key]),
+                'removed': [previous.uuids[key] for key in former_hashes if key not in hashes]
+            }
+        return diff
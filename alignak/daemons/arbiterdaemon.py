@@ -88,7 +88,7 @@ from alignak.brok import Brok
 from alignak.external_command import ExternalCommand
 from alignak.property import IntegerProp, StringProp, ListProp
 from alignak.http.arbiter_interface import ArbiterInterface
-from alignak.objects.satellitelink import SatelliteLink
+from alignak.objects.satellitelink import SatelliteLink, LinkError
 from alignak.monitor import MonitorConnection
 
 
@@ -292,28 +292,59 @@ class Arbiter(Daemon):  # pylint: disable=too-many-instance-attributes
             # No one is anymore interested with...
             del self.broks[:]
 
-    def push_external_commands_to_schedulers(self):  # pragma: no cover - not used!
+    def push_external_commands_to_schedulers(self):
         """Send external commands to schedulers
 
+        The external commands are resolved and dispatched to their schedulers buffers
+        (see ExternalCommandManager.search_host_and_dispatch), then each scheduler buffer
+        is pushed with one single request.
+
         :return: None
         """
-        # Now get all external commands and push them to the schedulers
-        for external_command in self.external_commands:
+        with self.external_commands_lock:
+            commands_to_process = self.external_commands
+            self.external_commands = []
+
+        # Now get all external commands and dispatch them to the schedulers
+        for external_command in commands_to_process:
             self.external_commands_manager.resolve_command(external_command)
 
         # Now for all reachable schedulers, send the commands
-        sent = False
+        count_pushed_commands = 0
         for scheduler_link in self.conf.schedulers:
-            ext_cmds = scheduler_link.external_commands
-            if ext_cmds and scheduler_link.reachable:
-                logger.debug("Sending %d commands to the scheduler %s",
-                             len(ext_cmds), scheduler_link.name)
-                if scheduler_link.push_external_commands(ext_cmds):
-                    statsmgr.counter('external-commands.pushed.count', len(ext_cmds))
-                    sent = True
+            commands = scheduler_link.pushed_commands
+            if not commands:
+                continue
+
+            if not scheduler_link.reachable:
+                logger.debug("The scheduler '%s' is not reachable, keeping %d commands "
+                             "for a next try", scheduler_link.name, len(commands))
+                continue
+
+            logger.debug("Sending %d commands to the scheduler %s",
+                         len(commands), scheduler_link.name)
+            _t0 = time.time()
+            sent = False
+            try:
+                sent = scheduler_link.push_external_commands(commands)
+            except LinkError:
+                logger.warning("Scheduler connection failed, I could not push external commands!")
+            statsmgr.timer('external-commands.flush.%s' % scheduler_link.name,
+                           time.time() - _t0)
+
             if sent:
                 # Clean the pushed commands
-                scheduler_link.external_commands.clear()
+                scheduler_link.pushed_commands = []
+                statsmgr.gauge('external-commands.batch.%s' % scheduler_link.name,
+                               len(commands))
+                count_pushed_commands += len(commands)
+            else:
+                # Keep the not sent commands... for a next try
+                statsmgr.gauge('external-commands.failed.%s' % scheduler_link.name,
+                               len(commands))
+
+        if count_pushed_commands:
+            statsmgr.counter('external-commands.pushed.count', count_pushed_commands)
 
     def get_external_commands(self):
         """Get the external commands
@@ -1446,7 +1477,11 @@ class Arbiter(Daemon):  # pylint: disable=too-many-instance-attributes
         :return: None
         """
         if not not_configured:
-            self.dispatcher = Dispatcher(self.conf, self.link_to_myself)
+            # The former dispatcher digests allow to only push the configuration differences
+            former_dispatcher = getattr(self, 'dispatcher', None)
+            self.dispatcher = Dispatcher(self.conf, self.link_to_myself,
+                                         digests=former_dispatcher.digests
+                                         if former_dispatcher else None)
             # I set my own dispatched configuration as the provided one...
             # because I will not push a configuration to myself :)
             self.cur_conf = self.conf
@@ -1654,10 +1689,12 @@ class Arbiter(Daemon):  # pylint: disable=too-many-instance-attributes
             self.push_broks_to_broker()
             statsmgr.timer('broks.pushed.time', time.time() - _t0)
 
-            # # We push our external commands to our schedulers...
-            # _t0 = time.time()
-            # self.push_external_commands_to_schedulers()
-            # statsmgr.timer('external-commands.pushed.time', time.time() - _t0)
+            # We push our external commands to our schedulers...
+            # only if no receiver is getting them from us
+            if not self.conf.receivers:
+                _t0 = time.time()
+                self.push_external_commands_to_schedulers()
+                statsmgr.timer('external-commands.pushed.time', time.time() - _t0)
 
         if self.system_health and (self.loop_count % self.system_health_period == 1):
             perfdatas = []
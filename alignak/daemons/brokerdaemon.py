@@ -61,19 +61,22 @@ import time
 import traceback
 import threading
 import logging
+from queue import Full
+from collections import deque
 
 # pylint: disable=wildcard-import,unused-wildcard-import
 # This import, despite not used, is necessary to include all Alignak objects modules
 from alignak.objects import *
 from alignak.misc.serialization import unserialize, AlignakClassLookupException
 from alignak.satellite import BaseSatellite
-from alignak.property import IntegerProp, StringProp
+from alignak.property import IntegerProp, FloatProp, StringProp
 from alignak.stats import statsmgr
 from alignak.http.broker_interface import BrokerInterface
 from alignak.objects.satellitelink import SatelliteLink, LinkError
 from alignak.brok import Brok
 from alignak.external_command import ExternalCommand
 from alignak.message import Message
+from alignak.modulequeue import PipeQueue
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -89,8 +92,18 @@ class Broker(BaseSatellite):
         'type':
             StringProp(default='broker'),
         'port':
-            IntegerProp(default=7772)
-
+            IntegerProp(default=7772),
+
+        # Maximum count of broks given at once to the internal modules
+        'manage_broks_batch':
+            IntegerProp(default=100),
+        # Maximum duration of the internal modules broks management in a loop turn
+        'manage_broks_time_budget':
+            FloatProp(default=0.8),
+        # Maximum count of initial broks got at once from a scheduler, 0 to get all the
+        # initial broks at once
+        'initial_broks_page_size':
+            IntegerProp(default=1000)
     })
 
     def __init__(self, **kwargs):
@@ -101,6 +114,8 @@ class Broker(BaseSatellite):
         super(Broker, self).__init__(kwargs.get('daemon_name', 'Default-broker'), **kwargs)
 
         self.got_initial_broks = False
+        # Scheduler uuid -> continuation token of its initial broks stream
+        self.initial_broks_tokens = {}
 
         # Our schedulers and arbiters are initialized in the base class
 
@@ -113,7 +128,9 @@ class Broker(BaseSatellite):
         self.have_modules = False
 
         # All broks to manage
-        self.external_broks = []  # broks to manage
+        self.external_broks = deque()  # broks to manage
+        # Last state of the items, to restore the full broks from the delta broks
+        self.broks_states = {}
 
         # broks raised internally by the broker
         self.internal_broks = []
@@ -191,13 +208,24 @@ class Broker(BaseSatellite):
         :type brok: object
         :return: None
         """
-        # Unserialize the brok before consuming it
-        brok.prepare()
+        self.manage_broks([brok])
+
+    def manage_broks(self, broks):
+        """Get a batch of broks.
+        We put the broks data to the internal modules
+
+        :param broks: list of objects with data
+        :type broks: list
+        :return: None
+        """
+        # Unserialize the broks before consuming them
+        for brok in broks:
+            brok.prepare()
 
         for module in self.modules_manager.get_internal_instances():
             try:
                 _t0 = time.time()
-                module.manage_brok(brok)
+                module.manage_broks(self.get_module_broks(module, broks))
                 statsmgr.timer('manage-broks.internal.%s' % module.get_name(), time.time() - _t0)
             except Exception as exp:  # pylint: disable=broad-except
                 logger.warning("The module %s raised an exception: %s, "
@@ -205,6 +233,128 @@ class Broker(BaseSatellite):
                 logger.exception(exp)
                 self.modules_manager.set_to_restart(module)
 
+    def manage_internal_broks(self):
+        """Make the internal modules manage the broks waiting in our queue
+
+        The internal modules get the broks by batches of `manage_broks_batch` broks. If the
+        management is longer than `manage_broks_time_budget` seconds, the remaining broks are
+        postponed to the next loop turn to avoid overloading the broker daemon.
+
+        :return: number of managed broks
+        :rtype: int
+        """
+        start = time.time()
+        managed = 0
+        if self.modules_manager.get_internal_instances():
+            batch_size = max(1, self.manage_broks_batch)
+            while self.external_broks:
+                # Get the first broks in the queue
+                batch = [self.external_broks.popleft()
+                         for _ in range(min(batch_size, len(self.external_broks)))]
+                self.manage_broks(batch)
+                managed += len(batch)
+
+                # Do not 'manage' more than the time budget, we must get new broks
+                # almost every second
+                if self.external_broks and \
+                        time.time() - start > self.manage_broks_time_budget:
+                    logger.info("I did not yet managed all my broks, still %d broks",
+                                len(self.external_broks))
+                    break
+        else:
+            # No internal module, only keep the broks that are still to be sent
+            self.external_broks = deque([brok for brok in self.external_broks
+                                         if getattr(brok, 'to_be_sent', False)])
+
+        duration = time.time() - start
+        statsmgr.gauge('broks.backlog', len(self.external_broks))
+        if managed:
+            statsmgr.counter('broks.managed', managed)
+            statsmgr.timer('broks.managed.time', duration)
+            if duration > 0:
+                statsmgr.gauge('broks.managed.rate', managed / duration)
+
+        return managed
+
+    def get_module_broks(self, module, broks):  # pylint: disable=no-self-use
+        """Get the broks to send to a module: the full broks restored from the delta
+        broks if the module needs them, else the broks as they were received
+
+        :param module: module the broks are sent to
+        :type module: alignak.basemodule.BaseModule
+        :param broks: broks to send
+        :type broks: list
+        :return: the module broks
+        :rtype: list
+        """
+        if not getattr(module, 'full_status_broks', False):
+            return broks
+        return [getattr(brok, 'full_brok', brok) for brok in broks]
+
+    def restore_full_broks(self, broks):
+        """Restore the full broks of the received delta broks, if some modules need them
+
+        The full brok is stored in the `full_brok` attribute of the delta brok
+
+        :param broks: received broks
+        :type broks: list
+        :return: None
+        """
+        if not any(getattr(module, 'full_status_broks', False)
+                   for module in self.modules_manager.instances):
+            return
+        for brok in broks:
+            full_brok = brok.get_full_brok(self.broks_states)
+            if full_brok is not brok:
+                brok.full_brok = full_brok
+
+    def get_initial_broks_pages(self):
+        """Get a page of initial broks from each scheduler still streaming its initial broks
+
+        The initial broks are added to the broks to manage. The other broks of the
+        schedulers are got as usual while the initial broks are streamed.
+
+        :return: False if a scheduler is not yet ready to provide its initial broks
+        :rtype: bool
+        """
+        my_satellites = self.get_links_of_type(s_type='scheduler')
+        for satellite in list(my_satellites.values()):
+            token = self.initial_broks_tokens.get(satellite.uuid, '')
+            if token is None:
+                # Got all the initial broks of this scheduler
+                continue
+
+            if not token:
+                logger.info("Asking my initial broks from '%s'", satellite.name)
+            _t0 = time.time()
+            try:
+                res = satellite.get_initial_broks(self.name, self.initial_broks_page_size,
+                                                  token)
+            except LinkError:
+                logger.warning("Scheduler connection failed, I could not get initial broks!")
+                continue
+            statsmgr.timer('broks.initial.%s.time' % satellite.name, time.time() - _t0)
+
+            if not isinstance(res, dict) or res.get('_status') != u'OK':
+                logger.info("No initial broks were raised, my scheduler is not yet ready...")
+                # Restart the initial broks stream
+                self.initial_broks_tokens.pop(satellite.uuid, None)
+                return False
+
+            for brok in res['broks']:
+                brok.instance_id = satellite.instance_id
+            self.restore_full_broks(res['broks'])
+            self.external_broks.extend(res['broks'])
+            statsmgr.counter('broks.initial.%s.count' % satellite.name, len(res['broks']))
+
+            self.initial_broks_tokens[satellite.uuid] = res['token'] or None
+            if not res['token']:
+                logger.info("Got all my initial broks from '%s'", satellite.name)
+
+        self.got_initial_broks = all(self.initial_broks_tokens.get(satellite.uuid, '') is None
+                                     for satellite in my_satellites.values())
+        return True
+
     def get_internal_broks(self):
         """Get all broks from self.broks_internal_raised and append them to our broks
         to manage
@@ -256,6 +406,7 @@ class Broker(BaseSatellite):
                                        time.time() - _t0)
                         for brok in tmp_broks:
                             brok.instance_id = satellite_link.instance_id
+                        self.restore_full_broks(tmp_broks)
 
                         # Add the broks to our global list
                         self.external_broks.extend(tmp_broks)
@@ -290,6 +441,7 @@ class Broker(BaseSatellite):
             # # self_conf is our own configuration from the alignak environment
             # self_conf = self.cur_conf['self_conf']
             self.got_initial_broks = False
+            self.initial_broks_tokens = {}
 
             # Now we create our pollers, reactionners and receivers
             for link_type in ['pollers', 'reactionners', 'receivers']:
@@ -392,7 +544,7 @@ class Broker(BaseSatellite):
         self.receivers.clear()
 
         # Clean our internal objects
-        self.external_broks = self.external_broks[:]
+        self.external_broks = deque(self.external_broks)
         self.internal_broks = self.internal_broks[:]
         with self.arbiter_broks_lock:
             self.arbiter_broks = self.arbiter_broks[:]
@@ -411,31 +563,39 @@ class Broker(BaseSatellite):
          * add broks to the queue of each external module
          * manage broks with each internal module
 
-         If the internal broks management is longer than 0.8 seconds, postpone to hte next
-         loop turn to avoid overloading the broker daemon.
+         If the internal broks management is longer than `manage_broks_time_budget` seconds,
+         postpone to the next loop turn to avoid overloading the broker daemon.
 
          :return: None
         """
         if not self.got_initial_broks:
-            # Asking initial broks from my schedulers
-            my_satellites = self.get_links_of_type(s_type='scheduler')
-            for satellite in list(my_satellites.values()):
-                logger.info("Asking my initial broks from '%s'", satellite.name)
-                _t0 = time.time()
-                try:
-                    my_initial_broks = satellite.get_initial_broks(self.name)
-                    statsmgr.timer('broks.initial.%s.time' % satellite.name, time.time() - _t0)
-                    if not my_initial_broks:
-                        logger.info("No initial broks were raised, "
-                                    "my scheduler is not yet ready...")
-                        return
-
-                    self.got_initial_broks = True
-                    logger.debug("Got %d initial broks from '%s'",
-                                 my_initial_broks, satellite.name)
-                    statsmgr.gauge('broks.initial.%s.count' % satellite.name, my_initial_broks)
-                except LinkError as exp:
-                    logger.warning("Scheduler connection failed, I could not get initial broks!")
+            if self.initial_broks_page_size:
+                # Get a page of initial broks from my schedulers
+                if not self.get_initial_broks_pages():
+                    return
+            else:
+                # Asking initial broks from my schedulers
+                my_satellites = self.get_links_of_type(s_type='scheduler')
+                for satellite in list(my_satellites.values()):
+                    logger.info("Asking my initial broks from '%s'", satellite.name)
+                    _t0 = time.time()
+                    try:
+                        my_initial_broks = satellite.get_initial_broks(self.name)
+                        statsmgr.timer('broks.initial.%s.time' % satellite.name,
+                                       time.time() - _t0)
+                        if not my_initial_broks:
+                            logger.info("No initial broks were raised, "
+                                        "my scheduler is not yet ready...")
+                            return
+
+                        self.got_initial_broks = True
+                        logger.debug("Got %d initial broks from '%s'",
+                                     my_initial_broks, satellite.name)
+                        statsmgr.gauge('broks.initial.%s.count' % satellite.name,
+                                       my_initial_broks)
+                    except LinkError as exp:
+                        logger.warning("Scheduler connection failed, "
+                                       "I could not get initial broks!")
 
         logger.debug("Begin Loop: still some old broks to manage (%d)", len(self.external_broks))
         if self.external_broks:
@@ -471,8 +631,17 @@ class Broker(BaseSatellite):
                 _t00 = time.time()
                 queue_size = module.to_q.qsize()
                 statsmgr.gauge('queues.external.%s.to.size' % module.get_name(), queue_size)
-                module.to_q.put(broks_to_send)
+                module.to_q.put(self.get_module_broks(module, broks_to_send))
                 statsmgr.timer('queues.external.%s.to.put' % module.get_name(), time.time() - _t00)
+                if isinstance(module.to_q, PipeQueue):
+                    queue_stats = module.to_q.get_stats()
+                    statsmgr.gauge('queues.external.%s.to.high-water-mark' % module.get_name(),
+                                   queue_stats['high_water_mark'])
+                    statsmgr.gauge('queues.external.%s.to.dropped' % module.get_name(),
+                                   queue_stats['dropped'])
+            except Full:
+                logger.warning("Module %s queue is full, %d broks are not sent to the module",
+                               module.get_name(), len(broks_to_send))
             except Exception as exp:  # pylint: disable=broad-except
                 # first we must find the modules
                 logger.warning("Module %s queue exception: %s, I'm tagging it to restart later",
@@ -486,24 +655,7 @@ class Broker(BaseSatellite):
         logger.debug("Time to send %s broks (%d secs)", len(broks_to_send), time.time() - _t0)
 
         # Make the internal modules manage the broks
-        start = time.time()
-        while self.external_broks:
-            now = time.time()
-            # Do not 'manage' more than 0.8s, we must get new broks almost every second
-            if now - start > 0.8:
-                logger.info("I did not yet managed all my broks, still %d broks",
-                            len(self.external_broks))
-                break
-
-            # Get the first brok in the list
-            brok = self.external_broks.pop(0)
-            if self.modules_manager.get_internal_instances():
-                self.manage_brok(brok)
-                # Make a very short pause to avoid overloading
-                self.make_a_pause(0.01, check_time_change=False)
-            else:
-                if getattr(brok, 'to_be_sent', False):
-                    self.external_broks.append(brok)
+        self.manage_internal_broks()
 
         # Maybe our external modules raised 'objects', so get them
         if self.get_objects_from_from_queues():
@@ -62,7 +62,7 @@ from alignak.satellite import Satellite
 from alignak.property import IntegerProp, StringProp
 from alignak.external_command import ExternalCommand, ExternalCommandManager
 from alignak.stats import statsmgr
-from alignak.http.generic_interface import GenericInterface
+from alignak.http.receiver_interface import ReceiverInterface
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -107,10 +107,12 @@ class Receiver(Satellite):
 
         # and the unprocessed one, a buffer
         self.unprocessed_external_commands = []
+        # and the structured passive check results
+        self.unprocessed_check_results = []
 
         self.accept_passive_unknown_check_results = False
 
-        self.http_interface = GenericInterface(self)
+        self.http_interface = ReceiverInterface(self)
 
     def add(self, elt):
         """Generic function to add objects to the daemon internal lists.
@@ -149,6 +151,16 @@ class Receiver(Satellite):
             self.unprocessed_external_commands.append(elt)
             statsmgr.counter('external-commands.added', 1)
 
+    def add_check_results(self, results):
+        """Add some structured passive check results to be pushed to the schedulers
+
+        :param results: check results
+        :type results: list
+        :return: None
+        """
+        self.unprocessed_check_results.extend(results)
+        statsmgr.counter('check-results.added', len(results))
+
     def setup_new_conf(self):
         """Receiver custom setup_new_conf method
 
@@ -309,6 +321,44 @@ class Receiver(Satellite):
         statsmgr.gauge('external-commands.pushed.all', count_pushed_commands)
         statsmgr.gauge('external-commands.failed.all', count_failed_commands)
 
+    def push_check_results_to_schedulers(self):
+        """Push the received passive check results to the schedulers
+
+        :return: None
+        """
+        if not self.unprocessed_check_results or not self.external_commands_manager:
+            return
+
+        results = self.unprocessed_check_results
+        self.unprocessed_check_results = []
+        # Dispatch the results to the schedulers managing their hosts
+        self.external_commands_manager.process_check_results(results)
+
+        count_pushed_results = 0
+        for link in list(self.schedulers.values()):
+            results = link.pushed_results
+            if not results:
+                continue
+            # Whether we send the results or not, clean the scheduler list
+            link.pushed_results = []
+
+            if not link.active:
+                logger.warning("The scheduler '%s' is not active, %d check results are "
+                               "dropped!", link.name, len(results))
+                continue
+
+            logger.debug("Sending %d check results to scheduler %s", len(results), link.name)
+            sent = False
+            try:
+                sent = link.push_check_results(results)
+            except LinkError:
+                logger.warning("Scheduler connection failed, I could not push check results!")
+            if sent:
+                count_pushed_results += len(results)
+            else:
+                statsmgr.gauge('check-results.failed.%s' % link.name, len(results))
+        statsmgr.gauge('check-results.pushed.all', count_pushed_results)
+
     def do_loop_turn(self):
         """Receiver daemon main loop
 
@@ -340,6 +390,10 @@ class Receiver(Satellite):
         self.push_external_commands_to_schedulers()
         statsmgr.timer('external-commands.pushed.time', time.time() - _t0)
 
+        _t0 = time.time()
+        self.push_check_results_to_schedulers()
+        statsmgr.timer('check-results.pushed.time', time.time() - _t0)
+
         # Say to modules it's a new tick :)
         _t0 = time.time()
         self.hook_point('tick')
@@ -359,6 +413,7 @@ class Receiver(Satellite):
         counters = res['counters']
         counters['external-commands'] = len(self.external_commands)
         counters['external-commands-unprocessed'] = len(self.unprocessed_external_commands)
+        counters['check-results-unprocessed'] = len(self.unprocessed_check_results)
 
         return res
 
@@ -139,13 +139,8 @@ class Alignak(BaseSatellite):
 
         for broker_link in list(self.brokers.values()):
             if broker_name == broker_link.name:
-                for brok in sorted(broker_link.broks, key=lambda x: x.creation_time):
-                    # Only provide broks that did not yet sent to our external modules
-                    if getattr(brok, 'sent_to_externals', False):
-                        res.append(brok)
-                        brok.got = True
-                        logger.debug("brok: %s", brok)
-                broker_link.broks = [b for b in broker_link.broks if not getattr(b, 'got', False)]
+                # Only provide broks that were already sent to our external modules
+                res = broker_link.broks.drain()
                 logger.debug("Providing %d broks to %s", len(res), broker_name)
                 break
         else:
@@ -176,6 +171,8 @@ class Alignak(BaseSatellite):
             host.compensate_system_time_change(difference)
         for serv in self.sched.services:
             serv.compensate_system_time_change(difference)
+        # Their scheduling is to be computed again
+        self.sched.reschedule_items()
 
         # Now all checks and actions
         for chk in list(self.sched.checks.values()):
@@ -327,15 +324,29 @@ class Alignak(BaseSatellite):
                 self.cur_conf['conf_part'] = None
             conf_part = self.cur_conf['conf_part']
 
+            # The arbiter may only push the difference with the configuration I manage
+            conf_diff = self.cur_conf.get('conf_diff', None)
+            if conf_diff and (self.sched.pushed_conf is None or
+                              self.sched.push_flavor != conf_diff['base']):
+                logger.warning("Received a configuration difference for a configuration (%s) "
+                               "that I do not manage, waiting for the whole configuration...",
+                               conf_diff['base'])
+                self.cur_conf = {}
+                return
+
             # Ok now we can save the retention data
-            if self.sched.pushed_conf is not None:
+            if self.sched.pushed_conf is not None and not conf_diff:
                 self.sched.update_retention()
 
             # Get the monitored objects configuration
             t00 = time.time()
             received_conf_part = None
             try:
-                received_conf_part = unserialize(conf_part)
+                if conf_diff:
+                    # My current configuration will be updated in place
+                    received_conf_part = self.sched.pushed_conf
+                else:
+                    received_conf_part = unserialize(conf_part)
                 assert received_conf_part is not None
             except AssertionError as exp:
                 # This to indicate that no configuration is managed by this scheduler...
@@ -438,7 +449,12 @@ class Alignak(BaseSatellite):
                 else:
                     logger.info("I do not have modules")
 
-            if received_conf_part:
+            if conf_diff:
+                logger.info("Updating configuration...")
+                self.sched.update_conf(conf_diff)
+                self.sched.push_flavor = self.cur_conf['push_flavor']
+
+            elif received_conf_part:
                 logger.info("Loading configuration...")
 
                 # Propagate the global parameters to the configuration items
@@ -452,6 +468,7 @@ class Alignak(BaseSatellite):
 
                 # Once loaded, the scheduler has an inner pushed_conf object
                 logger.info("Loaded: %s", self.sched.pushed_conf)
+                self.sched.push_flavor = self.cur_conf.get('push_flavor', self.sched.push_flavor)
 
                 # Update the scheduler ticks according to the daemon configuration
                 self.sched.update_recurrent_works_tick(self)
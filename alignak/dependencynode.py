@@ -50,6 +50,12 @@
 """
 This module provides DependencyNode and DependencyNodeFactory used for parsing
 expression (business rules)
+
+In the scheduler, the business rules trees are attached to the hosts and services they
+depend on: each leaf node is registered in its item and the nodes states are cached.
+The attributes a leaf node state depends on are DependencyAttribute descriptors
+(see SchedulingItem) that tell the leaf nodes about each change, so that only the nodes
+above a modified item are re-evaluated, bottom-up, while their state changes.
 """
 import re
 from alignak.util import (
@@ -68,6 +74,33 @@ from alignak.util import (
     filter_service_by_host_bp_rule_label)
 
 from alignak.misc.serialization import serialize, unserialize
+from alignak.livesynthesis import SynthesisAttribute
+
+
+class DependencyAttribute(SynthesisAttribute):  # pylint: disable=too-few-public-methods
+    """Data descriptor used for the host / service attributes the business rules states
+    depend on
+
+    The business rules leaf nodes the item is attached to (if any) are told about each change.
+    The attribute may also be one the live synthesis depends on.
+    """
+    def __init__(self, name, synthesis=False):
+        super(DependencyAttribute, self).__init__(name)
+        self.synthesis = synthesis
+
+    def __set__(self, obj, value):
+        old_value = obj.__dict__.get(self.name)
+        if self.synthesis:
+            super(DependencyAttribute, self).__set__(obj, value)
+        else:
+            obj.__dict__[self.name] = value
+        if old_value != value:
+            for node in obj.__dict__.get('_dependency_nodes', ()):
+                node.item_changed(obj)
+
+
+# The DependencyNode attributes its state depends on, apart from its sons states
+NODE_RULE_ATTRIBUTES = ('operand', 'of_values', 'is_of_mul', 'not_value')
 
 
 class DependencyNode(object):
@@ -83,6 +116,10 @@ class DependencyNode(object):
         self.is_of_mul = False
         self.configuration_errors = []
         self.not_value = False
+        # Only when the node is attached to the scheduler hosts / services
+        self.parent = None
+        self.item = None
+        self.cached_state = None
         if params is not None:
             if 'operand' in params:
                 self.operand = params['operand']
@@ -102,6 +139,15 @@ class DependencyNode(object):
                                                           self.not_value)
     __str__ = __repr__
 
+    def __setattr__(self, name, value):
+        super(DependencyNode, self).__setattr__(name, value)
+        # The rule of an attached node changed
+        if name in NODE_RULE_ATTRIBUTES and self.__dict__.get('cached_state') is not None:
+            if self.item is not None:
+                self.set_cached_state(self.get_item_node_state(self.item))
+            else:
+                self.set_cached_state(self.compute_state(None, None))
+
     def serialize(self, no_json=True, printing=False):
         """This function serialize into a simple dict object.
         It is used when transferring data to other daemons over the network (http)
@@ -147,6 +193,20 @@ class DependencyNode(object):
     def get_state(self, hosts, services):
         """Get node state by looking recursively over sons and applying operand
 
+        The state of an attached node is cached and returned at once.
+
+        :param hosts: list of available hosts to search for
+        :param services: list of available services to search for
+        :return: Node state
+        :rtype: int
+        """
+        if self.cached_state is not None:
+            return self.cached_state
+        return self.compute_state(hosts, services)
+
+    def compute_state(self, hosts, services):
+        """Compute node state from the sons states and the operand
+
         :param hosts: list of available hosts to search for
         :param services: list of available services to search for
         :return: Node state
@@ -155,15 +215,9 @@ class DependencyNode(object):
         # If we are a host or a service, we just got the host/service
         # hard state
         if self.operand == 'host':
-            host = hosts[self.sons[0]]
-            return self.get_host_node_state(host.last_hard_state_id,
-                                            host.problem_has_been_acknowledged,
-                                            host.in_scheduled_downtime)
+            return self.get_item_node_state(hosts[self.sons[0]])
         if self.operand == 'service':
-            service = services[self.sons[0]]
-            return self.get_service_node_state(service.last_hard_state_id,
-                                               service.problem_has_been_acknowledged,
-                                               service.in_scheduled_downtime)
+            return self.get_item_node_state(services[self.sons[0]])
         if self.operand == '|':
             return self.get_complex_or_node_state(hosts, services)
 
@@ -177,6 +231,98 @@ class DependencyNode(object):
         # We have an unknown node. Code is not reachable because we validate operands
         return 4
 
+    def get_item_node_state(self, item):
+        """Get the state of an host or service node from its item
+
+        :param item: the host or service of the node
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: 0, 1 or 2
+        :rtype: int
+        """
+        if self.operand == 'host':
+            return self.get_host_node_state(item.last_hard_state_id,
+                                            item.problem_has_been_acknowledged,
+                                            item.in_scheduled_downtime)
+        return self.get_service_node_state(item.last_hard_state_id,
+                                           item.problem_has_been_acknowledged,
+                                           item.in_scheduled_downtime)
+
+    def attach(self, hosts, services, parent=None):
+        """Attach the node and its sons to the hosts and services they depend on
+        and cache their states
+
+        :param hosts: hosts objects
+        :type hosts: alignak.objects.host.Hosts
+        :param services: services objects
+        :type services: alignak.objects.service.Services
+        :param parent: parent node, None for the root node
+        :type parent: alignak.dependencynode.DependencyNode
+        :return: None
+        """
+        self.parent = parent
+        if self.operand in ['host', 'service']:
+            self.item = hosts[self.sons[0]] if self.operand == 'host' else services[self.sons[0]]
+            nodes = self.item.__dict__.setdefault('_dependency_nodes', [])
+            if self not in nodes:
+                nodes.append(self)
+        else:
+            for son in self.sons:
+                son.attach(hosts, services, self)
+        self.cached_state = None
+        self.cached_state = self.compute_state(hosts, services)
+
+    def detach(self):
+        """Detach the node and its sons from the hosts and services they depend on
+
+        :return: None
+        """
+        self.parent = None
+        self.cached_state = None
+        if self.item is not None:
+            nodes = self.item.__dict__.get('_dependency_nodes', [])
+            if self in nodes:
+                nodes.remove(self)
+            self.item = None
+            return
+        for son in self.sons:
+            son.detach()
+
+    def is_attached(self):
+        """Is the node attached to the hosts and services it depends on?
+
+        :return: True if the node state is cached
+        :rtype: bool
+        """
+        return self.cached_state is not None
+
+    def item_changed(self, item):
+        """Called by the item of an attached host or service node when one of the attributes
+        its state depends on changed. The node and its parents are re-evaluated, bottom-up,
+        while their state changes.
+
+        :param item: the host or service of the node
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        self.set_cached_state(self.get_item_node_state(item))
+
+    def set_cached_state(self, state):
+        """Update the cached state of an attached node and re-evaluate its parents,
+        bottom-up, while their state changes
+
+        :param state: new node state
+        :type state: int
+        :return: None
+        """
+        node = self
+        while node is not None and node.cached_state is not None \
+                and node.cached_state != state:
+            node.cached_state = state
+            node = node.parent
+            if node is not None:
+                # The sons states are cached, no need for the hosts / services
+                state = node.compute_state(None, None)
+
     def get_host_node_state(self, state, problem_has_been_acknowledged, in_scheduled_downtime):
         """Get host node state, simplest case ::
 
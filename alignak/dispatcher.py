@@ -65,6 +65,7 @@ import time
 import random
 
 from alignak.misc.serialization import serialize
+from alignak.configdigest import ConfigurationDigest
 from alignak.util import master_then_spare
 from alignak.objects.satellitelink import LinkError
 from alignak.property import FULL_STATUS
@@ -97,7 +98,7 @@ class Dispatcher(object):
     It has to handle spare, realms, poller tags etc.
     """
 
-    def __init__(self, conf, arbiter_link):
+    def __init__(self, conf, arbiter_link, digests=None):
         # pylint: disable=too-many-branches
         """Initialize the dispatcher
 
@@ -108,6 +109,9 @@ class Dispatcher(object):
         :type conf: Config
         :param arbiter_link: the link to the arbiter that parsed this configuration
         :type arbiter_link: ArbiterLink
+        :param digests: configuration digests of the former dispatcher, used to only push
+                        the configuration differences to the schedulers
+        :type digests: dict
         """
         if not arbiter_link or not hasattr(conf, 'parts'):
             raise DispatcherError("Dispatcher configuration problem: "
@@ -199,6 +203,13 @@ class Dispatcher(object):
                 continue
             daemon_link.need_conf = True
 
+        # Digests of the configuration parts dispatched to the schedulers: scheduler name ->
+        # ConfigurationDigest. The former ones are used once, for the first dispatch
+        self.digests = {}
+        self.former_digests = {}
+        if getattr(self.alignak_conf, 'differential_conf_push', False):
+            self.former_digests = digests or {}
+
         # Some flag about dispatch needed or not
         self.dispatch_ok = False
         self.new_to_dispatch = False
@@ -652,12 +663,22 @@ class Dispatcher(object):
                                 len(cfg_part.hosts.templates), len(cfg_part.services.templates))
 
                     # Serialization and hashing
-                    s_conf_part = serialize(realm.parts[cfg_part.instance_id], no_json=False)
-                    try:
-                        s_conf_part = s_conf_part.encode('utf-8')
-                    except UnicodeDecodeError:
-                        pass
-                    cfg_part.push_flavor = hashlib.sha1(s_conf_part).hexdigest()
+                    conf_diff = None
+                    if getattr(self.alignak_conf, 'differential_conf_push', False):
+                        former_digest = self.former_digests.pop(scheduler_link.name, None)
+                        digest, s_conf_part = ConfigurationDigest.build(cfg_part, former_digest)
+                        conf_diff = digest.get_diff(former_digest, s_conf_part)
+                        self.digests[scheduler_link.name] = digest
+                        cfg_part.push_flavor = digest.push_flavor
+                    else:
+                        s_conf_part = serialize(realm.parts[cfg_part.instance_id],
+                                                no_json=False)
+                        try:
+                            s_conf_part = s_conf_part.encode('utf-8')
+                        except UnicodeDecodeError:
+                            pass
+                        cfg_part.push_flavor = hashlib.sha1(s_conf_part).hexdigest()
+                        s_conf_part = serialize(realm.parts[cfg_part.instance_id])
 
                     # We generate the scheduler configuration for the satellites:
                     # ---
@@ -692,7 +713,7 @@ class Dispatcher(object):
 
                         'modules': serialize(scheduler_link.modules, True),
 
-                        'conf_part': serialize(realm.parts[cfg_part.instance_id]),
+                        'conf_part': s_conf_part,
                         'managed_conf_id': cfg_part.instance_id,
                         'push_flavor': cfg_part.push_flavor,
 
@@ -703,6 +724,20 @@ class Dispatcher(object):
                     cfg_string = serialize(scheduler_link.cfg, no_json=False).encode('utf-8')
                     scheduler_link.cfg['hash'] = hashlib.sha1(cfg_string).hexdigest()
 
+                    # Only the configuration difference is pushed, the whole configuration
+                    # is pushed if the scheduler does not manage the former configuration
+                    scheduler_link.cfg_diff = None
+                    if conf_diff is not None:
+                        scheduler_link.cfg_diff = dict(scheduler_link.cfg, conf_part=None,
+                                                       conf_diff=conf_diff)
+                        logger.info("   scheduler configuration difference: "
+                                    "%d changed hosts, %d removed hosts, "
+                                    "%d changed services, %d removed services",
+                                    len(conf_diff['hosts']['changed']),
+                                    len(conf_diff['hosts']['removed']),
+                                    len(conf_diff['services']['changed']),
+                                    len(conf_diff['services']['removed']))
+
                     # Dump the configuration part size
                     pickled_conf = pickle.dumps(scheduler_link.cfg)
                     logger.info("   scheduler configuration size: %d bytes",
@@ -910,7 +945,11 @@ class Dispatcher(object):
             logger.info("Sending configuration to the scheduler %s", link.name)
             logger.debug("- %s", link.cfg)
 
-            link.put_conf(link.cfg, test=test)
+            cfg = link.cfg
+            if link.cfg_diff:
+                logger.info("- only the configuration difference")
+                cfg, link.cfg_diff = link.cfg_diff, None
+            link.put_conf(cfg, test=test)
             link.configuration_sent = True
 
             logger.info("- sent")
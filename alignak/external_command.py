@@ -118,7 +118,7 @@ class ExternalCommand(object):
                 "creation_timestamp": self.creation_timestamp}
 
 
-class ExternalCommandManager(object):
+class ExternalCommandManager(object):  # pylint: disable=too-many-instance-attributes
     """ExternalCommandManager manages all external commands sent to Alignak.
 
     It basically parses arguments and executes the right function
@@ -526,8 +526,11 @@ class ExternalCommandManager(object):
                 self.timeperiods = conf.timeperiods
 
         self.cfg_parts = None
+        # Host name -> configuration part index, to find the scheduler of an host
+        self.hosts_parts = {}
         if self.mode == 'dispatcher':
             self.cfg_parts = conf.parts
+            self.build_hosts_parts_index()
 
         self.accept_passive_unknown_check_results = accept_unknown
         self.log_external_commands = log_external_commands
@@ -538,6 +541,21 @@ class ExternalCommandManager(object):
         # it can get it
         self.current_timestamp = 0
 
+    def build_hosts_parts_index(self):
+        """Build the index of the configuration part each host belongs to
+
+        The configuration parts do not change once the configuration is loaded, whereas the
+        scheduler a part is assigned to may change on each configuration dispatch. Thus the
+        index does not store the scheduler link but the configuration part.
+
+        :return: None
+        """
+        self.hosts_parts = {}
+        for cfg_part in list(self.cfg_parts.values()):
+            for host in cfg_part.hosts:
+                self.hosts_parts[host.host_name] = cfg_part
+        logger.debug("External commands dispatcher index: %d hosts", len(self.hosts_parts))
+
     def send_an_element(self, element):
         """Send an element (Brok, Comment,...) to our daemon
 
@@ -607,6 +625,16 @@ class ExternalCommandManager(object):
                          excmd.creation_timestamp, time.time() - excmd.creation_timestamp)
             statsmgr.timer('external-commands.latency', time.time() - excmd.creation_timestamp)
             getattr(self, c_name)(*args)
+
+            if self.mode == 'applyer':
+                # The command may have changed the concerned hosts/services scheduling
+                # and retention data. For the commands that are not related to an
+                # host/service (global or group commands), all the hosts/services are
+                # to be scheduled again
+                items = [arg for arg in args
+                         if getattr(arg, 'my_type', None) in ['host', 'service']]
+                self.daemon.reschedule_items(items or None)
+                self.daemon.set_retention_dirty(items or None)
         else:
             # Send command to all our schedulers
             for scheduler_link in self.my_conf.schedulers:
@@ -645,20 +673,20 @@ class ExternalCommandManager(object):
             else:
                 logger.warning("I did not found a scheduler for the host: %s", host_name)
         else:
-            for cfg_part in list(self.cfg_parts.values()):
-                if cfg_part.hosts.find_by_name(host_name) is not None:
-                    logger.debug("Host %s found in a configuration", host_name)
-                    if cfg_part.is_assigned:
-                        host_found = True
-                        scheduler_link = cfg_part.scheduler_link
-                        logger.debug("Sending command to the scheduler %s", scheduler_link.name)
-                        scheduler_link.push_external_commands([command])
-                        # scheduler_link.my_daemon.external_commands.append(command)
-                        break
-                    else:
-                        logger.warning("Problem: the host %s was found in a configuration, "
-                                       "but this configuration is not assigned to any scheduler!",
-                                       host_name)
+            cfg_part = self.hosts_parts.get(host_name)
+            if cfg_part is not None:
+                logger.debug("Host %s found in a configuration", host_name)
+                if cfg_part.is_assigned:
+                    host_found = True
+                    scheduler_link = cfg_part.scheduler_link
+                    logger.debug("Preparing an external command for the scheduler %s",
+                                 scheduler_link.name)
+                    # The command will be pushed with the other commands for this scheduler
+                    scheduler_link.pushed_commands.append(command)
+                else:
+                    logger.warning("Problem: the host %s was found in a configuration, "
+                                   "but this configuration is not assigned to any scheduler!",
+                                   host_name)
         if not host_found:
             if self.accept_passive_unknown_check_results:
                 brok = self.get_unknown_check_result_brok(command)
@@ -709,6 +737,117 @@ class ExternalCommandManager(object):
 
         return Brok({'type': 'unknown_%s_check_result' % match.group(2).lower(), 'data': data})
 
+    @staticmethod
+    def parse_check_result(result):
+        """Check and normalize a structured passive check result
+
+        A check result is a dictionary with the `host`, `service` (only for a service check
+        result), `return_code`, `output` and `timestamp` (optional, default is now) keys.
+
+        :param result: check result
+        :type result: dict
+        :return: host name, service description, return code, output and timestamp,
+                 or None if the result is not valid
+        :rtype: tuple | None
+        """
+        try:
+            host_name = result['host']
+            return_code = int(result['return_code'])
+            timestamp = int(result.get('timestamp', None) or time.time())
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+        if not host_name:
+            return None
+        return (host_name, result.get('service', None) or None, return_code,
+                result.get('output', None) or u'', timestamp)
+
+    def process_check_results(self, results):
+        """Process a list of structured passive check results
+
+        This is a fast path for the PROCESS_HOST_CHECK_RESULT and PROCESS_SERVICE_CHECK_RESULT
+        commands: the results are not formatted as command lines to be parsed, and the hosts
+        and services are directly got from their name index. This index (the Hosts and
+        Services `name_to_item`) is built once per configuration and maintained when the
+        configuration is updated.
+
+        The passive check created for a result is added to the scheduler checks with the
+        waiting to be consumed status: it is consumed on the next scheduler loop turn, without
+        passing through the scheduler waiting results queue that is used for the checks
+        results got from the satellites.
+
+        In the receiver mode, the results are dispatched to the schedulers managing
+        their hosts, else the results are processed as the corresponding external commands.
+
+        :param results: check results (see `parse_check_result`)
+        :type results: list
+        :return: number of accepted check results
+        :rtype: int
+        """
+        count = 0
+        items = []
+        for result in results:
+            parsed = self.parse_check_result(result)
+            if parsed is None:
+                logger.warning("Received a badly formatted check result: %s", result)
+                continue
+            host_name, service_description, return_code, output, timestamp = parsed
+
+            if self.mode == 'receiver':
+                scheduler_link = self.daemon.get_scheduler_from_hostname(host_name)
+                if scheduler_link:
+                    scheduler_link.pushed_results.append(result)
+                    count += 1
+                    continue
+                item = None
+            elif service_description:
+                item = self.services.find_srv_by_name_and_hostname(host_name,
+                                                                   service_description)
+            else:
+                item = self.hosts.find_by_name(host_name)
+
+            if item is None:
+                self.unknown_check_result(parsed)
+                continue
+
+            self.current_timestamp = timestamp
+            if service_description:
+                self.process_service_check_result(item, return_code, output)
+            else:
+                self.process_host_check_result(item, return_code, output)
+            items.append(item)
+            count += 1
+
+        if items and self.mode == 'applyer':
+            self.daemon.reschedule_items(items)
+            self.daemon.set_retention_dirty(items)
+        statsmgr.counter('external-commands.check-results', count)
+        return count
+
+    def unknown_check_result(self, parsed):
+        """Manage a check result received for an unknown host or service
+
+        :param parsed: parsed check result (see `parse_check_result`)
+        :type parsed: tuple
+        :return: None
+        """
+        host_name, service_description, return_code, output, timestamp = parsed
+        if not self.accept_passive_unknown_check_results:
+            logger.warning("A check result was received for the unknown %s '%s'",
+                           'service' if service_description else 'host',
+                           '%s/%s' % (host_name, service_description)
+                           if service_description else host_name)
+            return
+
+        output, _, perf_data = output.partition('|')
+        data = {'time_stamp': timestamp, 'host_name': host_name,
+                'return_code': u'%d' % return_code, 'output': output,
+                'perf_data': perf_data or None}
+        brok_type = 'unknown_host_check_result'
+        if service_description:
+            data['service_description'] = service_description
+            brok_type = 'unknown_service_check_result'
+        self.send_an_element(Brok({'type': brok_type, 'data': data}))
+
     def get_command_and_args(self, command, extcmd=None):
         # pylint: disable=too-many-return-statements, too-many-nested-blocks
         # pylint: disable=too-many-locals,too-many-branches,too-many-statements
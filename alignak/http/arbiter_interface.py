@@ -25,6 +25,7 @@ import logging
 import json
 import cherrypy
 
+from alignak.http.cherrypy_extend import SERIALIZED_CONTENT_TYPES, serialized_processor
 from alignak.http.generic_interface import GenericInterface
 from alignak.util import split_semicolon
 from alignak.external_command import ExternalCommand
@@ -1638,7 +1639,7 @@ class ArbiterInterface(GenericInterface):
             self.app.cur_conf = {}
 
     @cherrypy.expose
-    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_in(content_type=SERIALIZED_CONTENT_TYPES, processor=serialized_processor)
     @cherrypy.tools.json_out()
     def _push_configuration(self, pushed_configuration=None):
         """Send a new configuration to the daemon
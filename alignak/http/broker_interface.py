@@ -20,6 +20,7 @@
 import logging
 import cherrypy
 
+from alignak.http.cherrypy_extend import SERIALIZED_CONTENT_TYPES, serialized_processor
 from alignak.http.generic_interface import GenericInterface
 from alignak.misc.serialization import unserialize
 
@@ -39,7 +40,7 @@ class BrokerInterface(GenericInterface):
     #####
 
     @cherrypy.expose
-    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_in(content_type=SERIALIZED_CONTENT_TYPES, processor=serialized_processor)
     @cherrypy.tools.json_out()
     def _push_broks(self):
         """Push the provided broks objects to the broker daemon
@@ -27,7 +27,14 @@ import zlib
 import cherrypy
 from cherrypy._cpcompat import ntou
 
-from alignak.misc.serialization import unserialize, AlignakClassLookupException
+from alignak.misc.serialization import (serialize, unserialize, AlignakClassLookupException,
+                                        binary_codec_available, encode_binary, decode_binary,
+                                        JSON_CONTENT_TYPE, BINARY_CONTENT_TYPE)
+
+# Content types of the serialized data that the daemons accept to receive
+SERIALIZED_CONTENT_TYPES = [ntou(JSON_CONTENT_TYPE)]
+if binary_codec_available():
+    SERIALIZED_CONTENT_TYPES.append(ntou(BINARY_CONTENT_TYPE))
 
 
 def zlib_processor(entity):  # pragma: no cover, not used in the testing environment...
@@ -68,3 +75,72 @@ def zlib_processor(entity):  # pragma: no cover, not used in the testing environ
             entity.params[key].append(value)
         else:
             entity.params[key] = value
+
+
+def serialized_processor(entity):
+    """Read application/json or application/x-msgpack data into request.json.
+
+    To be used as the processor of the json_in tool for the endpoints receiving
+    serialized data from the other daemons.
+
+    :param entity: cherrypy entity
+    :type entity: cherrypy._cpreqbody.Entity
+    :return: None
+    """
+    if not entity.headers.get(ntou("Content-Length"), ntou("")):
+        raise cherrypy.HTTPError(411)
+
+    body = entity.fp.read()
+    if entity.content_type.value == BINARY_CONTENT_TYPE:
+        with cherrypy.HTTPError.handle(ValueError, 400, 'Invalid binary document'):
+            cherrypy.serving.request.json = decode_binary(body)
+        return
+
+    with cherrypy.HTTPError.handle(ValueError, 400, 'Invalid JSON document'):
+        cherrypy.serving.request.json = json.loads(body.decode('utf-8'))
+
+
+def binary_accepted():
+    """Does the client of the current request accept binary serialized data?
+
+    :return: True if the response may be encoded as application/x-msgpack
+    :rtype: bool
+    """
+    return binary_codec_available() and \
+        BINARY_CONTENT_TYPE in cherrypy.serving.request.headers.get('Accept', '')
+
+
+def serialized_content(value):
+    """Serialize the objects of the request handler result
+
+    The objects are not serialized if the client accepts binary serialized data: the binary
+    encoding packs the objects directly (see serialized_handler).
+
+    :param value: request handler result
+    :type value: list | dict
+    :return: serialized result, or the result itself
+    :rtype: list | dict
+    """
+    if binary_accepted():
+        return value
+    return serialize(value, no_json=True)
+
+
+def serialized_handler(*args, **kwargs):
+    """Encode the request handler result as application/x-msgpack if the client accepts this
+    content type, else as application/json.
+
+    To be used as the handler of the json_out tool for the endpoints sending
+    serialized data to the other daemons.
+
+    :return: encoded data
+    :rtype: bytes
+    """
+    request = cherrypy.serving.request
+    # pylint: disable=protected-access
+    value = request._json_inner_handler(*args, **kwargs)
+    if binary_accepted():
+        cherrypy.serving.response.headers['Content-Type'] = BINARY_CONTENT_TYPE
+        return encode_binary(value)
+
+    return json.dumps(value).encode('utf-8')
@@ -50,7 +50,8 @@ import logging
 import requests
 from requests.adapters import HTTPAdapter
 
-from alignak.misc.serialization import serialize
+from alignak.misc.serialization import (serialize, binary_codec_available, encode_binary,
+                                        decode_binary, JSON_CONTENT_TYPE, BINARY_CONTENT_TYPE)
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -145,6 +146,9 @@ class HTTPClient(object):
         # self.session = requests.Session()
         self._requests_con.header = {'Content-Type': 'application/json'}
 
+        # The server told us it is able to exchange binary serialized data
+        self.binary = False
+
         # Requests HTTP adapters
         http_adapter = HTTPAdapter(max_retries=3)
         https_adapter = HTTPAdapter(max_retries=3)
@@ -187,6 +191,21 @@ class HTTPClient(object):
                 'https': proxy,
             }
 
+    def get_response_data(self, rsp):
+        """Get the data of an HTTP response and update the server capabilities
+
+        The data is decoded according to the response content type: binary or json
+
+        :param rsp: HTTP response
+        :type rsp: requests.Response
+        :return: decoded response data
+        """
+        self.binary = binary_codec_available() and \
+            BINARY_CONTENT_TYPE in rsp.headers.get('X-Alignak-Codecs', '')
+        if rsp.headers.get('Content-Type', '').startswith(BINARY_CONTENT_TYPE):
+            return decode_binary(rsp.content)
+        return rsp.json()
+
     def get(self, path, args=None, wait=False):
         """GET an HTTP request to a daemon
 
@@ -202,13 +221,18 @@ class HTTPClient(object):
             args = {}
         uri = self.make_uri(path)
         timeout = self.make_timeout(wait)
+        headers = None
+        if binary_codec_available():
+            # Accept binary serialized data, the server may not be able to send such data
+            headers = {'Accept': '%s, %s' % (BINARY_CONTENT_TYPE, JSON_CONTENT_TYPE)}
         try:
             logger.debug("get: %s, timeout: %s, params: %s", uri, timeout, args)
-            rsp = self._requests_con.get(uri, params=args, timeout=timeout, verify=self.strong_ssl)
-            logger.debug("got: %d - %s", rsp.status_code, rsp.text)
+            rsp = self._requests_con.get(uri, params=args, headers=headers, timeout=timeout,
+                                         verify=self.strong_ssl)
+            logger.debug("got: %d - %s", rsp.status_code, rsp.headers.get('Content-Type'))
             if rsp.status_code != 200:
                 raise HTTPClientDataException(rsp.status_code, rsp.text, uri)
-            return rsp.json()
+            return self.get_response_data(rsp)
         except (requests.Timeout, requests.ConnectTimeout):  # pragma: no cover
             raise HTTPClientTimeoutException(timeout, uri)
         except requests.ConnectionError as exp:  # pragma: no cover
@@ -230,11 +254,19 @@ class HTTPClient(object):
         """
         uri = self.make_uri(path)
         timeout = self.make_timeout(wait)
-        for (key, value) in list(args.items()):
-            args[key] = serialize(value, True)
+        if not self.binary:
+            # The binary encoding packs the objects directly
+            for (key, value) in list(args.items()):
+                args[key] = serialize(value, True)
         try:
             logger.debug("post: %s, timeout: %s, params: %s", uri, timeout, args)
-            rsp = self._requests_con.post(uri, json=args, timeout=timeout, verify=self.strong_ssl)
+            if self.binary:
+                rsp = self._requests_con.post(uri, data=encode_binary(args),
+                                              headers={'Content-Type': BINARY_CONTENT_TYPE},
+                                              timeout=timeout, verify=self.strong_ssl)
+            else:
+                rsp = self._requests_con.post(uri, json=args, timeout=timeout,
+                                              verify=self.strong_ssl)
             logger.debug("got: %d - %s", rsp.status_code, rsp.text)
             if rsp.status_code != 200:
                 raise HTTPClientDataException(rsp.status_code, rsp.text, uri)
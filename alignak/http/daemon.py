@@ -32,6 +32,7 @@ import cherrypy
 from cherrypy._cpreqbody import process_urlencoded, process_multipart, process_multipart_form_data
 # load global helper objects for logs and stats computation
 from alignak.http.cherrypy_extend import zlib_processor
+from alignak.misc.serialization import binary_codec_available, BINARY_CONTENT_TYPE
 
 
 # Check if PyOpenSSL is installed
@@ -79,6 +80,11 @@ class HTTPDaemon(object):
         self.uri = '%s://%s:%s' % ('https' if self.use_ssl else 'http', self.host, self.port)
         logger.debug("Configured HTTP server on %s, %d threads", self.uri, thread_pool_size)
 
+        # Tell our clients that we are able to exchange binary serialized data
+        headers = [('Access-Control-Allow-Origin', '*')]
+        if binary_codec_available():
+            headers.append(('X-Alignak-Codecs', BINARY_CONTENT_TYPE))
+
         # This application config overrides the default processors
         # so we put them back in case we need them
         config = {
@@ -88,10 +94,10 @@ class HTTPDaemon(object):
                                             'multipart': process_multipart,
                                             'application/zlib': zlib_processor},
                 'tools.gzip.on': True,
-                'tools.gzip.mime_types': ['text/*', 'application/json'],
+                'tools.gzip.mime_types': ['text/*', 'application/json', BINARY_CONTENT_TYPE],
 
                 'tools.response_headers.on': True,
-                'tools.response_headers.headers': [('Access-Control-Allow-Origin', '*')],
+                'tools.response_headers.headers': headers,
 
                 'tools.staticfile.on': True if icon_file else False,
                 'tools.staticfile.filename': icon_file
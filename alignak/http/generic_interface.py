@@ -34,7 +34,8 @@ import time
 import cherrypy
 
 from alignak.log import ALIGNAK_LOGGER_NAME
-from alignak.misc.serialization import serialize
+from alignak.http.cherrypy_extend import (SERIALIZED_CONTENT_TYPES, serialized_processor,
+                                          serialized_handler, serialized_content)
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -285,7 +286,7 @@ class GenericInterface(object):
             self.app.cur_conf = {}
 
     @cherrypy.expose
-    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_in(content_type=SERIALIZED_CONTENT_TYPES, processor=serialized_processor)
     @cherrypy.tools.json_out()
     def _push_configuration(self, pushed_configuration=None):
         """Send a new configuration to the daemon
@@ -329,7 +330,7 @@ class GenericInterface(object):
         return self.app.have_conf
 
     @cherrypy.expose
-    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_in(content_type=SERIALIZED_CONTENT_TYPES, processor=serialized_processor)
     @cherrypy.tools.json_out()
     def _push_actions(self):
         """Push actions to the poller/reactionner
@@ -347,7 +348,7 @@ class GenericInterface(object):
     _push_actions.method = 'post'
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=serialized_handler)
     def _external_commands(self):
         """Get the external commands from the daemon
 
@@ -363,7 +364,7 @@ class GenericInterface(object):
         return res
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=serialized_handler)
     def _results(self, scheduler_instance_id):
         """Get the results of the executed actions for the scheduler which instance id is provided
 
@@ -387,8 +388,8 @@ class GenericInterface(object):
             #     logger.warning("-: %s", a)
             #     logger.warning("-: %s", a.__dict__)
 
-            # Serialize but do not make it json encoded
-            res = serialize(res, no_json=True)
+            # Serialize but do not json encode (the binary encoding packs objects)
+            res = serialized_content(res)
         except Exception as exp:
             logger.warning("_results, exception: %s", exp)
             res = []
@@ -396,7 +397,7 @@ class GenericInterface(object):
         return res
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=serialized_handler)
     def _broks(self, broker_name):  # pylint: disable=unused-argument
         """Get the broks from the daemon
 
@@ -409,8 +410,8 @@ class GenericInterface(object):
             with self.app.broks_lock:
                 res = self.app.give_broks()
 
-            # Serialize but do not make it json encoded
-            res = serialize(res, no_json=True)
+            # Serialize but do not json encode (the binary encoding packs objects)
+            res = serialized_content(res)
         except Exception as exp:
             logger.warning("_broks, exception: %s", exp)
             res = []
@@ -418,7 +419,7 @@ class GenericInterface(object):
         return res
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=serialized_handler)
     def _events(self):
         """Get the monitoring events from the daemon
 
@@ -431,8 +432,8 @@ class GenericInterface(object):
             with self.app.events_lock:
                 res = self.app.get_events()
 
-                # Serialize but do not make it json encoded
-                res = serialize(res, no_json=True)
+                # Serialize but do not json encode (the binary encoding packs objects)
+                res = serialized_content(res)
         except Exception as exp:
             logger.warning("_events, exception: %s", exp)
             res = []
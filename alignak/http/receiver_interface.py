@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provide a specific HTTP interface for a Receiver."""
+import logging
+import cherrypy
+
+from alignak.http.cherrypy_extend import SERIALIZED_CONTENT_TYPES, serialized_processor
+from alignak.http.generic_interface import GenericInterface
+from alignak.external_command import ExternalCommandManager
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class ReceiverInterface(GenericInterface):
+    """This class provides specific HTTP functions for the Receiver daemons."""
+
+    @cherrypy.expose
+    @cherrypy.tools.json_in(content_type=SERIALIZED_CONTENT_TYPES, processor=serialized_processor)
+    @cherrypy.tools.json_out()
+    def check_results(self):
+        """Post some passive check results to the receiver
+
+        The posted data is an object with a `results` property containing a list of check
+        results. Each check result is an object with the `host`, `service` (only for a service
+        check result), `return_code`, `output` and `timestamp` (optional) properties.
+
+        The check results are dispatched to the schedulers managing their hosts. This is
+        a faster alternative to the PROCESS_HOST_CHECK_RESULT and PROCESS_SERVICE_CHECK_RESULT
+        external commands.
+
+        :return: number of accepted check results
+        :rtype: dict
+        """
+        results = cherrypy.request.json.get('results', None)
+        if not isinstance(results, list):
+            return {'_status': u'ERR', '_message': u"Missing check results list"}
+
+        accepted = []
+        for result in results:
+            if ExternalCommandManager.parse_check_result(result) is None:
+                logger.warning("Received a badly formatted check result: %s", result)
+                continue
+            accepted.append(result)
+        self.app.add_check_results(accepted)
+
+        return {'_status': u'OK', '_message': u"Got %d check results" % len(accepted),
+                'accepted': len(accepted), 'rejected': len(results) - len(accepted)}
@@ -18,15 +18,18 @@
 # along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
 """This module provide a specific HTTP interface for a Scheduler."""
 
+import os
+import time
 import logging
-import traceback
-import collections
 from collections import OrderedDict
 
 import cherrypy
 
+from alignak.http.cherrypy_extend import (SERIALIZED_CONTENT_TYPES, serialized_processor,
+                                          serialized_handler, serialized_content)
 from alignak.http.generic_interface import GenericInterface
-from alignak.misc.serialization import serialize, unserialize
+from alignak.misc.serialization import unserialize
+from alignak.snapshot import SchedulerSnapshot
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -53,6 +56,9 @@ class SchedulerInterface(GenericInterface):
         - content: the serialized object content
         - __sys_python_module__: the python class of the returned object
 
+        The object is got from the scheduler published snapshot. If the object is not yet in
+        the snapshot, the query waits for the next snapshot, that will hold a copy of the object.
+
         The Alignak unserialize function of the alignak.misc.serialization package allows
         to restore the initial object.
 
@@ -108,7 +114,14 @@ class SchedulerInterface(GenericInterface):
         :return: serialized object information
         :rtype: str
         """
-        o_found = self._get_object(o_type=o_type, o_name=o_name)
+        snapshot = self._get_snapshot((o_type, o_name))
+        if snapshot is None:
+            # No published snapshot, get the object from the live objects
+            o_found = self.app.sched.get_serialized_object(o_type, o_name)
+        elif (o_type, o_name) not in snapshot.objects:
+            return {'_status': u'ERR', '_message': u'Required %s not yet available.' % o_type}
+        else:
+            o_found = snapshot.objects[(o_type, o_name)]
         if not o_found:
             return {'_status': u'ERR', '_message': u'Required %s not found.' % o_type}
         return o_found
@@ -211,7 +224,7 @@ class SchedulerInterface(GenericInterface):
 
         def get_host_info(host, services, details=False, raw=False):
             # pylint: disable=too-many-branches
-            """Get the host information
+            """Get the host information from its state record
 
             :return: None
             """
@@ -232,71 +245,39 @@ class SchedulerInterface(GenericInterface):
                 ]
 
             host_data = OrderedDict({'type': 'host',
-                                     'host': host.get_name(),
-                                     'name': host.get_name()})
+                                     'host': host['name'],
+                                     'name': host['name']})
             __header__ = ['type', 'host', 'name']
             for key in __props__:
-                if hasattr(host, key):
+                if key in host:
                     __header__.append(key)
-                    if isinstance(getattr(host, key), collections.Callable):
-                        host_data[key] = getattr(host, key)(services)
-                    elif isinstance(getattr(host, key), set):
-                        host_data[key] = list(getattr(host, key))
-                    else:
-                        host_data[key] = getattr(host, key)
+                    host_data[key] = host[key]
             if raw:
                 host_data['_header_host'] = __header__
 
             host_data['services'] = []
             __header__ = ['type', 'host', 'name']
-            for service in host.services:
+            for service in host['services']:
                 service = services[service]
                 service_data = OrderedDict({'type': 'service',
-                                            'host': host.get_name(),
-                                            'name': service.get_name()})
+                                            'host': host['name'],
+                                            'name': service['name']})
                 for key in __props__:
-                    if hasattr(service, key):
+                    if key in service:
                         if key not in __header__:
                             __header__.append(key)
-                        if isinstance(getattr(service, key), collections.Callable):
-                            service_data[key] = getattr(services, key)()
-                        elif isinstance(getattr(service, key), set):
-                            service_data[key] = list(getattr(service, key))
-                        else:
-                            service_data[key] = getattr(service, key)
+                        service_data[key] = service[key]
                 host_data['services'].append(service_data)
             if raw:
                 host_data['_header_service'] = __header__
 
             return host_data
 
-        if details is not False:
-            details = bool(details)
-        if raw is not False:
-            raw = bool(raw)
-
-        ls = []
-        try:
-            hosts = self._get_objects('host')
-            services = self._get_objects('service')
-            if o_name is None:
-                for host in hosts:
-                    ls.append(get_host_info(host, services, details=details, raw=raw))
-            else:
-                # Perhaps we got an host uuid...
-                host = hosts.find_by_name(o_name)
-                if o_name in hosts:
-                    host = hosts[o_name]
-
-                if host:
-                    ls.append(get_host_info(host, services, details=False, raw=raw))
-        except Exception as exp:  # pylint: disable=broad-except
-            return str(exp) + " / " + traceback.print_exc()
-
-        if o_name and not host:
-            return {'_status': u'ERR', '_message': u'Required host (%s) not found.' % o_name}
+        def get_raw_dump(ls):
+            """Get the hosts and services information as CSV strings lists
 
-        if raw and ls:
+            :return: hosts and services information lists
+            """
             raw_ls_hosts = []
             _header_host = ['type', 'host', 'name']
             raw_ls_services = []
@@ -323,7 +304,50 @@ class SchedulerInterface(GenericInterface):
 
             return [raw_ls_hosts, raw_ls_services]
 
-        return ls
+        def get_dump(snapshot):
+            """Get the dump response from a snapshot
+
+            :return: list of host and services information
+            """
+            ls = []
+            if o_name is None:
+                for host in snapshot.hosts.values():
+                    ls.append(get_host_info(host, snapshot.services, details=details, raw=raw))
+            else:
+                found = snapshot.find_host(o_name)
+                if not found:
+                    return {'_status': u'ERR',
+                            '_message': u'Required host (%s) not found.' % o_name}
+                ls.append(get_host_info(found[1], snapshot.services, details=False, raw=raw))
+
+            if raw and ls:
+                return get_raw_dump(ls)
+            return ls
+
+        if details is not False:
+            details = bool(details)
+        if raw is not False:
+            raw = bool(raw)
+
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            return snapshot.get_cached(('dump', o_name, details, raw),
+                                       lambda: get_dump(snapshot))
+
+        # No published snapshot, get the information from the live hosts
+        try:
+            hosts = self._get_objects('host')
+            services = self._get_objects('service')
+            if o_name is not None:
+                # Perhaps we got an host uuid...
+                host = hosts.find_by_name(o_name)
+                if o_name in hosts:
+                    host = hosts[o_name]
+                hosts = [host] if host else []
+            return get_dump(SchedulerSnapshot.build(0, hosts, services))
+        except Exception as exp:  # pylint: disable=broad-except
+            logger.exception("dump, exception: %s", exp)
+            return {'_status': u'ERR', '_message': u'%s' % exp}
 
     @cherrypy.expose
     @cherrypy.tools.json_out()
@@ -341,9 +365,78 @@ class SchedulerInterface(GenericInterface):
                     '_message': u"This service is only available for a scheduler daemon"}
 
         res = self.identity()
-        res.update(self.app.get_monitoring_problems())
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            res.update(snapshot.problems)
+        else:
+            res.update(self.app.get_monitoring_problems())
+        return res
+
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    def profile(self, capture=0):
+        """Get the scheduler loop profile
+
+        Returns an object with, for each recurrent work, passive satellites exchange and
+        hook point, the statistics (count, mean, max and p50/p95/p99 percentiles) of its
+        durations and of the number of items it processed during the last minutes.
+
+        If capture is set, a Python profile of the next `capture` scheduler loops is captured
+        and written in the daemon working directory. At most 100 loops are captured.
+
+        :param capture: number of loops to capture a profile for
+        :type capture: int
+        :return: scheduler loop profile
+        :rtype: dict
+        """
+        if self.app.type != 'scheduler':
+            return {'_status': u'ERR',
+                    '_message': u"This service is only available for a scheduler daemon"}
+
+        try:
+            capture = int(capture)
+        except ValueError:
+            return {'_status': u'ERR', '_message': u"The capture parameter must be an integer"}
+
+        res = self.identity()
+        if capture > 0:
+            filename = os.path.join(self.app.workdir, 'scheduler-%s-profile-%d.prof'
+                                    % (self.app.name, int(time.time())))
+            self.app.sched.loop_profiler.request_capture(capture, filename)
+        res.update(self.app.sched.loop_profiler.get_stats())
         return res
 
+    @cherrypy.expose
+    @cherrypy.tools.json_in(content_type=SERIALIZED_CONTENT_TYPES, processor=serialized_processor)
+    @cherrypy.tools.json_out()
+    def check_results(self):
+        """Post some passive check results to the scheduler
+
+        The posted data is an object with a `results` property containing a list of check
+        results. Each check result is an object with the `host`, `service` (only for a service
+        check result), `return_code`, `output` and `timestamp` (optional) properties.
+
+        This is a faster alternative to the PROCESS_HOST_CHECK_RESULT and
+        PROCESS_SERVICE_CHECK_RESULT external commands.
+
+        :return: number of accepted check results
+        :rtype: dict
+        """
+        if self.app.type != 'scheduler':
+            return {'_status': u'ERR',
+                    '_message': u"This service is only available for a scheduler daemon"}
+
+        results = cherrypy.request.json.get('results', None)
+        if not isinstance(results, list):
+            return {'_status': u'ERR', '_message': u"Missing check results list"}
+
+        with self.app.lock:
+            if not self.app.sched.external_commands_manager:
+                return {'_status': u'ERR', '_message': u"The scheduler is not yet configured"}
+            count = self.app.sched.external_commands_manager.process_check_results(results)
+        return {'_status': u'OK', '_message': u"Got %d check results" % count,
+                'accepted': count, 'rejected': len(results) - count}
+
     #####
     #   ___           _                                   _                     _
     #  |_ _|  _ __   | |_    ___   _ __   _ __     __ _  | |     ___    _ __   | |  _   _
@@ -367,25 +460,49 @@ class SchedulerInterface(GenericInterface):
         super(SchedulerInterface, self)._wait_new_conf()
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
-    def _initial_broks(self, broker_name):
+    @cherrypy.tools.json_out(handler=serialized_handler)
+    def _initial_broks(self, broker_name, page_size=0, token=''):
         """Get initial_broks from the scheduler
 
         This is used by the brokers to prepare the initial status broks
 
-        This do not send broks, it only makes scheduler internal processing. Then the broker
-        must use the *_broks* API to get all the stuff
+        If no page size is provided, this do not send broks, it only makes scheduler
+        internal processing. Then the broker must use the *_broks* API to get all the stuff
+
+        Else, the initial broks are streamed to the broker: the response contains a page of
+        at most page_size initial broks and a continuation token that the broker uses to get
+        the next page. An empty token starts a new stream and the last page has an empty
+        continuation token.
 
         :param broker_name: broker name, used to filter broks
         :type broker_name: str
-        :return: None
+        :param page_size: maximum number of initial broks in the response
+        :type page_size: int
+        :param token: continuation token of the initial broks stream
+        :type token: str
+        :return: number of initial broks or a page of initial broks
+        :rtype: int or dict
         """
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            return {'_status': u'ERR', '_message': u"Bad page size: %s" % page_size}
+
         with self.app.conf_lock:
-            logger.info("A new broker just connected : %s", broker_name)
-            return self.app.sched.fill_initial_broks(broker_name)
+            if not page_size:
+                logger.info("A new broker just connected : %s", broker_name)
+                return self.app.sched.fill_initial_broks(broker_name)
+
+            if not token:
+                logger.info("A new broker just connected : %s", broker_name)
+            res = self.app.sched.get_initial_broks_page(broker_name, page_size, token)
+            if res is None:
+                return {'_status': u'ERR', '_message': u"Initial broks are not available"}
+            broks, token = res
+            return {'_status': u'OK', 'broks': serialized_content(broks), 'token': token}
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=serialized_handler)
     def _broks(self, broker_name):
         """Get the broks from a scheduler, used by brokers
 
@@ -409,8 +526,8 @@ class SchedulerInterface(GenericInterface):
             with self.app.broks_lock:
                 res = self.app.give_broks(broker_name)
 
-            # Serialize but do not make it json encoded
-            res = serialize(res, no_json=True)
+            # Serialize but do not json encode (the binary encoding packs objects)
+            res = serialized_content(res)
         except Exception as exp:
             logger.warning("Getting broks for %s from the scheduler", broker_name)
             logger.warning("Serializing: %s", res)
@@ -421,7 +538,7 @@ class SchedulerInterface(GenericInterface):
         return res
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=serialized_handler)
     def _checks(self, do_checks=False, do_actions=False, poller_tags=None,
                 reactionner_tags=None, worker_name='none', module_types=None):
         """Get checks from scheduler, used by poller or reactionner when they are
@@ -456,10 +573,10 @@ class SchedulerInterface(GenericInterface):
         res = self.app.sched.get_to_run_checks(do_checks, do_actions, poller_tags, reactionner_tags,
                                                worker_name, module_types)
 
-        return serialize(res, no_json=True)
+        return serialized_content(res)
 
     @cherrypy.expose
-    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_in(content_type=SERIALIZED_CONTENT_TYPES, processor=serialized_processor)
     @cherrypy.tools.json_out()
     # pylint: disable=arguments-differ
     def _results(self):
@@ -496,7 +613,7 @@ class SchedulerInterface(GenericInterface):
         return True
 
     @cherrypy.expose
-    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_in(content_type=SERIALIZED_CONTENT_TYPES, processor=serialized_processor)
     @cherrypy.tools.json_out()
     def _run_external_commands(self):
         """Post external_commands to scheduler (from arbiter)
@@ -508,6 +625,22 @@ class SchedulerInterface(GenericInterface):
         with self.app.lock:
             self.app.sched.run_external_commands(commands['cmds'])
 
+    def _get_snapshot(self, obj=None):
+        """Get the last snapshot of the scheduler hosts and services state
+
+        Getting the snapshot requests the scheduler to publish a new one. If an object is
+        requested and it is not in the last snapshot, wait for a snapshot including it.
+
+        :param obj: requested object type and name, if any
+        :type obj: tuple
+        :return: the scheduler snapshot, None if no snapshot was yet published
+        :rtype: alignak.snapshot.SchedulerSnapshot
+        """
+        sched = getattr(self.app, 'sched', None)
+        if sched is None:
+            return None
+        return sched.get_snapshot(obj, timeout=SchedulerSnapshot.wait_timeout)
+
     def _get_objects(self, o_type):
         """Get an object list from the scheduler
 
@@ -529,33 +662,3 @@ class SchedulerInterface(GenericInterface):
             return None
 
         return o_list
-
-    def _get_object(self, o_type, o_name=None):
-        """Get an object from the scheduler
-
-        Returns None if the required object type (`o_type`) is not known.
-        Else returns the serialized object if found. The object is searched first with
-        o_name as its name and then with o_name as its uuid.
-
-        :param o_type: searched object type
-        :type o_type: str
-        :param name: searched object name
-        :type name: str
-        :return: serialized object
-        :rtype: str
-        """
-        try:
-            o_found = None
-            o_list = self._get_objects(o_type)
-            if o_list:
-                if o_name is None:
-                    return serialize(o_list, no_json=True) if o_list else None
-                # We expected a name...
-                o_found = o_list.find_by_name(o_name)
-                if not o_found:
-                    # ... but perhaps we got an object uuid
-                    o_found = o_list[o_name]
-        except Exception:  # pylint: disable=broad-except
-            return None
-
-        return serialize(o_found, no_json=True) if o_found else None
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the LinksPool class. It is used by the satellites to communicate
+with several daemons (eg. the schedulers a poller gets its checks from) at the same time.
+
+A request is submitted for a link and executed by one of the pool threads. A link may have
+only one request of each kind in flight: a request that is still in flight when the same
+kind of request is submitted again for the same link is not submitted twice. Thus a slow or
+unreachable daemon does not delay the communication with the other daemons.
+
+The requests results are got back by the daemon main thread that is the only one to use them.
+A request error, whatever it is, is also got back by the main thread: the pool threads never
+die and they do not change the links state, the main thread manages the errors.
+"""
+import time
+import logging
+import threading
+
+from queue import Queue, Empty
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class LinksPool(object):
+    """Pool of threads executing the requests to some satellite links"""
+
+    def __init__(self, size, name='links-pool'):
+        """
+        :param size: number of threads, which is the maximum number of requests in flight
+        :type size: int
+        :param name: threads name prefix
+        :type name: str
+        """
+        self.size = max(size, 1)
+        self.name = name
+        self.threads = []
+        self.tasks = Queue()
+        self.results = Queue()
+        # (kind, link uuid) -> request submission time
+        self.in_flight = {}
+
+    def __len__(self):
+        return len(self.in_flight)
+
+    def start(self):
+        """Start the pool threads
+
+        :return: None
+        """
+        for index in range(self.size):
+            thread = threading.Thread(target=self._run, name='%s-%d' % (self.name, index))
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Stop the pool threads. The requests in flight are completed before.
+
+        :param timeout: maximum time to wait for each thread
+        :type timeout: float
+        :return: None
+        """
+        for _ in self.threads:
+            self.tasks.put(None)
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def _run(self):
+        """Pool thread main function: execute the submitted requests
+
+        :return: None
+        """
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            key, link, func, args, kwargs = task
+            _t0 = time.time()
+            try:
+                result, error = func(*args, **kwargs), None
+            except BaseException as exp:  # pylint: disable=broad-except
+                # Even a SystemExit is got back by the main thread
+                result, error = None, exp
+            self.results.put((key[0], link, result, error, time.time() - _t0))
+
+    def submit(self, kind, link, func, *args, **kwargs):
+        """Submit a request for a link, if the same kind of request is not yet in flight
+        for this link
+
+        :param kind: request kind
+        :type kind: str
+        :param link: the link the request is for
+        :type link: alignak.objects.satellitelink.SatelliteLink
+        :param func: function to call
+        :param args: function arguments
+        :param kwargs: function keyword arguments
+        :return: True if the request got submitted
+        :rtype: bool
+        """
+        key = (kind, link.uuid)
+        if key in self.in_flight:
+            logger.debug("A %s request is still in flight for %s", kind, link.name)
+            return False
+        if not self.threads:
+            self.start()
+        self.in_flight[key] = time.time()
+        self.tasks.put((key, link, func, args, kwargs))
+        return True
+
+    def get_results(self, timeout):
+        """Get the results of the completed requests. Wait at most `timeout` seconds for the
+        requests in flight to complete.
+
+        :param timeout: maximum time to wait for the requests in flight
+        :type timeout: float
+        :return: list of (kind, link, result, error, duration) of the completed requests
+        :rtype: list
+        """
+        res = []
+        deadline = time.time() + timeout
+        while self.in_flight:
+            remaining = deadline - time.time()
+            try:
+                if remaining > 0:
+                    result = self.results.get(timeout=remaining)
+                else:
+                    result = self.results.get_nowait()
+            except Empty:
+                break
+            self.in_flight.pop((result[0], result[1].uuid), None)
+            res.append(result)
+        return res
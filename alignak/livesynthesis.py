@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the LiveSynthesis class. It is used by the scheduler to maintain
+the counters of its hosts and services states (up, down, problems, acknowledged,...)
+so that the scheduler live synthesis and the global macros ($TOTALHOSTSUP$,...) do not
+need to scan all the hosts and services.
+
+Each host / service is accounted in a set of counters according to its current state.
+The attributes the counters depend on are SynthesisAttribute descriptors (see SchedulingItem)
+that tell the live synthesis about each change, so that the item counters are updated.
+"""
+from collections import Counter
+
+# The SchedulingItem attributes the counters depend on
+SYNTHESIS_ATTRIBUTES = ('state', 'state_type', 'is_problem', 'problem_has_been_acknowledged',
+                        'in_scheduled_downtime', 'is_flapping',
+                        'active_checks_enabled', 'passive_checks_enabled')
+
+
+class SynthesisAttribute(object):  # pylint: disable=too-few-public-methods
+    """Data descriptor used for the host / service attributes the live synthesis depends on
+
+    The value is stored in the instance dictionary, exactly as a plain attribute would be,
+    but the live synthesis the item is attached to (if any) is told about each change.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+    def __set__(self, obj, value):
+        old_value = obj.__dict__.get(self.name)
+        obj.__dict__[self.name] = value
+        synthesis = obj.__dict__.get('_synthesis')
+        if synthesis is not None and old_value != value:
+            synthesis.item_changed(obj)
+
+
+class LiveSynthesis(object):
+    """Hosts and services states counters, incrementally maintained"""
+
+    def __init__(self, hosts, services):
+        """Attach all the hosts and services to this live synthesis
+
+        :param hosts: the scheduler hosts
+        :type hosts: alignak.objects.host.Hosts
+        :param services: the scheduler services
+        :type services: alignak.objects.service.Services
+        """
+        self.hosts = hosts
+        self.services = services
+        # item type -> counter key -> count
+        self.counters = {'host': Counter(), 'service': Counter()}
+        # item uuid -> counter keys the item is accounted in
+        self.keys = {}
+
+        for items in (hosts, services):
+            for item in items:
+                self.attach(item)
+
+    @staticmethod
+    def get_keys(item):
+        """Get the counter keys an host or a service is to be accounted in
+
+        :param item: host or service
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: counter keys
+        :rtype: tuple
+        """
+        state = getattr(item, 'state', None)
+        state_type = getattr(item, 'state_type', None)
+        keys = [('state', state), ('state', state, state_type)]
+
+        if getattr(item, 'is_problem', False):
+            keys.append('problems')
+            if getattr(item, 'problem_has_been_acknowledged', False):
+                keys.append('problems_handled')
+            else:
+                keys.append('problems_unhandled')
+                # Unhandled hosts problems are only the hard ones
+                if item.my_type != 'host' or state_type == u'HARD':
+                    keys.append(('unhandled', state))
+        if getattr(item, 'in_scheduled_downtime', False):
+            keys.append('downtimed')
+        if getattr(item, 'is_flapping', False):
+            keys.append('flapping')
+        if not getattr(item, 'active_checks_enabled', True) \
+                and not getattr(item, 'passive_checks_enabled', True):
+            keys.append('not_monitored')
+        return tuple(keys)
+
+    def attach(self, item):
+        """Attach an host or a service and account it in its counters
+
+        :param item: host or service
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        item._synthesis = self  # pylint: disable=protected-access
+        keys = self.get_keys(item)
+        self.keys[item.uuid] = keys
+        counters = self.counters[item.my_type]
+        for key in keys:
+            counters[key] += 1
+
+    def item_changed(self, item):
+        """Called by an attached item when one of its synthesis attributes changed
+
+        :param item: the modified host or service
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        old_keys = self.keys.get(item.uuid, ())
+        keys = self.get_keys(item)
+        if keys == old_keys:
+            return
+        self.keys[item.uuid] = keys
+        counters = self.counters[item.my_type]
+        for key in old_keys:
+            counters[key] -= 1
+        for key in keys:
+            counters[key] += 1
+
+    def count(self, my_type, key):
+        """Get a counter value
+
+        :param my_type: item type (host or service)
+        :type my_type: str
+        :param key: counter key
+        :type key: str | tuple
+        :return: number of items accounted in this counter
+        :rtype: int
+        """
+        return self.counters[my_type][key]
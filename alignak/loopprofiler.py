@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the LoopProfiler class. It is used by the scheduler to profile its
+loop: the duration of each recurrent work, passive satellites exchange and hook point call,
+and the number of items it processed, are recorded in rolling histograms.
+
+The histograms buckets are log-linear: each power of 2 is split in 2 ** SUB_BUCKET_BITS
+buckets, so that the percentiles relative error is less than 2 ** -SUB_BUCKET_BITS whatever
+the recorded values magnitude. The histograms only account for the values recorded
+during the last `windows` periods of `window` seconds.
+
+The profiler may also capture a Python profile (cProfile) of the next loops and write it
+to a file that can be inspected with the pstats module.
+"""
+import time
+import logging
+import threading
+import cProfile
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+# Each power of 2 is split in 2 ** SUB_BUCKET_BITS buckets
+SUB_BUCKET_BITS = 5
+# Durations are recorded in microseconds
+DURATION_UNIT = 1e-6
+# Percentiles got from the histograms
+PERCENTILES = (50, 95, 99)
+# Maximum number of loops of a Python profile capture
+MAX_CAPTURE_LOOPS = 100
+
+
+def get_bucket(value):
+    """Get the histogram bucket of a positive integer value
+
+    :param value: recorded value
+    :type value: int
+    :return: bucket (exponent, mantissa)
+    :rtype: tuple
+    """
+    exponent = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+    return exponent, value >> exponent
+
+
+def get_bucket_value(bucket):
+    """Get the highest value of an histogram bucket
+
+    :param bucket: bucket (exponent, mantissa)
+    :type bucket: tuple
+    :return: highest value accounted in the bucket
+    :rtype: int
+    """
+    exponent, mantissa = bucket
+    return ((mantissa + 1) << exponent) - 1
+
+
+class RollingHistogram(object):
+    """Histogram of the values recorded during the last periods"""
+
+    def __init__(self, unit=1, window=60, windows=5):
+        """
+        :param unit: recorded values unit, the values are accounted as integers of this unit
+        :type unit: float
+        :param window: period duration in seconds
+        :type window: int
+        :param windows: number of periods the histogram accounts for
+        :type windows: int
+        """
+        self.unit = unit
+        self.window = window
+        # (period, buckets counter, count, total, max) of the last periods
+        self.periods = deque(maxlen=windows)
+
+    def record(self, value, now=None):
+        """Record a value
+
+        :param value: value to record
+        :type value: float
+        :param now: recording time, default is now
+        :type now: float
+        :return: None
+        """
+        period = int((now or time.time()) // self.window)
+        if not self.periods or self.periods[-1][0] != period:
+            self.periods.append([period, Counter(), 0, 0, 0])
+        current = self.periods[-1]
+        current[1][get_bucket(max(int(value / self.unit), 0))] += 1
+        current[2] += 1
+        current[3] += value
+        current[4] = max(current[4], value)
+
+    def get_stats(self, now=None):
+        """Get the histogram statistics
+
+        :param now: statistics time, default is now
+        :type now: float
+        :return: count, mean, max and percentiles of the recorded values
+        :rtype: dict
+        """
+        first = int((now or time.time()) // self.window) - self.periods.maxlen + 1
+        buckets = Counter()
+        count = total = maximum = 0
+        for period, period_buckets, period_count, period_total, period_max in self.periods:
+            if period < first:
+                continue
+            buckets.update(period_buckets)
+            count += period_count
+            total += period_total
+            maximum = max(maximum, period_max)
+
+        res = {'count': count, 'mean': float(total) / count if count else 0, 'max': maximum}
+        sorted_buckets = sorted(buckets.items())
+        for percentile in PERCENTILES:
+            res['p%d' % percentile] = 0
+            if not count:
+                continue
+            rank = count * percentile / 100.0
+            seen = 0
+            for bucket, bucket_count in sorted_buckets:
+                seen += bucket_count
+                if seen >= rank:
+                    res['p%d' % percentile] = min(get_bucket_value(bucket) * self.unit, maximum)
+                    break
+        return res
+
+
+class LoopProfiler(object):
+    """Scheduler loop profiler"""
+
+    def __init__(self, window=60, windows=5):
+        """
+        :param window: histograms period duration in seconds
+        :type window: int
+        :param windows: number of periods the histograms account for
+        :type windows: int
+        """
+        self.window = window
+        self.windows = windows
+        self.loops = 0
+        # name -> durations histogram / processed items count histogram
+        self.durations = {}
+        self.items = {}
+        # The works being measured: [name, processed items count]
+        self.running = []
+        self.lock = threading.Lock()
+
+        # Requested / running Python profile capture
+        self.capture_request = None
+        self.capture = None
+
+    def start(self, name):
+        """Start measuring a work
+
+        :param name: work name
+        :type name: str
+        :return: None
+        """
+        self.running.append([name, None])
+
+    def add_items(self, count):
+        """Account some items processed by the work being measured
+
+        :param count: number of processed items
+        :type count: int
+        :return: None
+        """
+        if self.running:
+            self.running[-1][1] = (self.running[-1][1] or 0) + count
+
+    def stop(self, duration):
+        """Stop measuring the last started work and record its duration
+
+        :param duration: work duration in seconds
+        :type duration: float
+        :return: None
+        """
+        if not self.running:
+            return
+        name, count = self.running.pop()
+        self.record(name, duration, count)
+
+    def record(self, name, duration, count=None):
+        """Record a work duration and the number of items it processed
+
+        :param name: work name
+        :type name: str
+        :param duration: work duration in seconds
+        :type duration: float
+        :param count: number of processed items, None if the work does not count them
+        :type count: int
+        :return: None
+        """
+        now = time.time()
+        with self.lock:
+            if name not in self.durations:
+                self.durations[name] = RollingHistogram(DURATION_UNIT, self.window, self.windows)
+            self.durations[name].record(duration, now)
+            if count is not None:
+                if name not in self.items:
+                    self.items[name] = RollingHistogram(1, self.window, self.windows)
+                self.items[name].record(count, now)
+
+    def get_stats(self):
+        """Get the profile of the loop works
+
+        :return: for each work, its durations and processed items statistics
+        :rtype: dict
+        """
+        now = time.time()
+        with self.lock:
+            profile = {}
+            for name, histogram in self.durations.items():
+                profile[name] = histogram.get_stats(now)
+                if name in self.items:
+                    profile[name]['items'] = self.items[name].get_stats(now)
+            capture = self.capture or self.capture_request
+            return {
+                'loops': self.loops,
+                'window': self.window * self.windows,
+                'profile': profile,
+                'capture': self.get_capture_state(capture)
+            }
+
+    def request_capture(self, loops, filename):
+        """Request a Python profile capture of the next loops. The capture is made by the
+        loop thread, the request may come from any thread.
+
+        At most MAX_CAPTURE_LOOPS loops are captured.
+
+        :param loops: number of loops to capture
+        :type loops: int
+        :param filename: file the captured profile is written to
+        :type filename: str
+        :return: the capture request, or the running capture
+        :rtype: dict
+        """
+        with self.lock:
+            if self.capture is None and self.capture_request is None:
+                self.capture_request = {'loops': min(loops, MAX_CAPTURE_LOOPS),
+                                        'file': filename, 'done': 0}
+            return self.get_capture_state(self.capture or self.capture_request)
+
+    @staticmethod
+    def get_capture_state(capture):
+        """Get the state of a capture, without its profiler
+
+        :param capture: capture request or running capture
+        :type capture: dict
+        :return: loops to capture, captured loops and file
+        :rtype: dict
+        """
+        if capture is None:
+            return None
+        return {key: value for key, value in capture.items() if key != 'profile'}
+
+    def loop_started(self):
+        """Called on each loop start, starts a requested capture
+
+        :return: None
+        """
+        self.loops += 1
+        self.running = []
+        if self.capture_request is None or self.capture is not None:
+            return
+        with self.lock:
+            self.capture, self.capture_request = self.capture_request, None
+        logger.info("Capturing a profile of the next %d loops", self.capture['loops'])
+        self.capture['profile'] = cProfile.Profile()
+        self.capture['profile'].enable()
+
+    def loop_ended(self):
+        """Called on each loop end, stops and writes a capture that is complete
+
+        :return: None
+        """
+        if self.capture is None:
+            return
+        self.capture['done'] += 1
+        if self.capture['done'] < self.capture['loops']:
+            return
+        profile = self.capture.pop('profile')
+        profile.disable()
+        try:
+            profile.dump_stats(self.capture['file'])
+            logger.info("Captured a profile of %d loops in %s",
+                        self.capture['done'], self.capture['file'])
+        except (IOError, OSError) as exp:
+            logger.error("Error when writing the profile %s: %s", self.capture['file'], exp)
+        with self.lock:
+            self.capture = None
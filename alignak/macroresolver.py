@@ -173,6 +173,19 @@ class MacroResolver(Borg):
         self.illegal_macro_output_chars = self.my_conf.illegal_macro_output_chars
         self.env_prefix = self.my_conf.env_variables_prefix
 
+    def get_livesynthesis(self):
+        """Get the live synthesis of our hosts and services, if the scheduler maintains one
+        for them (see Scheduler.load_conf)
+
+        :return: the live synthesis or None
+        :rtype: alignak.livesynthesis.LiveSynthesis | None
+        """
+        synthesis = getattr(self, 'livesynthesis', None)
+        if synthesis is None or synthesis.hosts is not getattr(self, 'hosts', None) \
+                or synthesis.services is not getattr(self, 'services', None):
+            return None
+        return synthesis
+
     @staticmethod
     def _get_macros(chain):
         """Get all macros of a chain
@@ -656,6 +669,11 @@ class MacroResolver(Borg):
         """
         if state is None and state_type is None:
             return len(self.hosts)
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            if state_type:
+                return synthesis.count('host', ('state', state, state_type))
+            return synthesis.count('host', ('state', state))
         if state_type:
             return sum(1 for h in self.hosts if h.state == state and h.state_type == state_type)
         return sum(1 for h in self.hosts if h.state == state)
@@ -668,6 +686,9 @@ class MacroResolver(Borg):
         :return: number of host in state *state* and which are not acknowledged problems
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('host', ('unhandled', state))
         return sum(1 for h in self.hosts if h.state == state and h.state_type == u'HARD' and
                    h.is_problem and not h.problem_has_been_acknowledged)
 
@@ -731,6 +752,9 @@ class MacroResolver(Borg):
         :return: number of hosts with is_problem attribute True
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('host', 'problems')
         return sum(1 for h in self.hosts if h.is_problem)
 
     def _get_total_hosts_problems_unhandled(self):
@@ -740,6 +764,9 @@ class MacroResolver(Borg):
         :return: Number of hosts which are problems and not handled
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('host', 'problems_unhandled')
         return sum(1 for h in self.hosts if h.is_problem and not h.problem_has_been_acknowledged)
 
     def _get_total_hosts_problems_handled(self):
@@ -749,6 +776,9 @@ class MacroResolver(Borg):
         :return: Number of hosts which are problems and not handled
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('host', 'problems_handled')
         return sum(1 for h in self.hosts if h.is_problem and h.problem_has_been_acknowledged)
 
     def _get_total_hosts_downtimed(self):
@@ -758,6 +788,9 @@ class MacroResolver(Borg):
         :return: Number of hosts which are downtimed
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('host', 'downtimed')
         return sum(1 for h in self.hosts if h.in_scheduled_downtime)
 
     def _get_total_hosts_not_monitored(self):
@@ -767,6 +800,9 @@ class MacroResolver(Borg):
         :return: Number of hosts which are not monitored
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('host', 'not_monitored')
         return sum(1 for h in self.hosts if not h.active_checks_enabled and
                    not h.passive_checks_enabled)
 
@@ -777,6 +813,9 @@ class MacroResolver(Borg):
         :return: Number of hosts which are not monitored
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('host', 'flapping')
         return sum(1 for h in self.hosts if h.is_flapping)
 
     def _tot_services_by_state(self, state=None, state_type=None):
@@ -792,6 +831,11 @@ class MacroResolver(Borg):
         """
         if state is None and state_type is None:
             return len(self.services)
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            if state_type:
+                return synthesis.count('service', ('state', state, state_type))
+            return synthesis.count('service', ('state', state))
         if state_type:
             return sum(1 for s in self.services if s.state == state and s.state_type == state_type)
         return sum(1 for s in self.services if s.state == state)
@@ -804,6 +848,9 @@ class MacroResolver(Borg):
         :return: number of service in state *state* and which are not acknowledged problems
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('service', ('unhandled', state))
         return sum(1 for s in self.services if s.state == state and
                    s.is_problem and not s.problem_has_been_acknowledged)
 
@@ -894,6 +941,9 @@ class MacroResolver(Borg):
         :return: number of services with is_problem attribute True
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('service', 'problems')
         return sum(1 for s in self.services if s.is_problem)
 
     def _get_total_services_problems_unhandled(self):
@@ -902,6 +952,9 @@ class MacroResolver(Borg):
         :return: number of problem services which are not acknowledged
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('service', 'problems_unhandled')
         return sum(1 for s in self.services if s.is_problem and not s.problem_has_been_acknowledged)
 
     def _get_total_services_problems_handled(self):
@@ -911,6 +964,9 @@ class MacroResolver(Borg):
         :return: Number of services which are problems and not handled
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('service', 'problems_handled')
         return sum(1 for s in self.services if s.is_problem and s.problem_has_been_acknowledged)
 
     def _get_total_services_downtimed(self):
@@ -920,6 +976,9 @@ class MacroResolver(Borg):
         :return: Number of services which are downtimed
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('service', 'downtimed')
         return sum(1 for s in self.services if s.in_scheduled_downtime)
 
     def _get_total_services_not_monitored(self):
@@ -929,6 +988,9 @@ class MacroResolver(Borg):
         :return: Number of services which are not monitored
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('service', 'not_monitored')
         return sum(1 for s in self.services if not s.active_checks_enabled and
                    not s.passive_checks_enabled)
 
@@ -939,6 +1001,9 @@ class MacroResolver(Borg):
         :return: Number of services which are not monitored
         :rtype: int
         """
+        synthesis = self.get_livesynthesis()
+        if synthesis is not None:
+            return synthesis.count('service', 'flapping')
         return sum(1 for s in self.services if s.is_flapping)
 
     @staticmethod
@@ -18,6 +18,14 @@
 # along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
 """
 This module provide object serialization for Alignak objects. It basically converts objects to json
+
+The serialized objects may also be encoded in the msgpack binary format when the daemons
+exchange data. This binary format is more compact and faster to encode / decode than json.
+It is only available if the msgpack Python library is installed.
+
+In the binary format, the objects of the classes listed in BINARY_CLASSES are directly
+packed as msgpack extension types identified by their index in this list, rather than with
+their module path. Their content is encoded once: the brok data is not json encoded.
 """
 import sys
 import json
@@ -26,8 +34,33 @@ try:
 except ImportError:
     from collections import Callable
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover, msgpack is an optional dependency
+    msgpack = None
+
 from alignak.property import NONE_OBJECT
 
+# Content types of the serialized data exchanged between the daemons
+JSON_CONTENT_TYPE = 'application/json'
+BINARY_CONTENT_TYPE = 'application/x-msgpack'
+
+# The recent msgpack versions only allow str / bytes map keys per default
+MSGPACK_UNPACK_OPTIONS = {'raw': False}
+if msgpack is not None and msgpack.version >= (1, 0, 0):
+    MSGPACK_UNPACK_OPTIONS['strict_map_key'] = False
+
+# Classes of the objects packed as msgpack extension types in the binary format, with the
+# options used to serialize their content. The extension type code is the index of the class
+# in this list: only append new classes to keep the codes of the existing ones!
+BINARY_CLASSES = [
+    ('alignak.brok.Brok', {'json_data': False}),
+    ('alignak.check.Check', {}),
+    ('alignak.notification.Notification', {}),
+    ('alignak.eventhandler.EventHandler', {}),
+]
+BINARY_CLASSES_CODES = dict((path, code) for code, (path, _) in enumerate(BINARY_CLASSES))
+
 # try:
 #     import ujson as json
 # except ImportError:
@@ -130,6 +163,83 @@ def serialize(obj, no_json=True, printing=False, name=''):
     return result
 
 
+def binary_codec_available():
+    """Is the binary format available to encode / decode the data?
+
+    :return: True if the msgpack library is installed
+    :rtype: bool
+    """
+    return msgpack is not None
+
+
+def default_binary(obj):
+    """msgpack serializer for objects not serializable by default msgpack code
+
+    The objects of the BINARY_CLASSES are packed as extension types, the other objects
+    are serialized as for the json format.
+
+    :param obj: the object to serialize
+    :return: msgpack extension type or serialized object
+    :rtype: msgpack.ExtType | dict | list
+    """
+    code = BINARY_CLASSES_CODES.get("%s.%s" % (obj.__class__.__module__,
+                                               obj.__class__.__name__), None)
+    if code is not None:
+        content = obj.serialize(no_json=True, printing=False, **BINARY_CLASSES[code][1])
+        return msgpack.ExtType(code, encode_binary(content))
+
+    if isinstance(obj, set):
+        return list(obj)
+
+    return default_serialize(obj)
+
+
+def restore_binary(code, payload):
+    """Restore an object packed as a msgpack extension type
+
+    :param code: extension type code, index of the object class in BINARY_CLASSES
+    :type code: int
+    :param payload: packed object content
+    :type payload: bytes
+    :return: restored object
+    :raise ValueError: if the extension type code is not known
+    """
+    if code >= len(BINARY_CLASSES):
+        raise ValueError("Unknown binary object type: %d. "
+                         "Alignak versions may mismatch" % code)
+    cls = get_alignak_class(BINARY_CLASSES[code][0])
+    return cls(decode_binary(payload), parsing=False)
+
+
+def encode_binary(data):
+    """Encode data to the msgpack binary format
+
+    The data may contain objects, they do not need to be serialized before: the objects
+    of the BINARY_CLASSES are packed as extension types and the other objects are
+    serialized as for the json format.
+
+    :param data: data to encode
+    :type data: dict | list | str
+    :return: encoded data
+    :rtype: bytes
+    """
+    return msgpack.packb(data, use_bin_type=True, default=default_binary)
+
+
+def decode_binary(payload):
+    """Decode data encoded in the msgpack binary format
+
+    The objects of the BINARY_CLASSES are restored, the other objects still need to be
+    un-serialized with `unserialize(data, no_json=True)`
+
+    :param payload: encoded data
+    :type payload: bytes
+    :return: decoded data
+    :rtype: dict | list | str
+    """
+    return msgpack.unpackb(payload, ext_hook=restore_binary, **MSGPACK_UNPACK_OPTIONS)
+
+
 # pylint: disable=too-many-return-statements, too-many-branches
 def unserialize(j_obj, no_json=True, printing=False):
     """
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the PipeQueue class. It is a transport for the queues between a daemon
+and one of its external modules that does not use the daemon synchronization manager process.
+
+The objects put in the queue are pickled and written as length-prefixed frames to a pipe
+shared by the daemon and the module processes. A feeder thread writes the frames, so that
+putting an object never waits for the other process to read.
+
+The number of frames put and not yet got is counted in a shared memory value. When it
+reaches the queue maximum size, the drop policy applies:
+
+* block: wait for some frames to be got, and raise Full after the put timeout,
+* drop-new: drop the frame that is put,
+* drop-old: drop the oldest frame that is not yet written to the pipe.
+
+The queue maintains the highest number of pending frames and the number of dropped frames.
+"""
+import os
+import time
+import pickle
+import logging
+import threading
+from collections import deque
+from multiprocessing import Pipe, Value
+
+from queue import Empty, Full
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+DROP_POLICIES = ['block', 'drop-new', 'drop-old']
+
+
+class PipeQueue(object):
+    # pylint: disable=too-many-instance-attributes
+    """Queue with a pipe transport between a daemon and an external module"""
+
+    def __init__(self, maxsize=0, policy='block', put_timeout=1.0):
+        """
+        :param maxsize: maximum number of frames put and not yet got, 0 for no maximum
+        :type maxsize: int
+        :param policy: drop policy when the queue is full, one of DROP_POLICIES
+        :type policy: str
+        :param put_timeout: maximum time to wait for a frame to be put, block policy only
+        :type put_timeout: float
+        """
+        if policy not in DROP_POLICIES:
+            logger.warning("Unknown queue drop policy '%s', using 'block'", policy)
+            policy = 'block'
+        self.maxsize = maxsize
+        self.policy = policy
+        self.put_timeout = put_timeout
+        self.reader, self.writer = Pipe(duplex=False)
+        # Frames put and not yet got, shared by both processes
+        self.pending = Value('i', 0)
+        self.high_water_mark = 0
+        self.dropped = 0
+
+        self.frames = deque()
+        self.frames_cond = threading.Condition()
+        self.feeder = None
+        self.feeder_pid = None
+        self.closed = False
+
+    def __getstate__(self):
+        res = self.__dict__.copy()
+        for key in ['frames', 'frames_cond', 'feeder', 'feeder_pid']:
+            del res[key]
+        return res
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.frames = deque()
+        self.frames_cond = threading.Condition()
+        self.feeder = None
+        self.feeder_pid = None
+
+    def qsize(self):
+        """Get the number of frames put and not yet got
+
+        :return: queue size
+        :rtype: int
+        """
+        return self.pending.value
+
+    def empty(self):
+        """Is the queue empty?
+
+        :return: True if no frame is pending
+        :rtype: bool
+        """
+        return self.qsize() == 0
+
+    def get_stats(self):
+        """Get the queue statistics
+
+        :return: size, high water mark and dropped frames count
+        :rtype: dict
+        """
+        return {
+            'size': self.qsize(),
+            'high_water_mark': self.high_water_mark,
+            'dropped': self.dropped
+        }
+
+    def _start_feeder(self):
+        """Start the feeder thread in the current process. A forked process
+        does not inherit the feeder of its parent, nor its frames to write.
+
+        :return: None
+        """
+        if self.feeder_pid != os.getpid():
+            self.frames = deque()
+            self.frames_cond = threading.Condition()
+        self.feeder_pid = os.getpid()
+        self.feeder = threading.Thread(target=self._feed, name='queue-feeder')
+        self.feeder.daemon = True
+        self.feeder.start()
+
+    def _feed(self):
+        """Feeder thread main function: write the frames to the pipe
+
+        :return: None
+        """
+        while True:
+            with self.frames_cond:
+                while not self.frames and not self.closed:
+                    self.frames_cond.wait()
+                if not self.frames:
+                    return
+                frame = self.frames.popleft()
+            try:
+                self.writer.send_bytes(frame)
+            except (IOError, OSError, EOFError, ValueError) as exp:
+                logger.warning("Queue pipe is no more available: %s", exp)
+                return
+
+    def put(self, obj, block=True, timeout=None):
+        """Put an object in the queue. If the queue is full, the drop policy applies.
+
+        :param obj: object to put
+        :param block: wait for the queue not to be full, block policy only
+        :type block: bool
+        :param timeout: maximum time to wait, default is the queue put timeout
+        :type timeout: float
+        :return: True if the object is put, False if it got dropped
+        :rtype: bool
+        """
+        if self.closed:
+            raise ValueError("Queue is closed")
+        if self.feeder is None or self.feeder_pid != os.getpid() \
+                or not self.feeder.is_alive():
+            self._start_feeder()
+        frame = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+        with self.frames_cond:
+            if self.maxsize and self.pending.value >= self.maxsize:
+                if self.policy == 'drop-new':
+                    self.dropped += 1
+                    return False
+                if self.policy == 'drop-old' and self.frames:
+                    self.frames.popleft()
+                    self.dropped += 1
+                    with self.pending.get_lock():
+                        self.pending.value -= 1
+                elif self.policy == 'drop-old':
+                    self.dropped += 1
+                    return False
+                else:
+                    self._wait_not_full(block, timeout)
+
+            with self.pending.get_lock():
+                self.pending.value += 1
+                self.high_water_mark = max(self.high_water_mark, self.pending.value)
+            self.frames.append(frame)
+            self.frames_cond.notify()
+        return True
+
+    def _wait_not_full(self, block, timeout):
+        """Wait for the queue not to be full
+
+        :param block: wait or raise Full at once
+        :type block: bool
+        :param timeout: maximum time to wait, default is the queue put timeout
+        :type timeout: float
+        :return: None
+        """
+        if timeout is None:
+            timeout = self.put_timeout
+        deadline = time.time() + timeout
+        while block and self.pending.value >= self.maxsize and time.time() < deadline:
+            # The frames are got by the other process, poll for its progress
+            self.frames_cond.wait(0.01)
+        if self.pending.value >= self.maxsize:
+            raise Full
+
+    def put_nowait(self, obj):
+        """Put an object in the queue without waiting
+
+        :param obj: object to put
+        :return: True if the object is put, False if it got dropped
+        :rtype: bool
+        """
+        return self.put(obj, block=False)
+
+    def get(self, block=True, timeout=None):
+        """Get an object from the queue
+
+        :param block: wait for an object
+        :type block: bool
+        :param timeout: maximum time to wait, None to wait forever
+        :type timeout: float
+        :return: the got object
+        """
+        if not self.reader.poll(timeout if block else 0):
+            raise Empty
+        frame = self.reader.recv_bytes()
+        with self.pending.get_lock():
+            self.pending.value -= 1
+        return pickle.loads(frame)
+
+    def get_nowait(self):
+        """Get an object from the queue without waiting
+
+        :return: the got object
+        """
+        return self.get(block=False)
+
+    def close(self):
+        """Close the queue, the frames not yet written are still written by the feeder
+
+        :return: None
+        """
+        with self.frames_cond:
+            self.closed = True
+            self.frames_cond.notify()
+
+    def join_thread(self):
+        """Wait for the feeder to have written the frames and release the pipe
+
+        :return: None
+        """
+        if self.feeder is not None and self.feeder_pid == os.getpid():
+            # The other process may not read anymore, do not wait forever
+            self.feeder.join(self.put_timeout)
+        self.feeder = None
+        self.reader.close()
+        self.writer.close()
@@ -25,7 +25,9 @@ import os
 import re
 import time
 import tempfile
+import threading
 import json
+import hashlib
 import logging
 
 from alignak.stats import Stats
@@ -112,6 +114,14 @@ class InnerRetention(BaseModule):
                                   host=stats_host, port=stats_port,
                                   prefix=stats_prefix, enabled=True)
 
+        # Incremental save: only the changed hosts are saved, by a background thread
+        self.writer = None
+        self.write_failed = False
+        # Hash of the last saved Json content per host name
+        self.saved_hashes = {}
+        # Last saved Json content per host name, only for a unique retention file
+        self.saved_contents = {}
+
         self.enabled = getattr(mod_conf, 'enabled', '0') != '0'
         if isinstance(getattr(mod_conf, 'enabled', '0'), bool):
             self.enabled = getattr(mod_conf, 'enabled')
@@ -147,8 +157,13 @@ class InnerRetention(BaseModule):
                 self.retention_dir = '/tmp'
                 logger.info("The retention directory is set to: %s", self.retention_dir)
 
+        self.incremental_save = getattr(mod_conf, 'incremental_save', '0') != '0'
+        if isinstance(getattr(mod_conf, 'incremental_save', '0'), bool):
+            self.incremental_save = getattr(mod_conf, 'incremental_save')
+
         logger.info("inner retention module, enabled: %s, retention dir: %s, retention file: %s",
                     self.enabled, self.retention_dir, self.retention_file)
+        logger.info("inner retention module, incremental save: %s", self.incremental_save)
 
         if not self.retention_file:
             logger.info("The retention file is set as an empty file. The module will "
@@ -166,6 +181,127 @@ class InnerRetention(BaseModule):
         logger.info("[Inner Retention] In loop")
         time.sleep(1)
 
+    def quit(self):
+        """Wait for a pending retention save to complete
+
+        :return: None
+        """
+        self.wait_for_writer()
+
+    def wait_for_writer(self):
+        """Wait for the background retention writer, if any, to complete its job
+
+        :return: None
+        """
+        if self.writer is not None:
+            self.writer.join()
+            self.writer = None
+
+    @staticmethod
+    def write_file(file_name, content):
+        """Write a retention file. The content is written to a temporary file that is
+        then renamed, so that the retention file is never left partially written.
+
+        :param file_name: retention file name
+        :type file_name: str
+        :param content: file content
+        :type content: str
+        :return: None
+        """
+        tmp_file_name = '%s.tmp' % file_name
+        with open(tmp_file_name, "w") as fd:
+            fd.write(content)
+        os.rename(tmp_file_name, file_name)
+
+    @staticmethod
+    def get_snapshot(data):
+        """Get a shallow copy of an host or service retention data. The containers of the
+        retention data are the item own ones and they may change while the background
+        thread encodes the data.
+
+        :param data: host or service retention data
+        :type data: dict
+        :return: copy of the data
+        :rtype: dict
+        """
+        return dict((prop, value.copy() if isinstance(value, (list, set, dict)) else value)
+                    for prop, value in data.items())
+
+    def write_hosts(self, hosts_data):
+        """Encode the hosts retention data and write the retention files of the hosts which
+        encoded data changed since the former save. This function is the background writer
+        thread target.
+
+        A retention file per host is written without indentation. A unique retention file
+        is built with the last saved content of each host.
+
+        :param hosts_data: host name -> host retention data snapshot
+        :type hosts_data: dict
+        :return: None
+        """
+        start_time = time.time()
+        changed = {}
+        for host_name, host_data in hosts_data.items():
+            if self.retention_file:
+                content = json.dumps(host_data, indent=2, separators=(',', ':'),
+                                     default=default_serialize, sort_keys=True)
+            else:
+                content = json.dumps(host_data, separators=(',', ':'),
+                                     default=default_serialize, sort_keys=True)
+            content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+            if self.saved_hashes.get(host_name) != content_hash:
+                changed[host_name] = (content, content_hash)
+
+        logger.info('%d hosts changed, %d hosts saved in retention',
+                    len(hosts_data), len(changed))
+        self.statsmgr.counter('retention-save.hosts', len(changed))
+        self.statsmgr.counter('retention-save.unchanged', len(hosts_data) - len(changed))
+        if not changed:
+            return
+
+        if not self.retention_file:
+            files = [(os.path.join(self.retention_dir, "%s.json" % host_name), content,
+                      [host_name]) for host_name, (content, _) in changed.items()]
+        else:
+            for host_name, (content, _) in changed.items():
+                self.saved_contents[host_name] = content
+            files = [(self.retention_file,
+                      '{\n%s\n}' % ',\n'.join(
+                          '%s:%s' % (json.dumps(host_name), content)
+                          for host_name, content in sorted(self.saved_contents.items())),
+                      list(changed))]
+
+        for file_name, content, host_names in files:
+            try:
+                self.write_file(file_name, content)
+                logger.debug('- saved: %s', file_name)
+            except Exception as exp:  # pylint: disable=broad-except
+                logger.warning("Error when saving retention data to %s", file_name)
+                logger.exception(exp)
+                self.write_failed = True
+                continue
+            for host_name in host_names:
+                self.saved_hashes[host_name] = changed[host_name][1]
+        self.statsmgr.timer('retention-save.write-time', time.time() - start_time)
+
+    @staticmethod
+    def get_hosts_data(data_to_save):
+        """Move the services data to their respective hosts dictionary.
+        Alignak scheduler do not merge the services into the host dictionary!
+
+        :param data_to_save: scheduler retention data
+        :type data_to_save: dict
+        :return: host name -> host data with its services
+        :rtype: dict
+        """
+        for host_name in data_to_save['hosts']:
+            data_to_save['hosts'][host_name]['services'] = {}
+            data_to_save['hosts'][host_name]['name'] = host_name
+        for host_name, service_description in data_to_save['services']:
+            data_to_save['hosts'][host_name]['services'][service_description] = \
+                data_to_save['services'][(host_name, service_description)]
+        return data_to_save['hosts']
+
     def hook_load_retention(self, scheduler):  # pylint: disable=too-many-locals, too-many-branches
         """Load retention data from a file
 
@@ -178,6 +314,11 @@ class InnerRetention(BaseModule):
                            "Loading objects state is not possible.")
             return None
 
+        # Wait for the former save to be complete and forget about what was saved
+        self.wait_for_writer()
+        self.saved_hashes = {}
+        self.saved_contents = {}
+
         if self.retention_file and not os.path.isfile(self.retention_file):
             logger.info("The configured state retention file (%s) does not exist. "
                         "Loading objects state is not available.", self.retention_file)
@@ -269,6 +410,9 @@ class InnerRetention(BaseModule):
                            "Saving objects state is not possible.")
             return None
 
+        if self.incremental_save:
+            return self.save_retention_incremental(scheduler)
+
         try:
             start_time = time.time()
 
@@ -278,36 +422,29 @@ class InnerRetention(BaseModule):
                 logger.warning("Alignak retention data to save are not containing any information.")
                 return None
 
-            # Move services data to their respective hosts dictionary
-            # Alignak scheduler do not merge the services into the host dictionary!
-            for host_name in data_to_save['hosts']:
-                data_to_save['hosts'][host_name]['services'] = {}
-                data_to_save['hosts'][host_name]['name'] = host_name
-            for host_name, service_description in data_to_save['services']:
-                data_to_save['hosts'][host_name]['services'][service_description] = \
-                    data_to_save['services'][(host_name, service_description)]
+            hosts_data = self.get_hosts_data(data_to_save)
 
             try:
                 if not self.retention_file:
                     logger.info('Saving retention data to: %s', self.retention_dir)
-                    for host_name in data_to_save['hosts']:
+                    for host_name in hosts_data:
                         file_name = os.path.join(self.retention_dir,
                                                  self.retention_file,
                                                  "%s.json" % host_name)
-                        with open(file_name, "w") as fd:
-                            fd.write(json.dumps(data_to_save['hosts'][host_name],
-                                                indent=2, separators=(',', ':'),
-                                                default=default_serialize,
-                                                sort_keys=True))
+                        self.write_file(file_name,
+                                        json.dumps(hosts_data[host_name],
+                                                   indent=2, separators=(',', ':'),
+                                                   default=default_serialize,
+                                                   sort_keys=True))
                         logger.debug('- saved: %s', file_name)
                     logger.info('Saved')
                 else:
                     logger.info('Saving retention data to: %s', self.retention_file)
-                    with open(self.retention_file, "w") as fd:
-                        fd.write(json.dumps(data_to_save['hosts'],
-                                            indent=2, separators=(',', ':'),
-                                            default=default_serialize,
-                                            sort_keys=True))
+                    self.write_file(self.retention_file,
+                                    json.dumps(hosts_data,
+                                               indent=2, separators=(',', ':'),
+                                               default=default_serialize,
+                                               sort_keys=True))
                     logger.info('Saved')
             except Exception as exp:  # pylint: disable=broad-except
                 # pragma: no cover, should never happen...
@@ -328,3 +465,59 @@ class InnerRetention(BaseModule):
             return False
 
         return True
+
+    def save_retention_incremental(self, scheduler):
+        """Save the retention data of the hosts that changed since the former save
+
+        The scheduler tracks the hosts which retention data may have changed. Only a
+        snapshot of those hosts data is got from the scheduler. The data are encoded and
+        the retention files are written by a background thread (see `write_hosts`) so that
+        the scheduler loop is not blocked by the encoding and the disk I/O. An host which
+        encoded data did not change since the former save is not written.
+
+        If the former save is still in progress, this save is postponed and the changed
+        hosts are kept for the next save.
+
+        :param scheduler: scheduler instance of alignak
+        :type scheduler: alignak.scheduler.Scheduler
+        :return: None
+        """
+        if self.writer is not None and self.writer.is_alive():
+            logger.info("The former retention save is still in progress, postponing...")
+            self.statsmgr.counter('retention-save.postponed', 1)
+            return None
+        self.writer = None
+
+        if self.write_failed:
+            # Something got wrong in the former save, save everything again
+            self.write_failed = False
+            self.saved_hashes = {}
+            self.saved_contents = {}
+            scheduler.set_retention_dirty()
+
+        try:
+            start_time = time.time()
+
+            # Get a snapshot of the changed hosts retention data from the scheduler
+            dirty_hosts = scheduler.get_retention_dirty_hosts()
+            data_to_save = scheduler.get_retention_data(hosts=dirty_hosts)
+            for key in ('hosts', 'services'):
+                for name in data_to_save[key]:
+                    data_to_save[key][name] = self.get_snapshot(data_to_save[key][name])
+            hosts_data = self.get_hosts_data(data_to_save)
+            self.statsmgr.timer('retention-save.time', time.time() - start_time)
+            if not hosts_data:
+                return True
+
+            # Encode, compare with the former save and write in the background
+            self.writer = threading.Thread(target=self.write_hosts, args=(hosts_data, ),
+                                           name='retention-writer')
+            self.writer.daemon = True
+            self.writer.start()
+        except Exception as exp:  # pylint: disable=broad-except
+            self.enabled = False
+            logger.warning("Retention save failed: %s", exp)
+            logger.exception(exp)
+            return False
+
+        return True
@@ -80,6 +80,7 @@ import time
 import random
 import logging
 from io import StringIO
+from multiprocessing import Pool
 import json
 
 from alignak.alignakobject import get_a_new_object_id
@@ -173,6 +174,21 @@ class Config(Item):  # pylint: disable=too-many-public-methods,too-many-instance
         'clean_objects':
             BoolProp(default=False),
 
+        # When set, the schedulers share the equal values of their hosts and services
+        # properties rather than keeping one copy per object
+        'compact_objects':
+            BoolProp(default=False),
+
+        # When set, the schedulers send the hosts and services status and check results
+        # broks with only the properties that changed since their previous brok
+        'delta_broks':
+            BoolProp(default=False),
+
+        # When set, on a configuration reload, the arbiter only pushes the hosts and services
+        # that changed to the schedulers that can update their configuration in place
+        'differential_conf_push':
+            BoolProp(default=False),
+
         # When set, this parameter makes the configuration checked for consistency between
         # hostgroups and hosts realms. If hosts and their hostgroups do not belong to the
         # same realm the configuration is declared as coirrupted
@@ -739,6 +755,11 @@ class Config(Item):  # pylint: disable=too-many-public-methods,too-many-instance
         'daemon_thread_pool_size':
             IntegerProp(default=8, fill_brok=[FULL_STATUS]),
 
+        # Number of processes parsing the legacy configuration files, 0 or 1 to parse in
+        # the arbiter process
+        'config_parsing_processes':
+            IntegerProp(default=0),
+
         'max_plugins_output_length':
             IntegerProp(default=8192, fill_brok=[FULL_STATUS],
                         class_inherit=[(Host, None), (Service, None)]),
@@ -1302,9 +1323,49 @@ class Config(Item):  # pylint: disable=too-many-public-methods,too-many-instance
                 logger.info("No legacy configuration files.")
                 return objects
 
+        if self.config_parsing_processes > 1:
+            chunks = self.split_config_buf(cfg_buffer)
+            logger.info("Parsing %d configuration files with %d processes",
+                        len(chunks), self.config_parsing_processes)
+            pool = Pool(processes=self.config_parsing_processes)
+            try:
+                results = pool.map(parse_config_chunk, chunks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [self.parse_config_buf(cfg_buffer, self.read_config_silent)]
+
         params = []
-        objectscfg = {}
         for o_type in self.__class__.configuration_types:
+            objects[o_type] = []
+        for (chunk_params, chunk_objects) in results:
+            params.extend(chunk_params)
+            for o_type in chunk_objects:
+                objects.setdefault(o_type, []).extend(chunk_objects[o_type])
+
+        # Check and load the parameters
+        self.load_params(params)
+
+        return objects
+
+    @staticmethod
+    def parse_config_buf(cfg_buffer, silent=False):
+        # pylint: disable=too-many-locals, too-many-branches, too-many-statements
+        """Parse a legacy configuration buffer
+
+        :param cfg_buffer: buffer containing the data of some configuration files
+        :type cfg_buffer: str
+        :param silent: do not log the parsed lines
+        :type silent: bool
+        :return: the parsed global parameters lines and the objects, as returned by
+                 the read_config_buf function
+        :rtype: tuple
+        """
+        objects = {}
+        params = []
+        objectscfg = {}
+        for o_type in Config.configuration_types:
             objectscfg[o_type] = []
 
         tmp = []
@@ -1321,10 +1382,10 @@ class Config(Item):  # pylint: disable=too-many-public-methods,too-many-instance
             if line.startswith("# imported_from="):
                 file_from = line.split('=')[1]
                 line_nb = 0  # reset the line number too
-                if not self.read_config_silent:
+                if not silent:
                     logger.debug("#####\n# file: %s", file_from)
                 continue
-            if not self.read_config_silent:
+            if not silent:
                 logger.debug("- %d: %s", line_nb, line)
 
             line_nb += 1
@@ -1393,15 +1454,12 @@ class Config(Item):  # pylint: disable=too-many-public-methods,too-many-instance
             objectscfg[tmp_type] = []
         objectscfg[tmp_type].append(tmp)
 
-        # Check and load the parameters
-        self.load_params(params)
-
         for o_type in objectscfg:
             objects[o_type] = []
             for items in objectscfg[o_type]:
                 tmp_obj = {}
                 for line in items:
-                    elts = self._cut_line(line)
+                    elts = Config._cut_line(line)
                     if not elts:
                         continue
                     prop = elts[0]
@@ -1413,7 +1471,28 @@ class Config(Item):  # pylint: disable=too-many-public-methods,too-many-instance
                     # Create a new object
                     objects[o_type].append(tmp_obj)
 
-        return objects
+        return params, objects
+
+    @staticmethod
+    def split_config_buf(cfg_buffer):
+        """Split a legacy configuration buffer into the buffers of each configuration file.
+        Each file is expected to hold complete objects definitions.
+
+        :param cfg_buffer: buffer containing all data from config files
+        :type cfg_buffer: str
+        :return: list of buffers, in the files order
+        :rtype: list
+        """
+        chunks = []
+        current = []
+        for line in cfg_buffer.split('\n') + ["# imported_from="]:
+            if line.startswith("# imported_from="):
+                chunk = '\n'.join(current)
+                if chunk.strip():
+                    chunks.append(chunk)
+                current = []
+            current.append(line)
+        return chunks
 
     @staticmethod
     def add_self_defined_objects(raw_objects):
@@ -3163,3 +3242,14 @@ class Config(Item):  # pylint: disable=too-many-public-methods,too-many-instance
 
         return json.dumps(config_dump, ensure_ascii=False, sort_keys=True,
                           indent=2, separators=(', ', ': '), default=default_serialize)
+
+
+def parse_config_chunk(cfg_buffer):
+    """Parse a legacy configuration buffer in a parsing process
+
+    :param cfg_buffer: buffer containing the data of some configuration files
+    :type cfg_buffer: str
+    :return: the parsed global parameters lines and the objects
+    :rtype: tuple
+    """
+    return Config.parse_config_buf(cfg_buffer, silent=True)
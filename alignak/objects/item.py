@@ -64,6 +64,7 @@ import json
 import time
 import itertools
 import logging
+import operator
 
 from copy import copy, deepcopy
 from six import string_types
@@ -84,6 +85,23 @@ from alignak.graph import Graph
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 
+def _single_getter(name):
+    """Get a getter returning the value of a single attribute in a tuple,
+    as operator.attrgetter does for several attributes
+
+    :param name: attribute name
+    :type name: str
+    :return: the getter
+    :rtype: function
+    """
+    getter = operator.attrgetter(name)
+
+    def get(obj):
+        """Get the attribute value in a tuple"""
+        return (getter(obj),)
+    return get
+
+
 class Item(AlignakObject):
     """Class to manage an item
 
@@ -146,6 +164,9 @@ class Item(AlignakObject):
     my_name_property = "name"
     ok_up = ''
 
+    # Per class and brok type properties to fill the broks with, see get_brok_plan
+    _brok_plans = {}
+
     def __init__(self, params, parsing=True):  # pylint: disable=too-many-branches
         if params is None:
             params = {}
@@ -667,6 +688,53 @@ class Item(AlignakObject):
 
         return value
 
+    @classmethod
+    def get_brok_plan(cls, brok_type):
+        """Get the properties to fill a brok of the 'brok_type' type with
+
+        The plan is built once per class and brok type, from the class properties and
+        running properties having 'brok_type' in their fill_brok. The class properties
+        must not change once a brok has been built for the class.
+
+        The plan is a tuple of:
+        - the names of the properties to copy without transformation,
+        - a getter returning the values of these properties, in the same order,
+        - a tuple of (property, default value, brok_transformation) for all the properties
+
+        :param brok_type: name of brok_type
+        :type brok_type: str
+        :return: the brok plan
+        :rtype: tuple
+        """
+        plans = cls.__dict__.get('_brok_plans', None)
+        if plans is None:
+            plans = cls._brok_plans = {}
+        plan = plans.get(brok_type, None)
+        if plan is not None:
+            return plan
+
+        # A running property overrides a configuration property with the same name
+        entries = {}
+        for prop, entry in cls.properties.items():
+            if brok_type in entry.fill_brok:
+                entries[prop] = entry
+        for prop, entry in getattr(cls, 'running_properties', {}).items():
+            if brok_type in entry.fill_brok:
+                entries[prop] = entry
+
+        props = tuple(entries)
+        names = tuple(prop for prop in props if entries[prop].brok_transformation is None)
+        getter = None
+        if names:
+            getter = operator.attrgetter(*names)
+            if len(names) == 1:
+                # A single attribute getter does not return a tuple
+                getter = _single_getter(names[0])
+        fields = tuple((prop, entries[prop].default, entries[prop].brok_transformation)
+                       for prop in props)
+        plan = plans[brok_type] = (names, getter, fields)
+        return plan
+
     def fill_data_brok_from(self, data, brok_type):
         """
         Add properties to 'data' parameter with properties of this object when 'brok_type'
@@ -678,20 +746,25 @@ class Item(AlignakObject):
         :type brok_type: var
         :return: None
         """
-        cls = self.__class__
-        # Configuration properties
-        for prop, entry in list(cls.properties.items()):
-            # Is this property intended for broking?
-            if brok_type in entry.fill_brok:
-                data[prop] = self.get_property_value_for_brok(prop, cls.properties)
-
-        # And the running properties
-        if hasattr(cls, 'running_properties'):
-            # We've got prop in running_properties too
-            for prop, entry in list(cls.running_properties.items()):
-                # if 'fill_brok' in cls.running_properties[prop]:
-                if brok_type in entry.fill_brok:
-                    data[prop] = self.get_property_value_for_brok(prop, cls.running_properties)
+        names, getter, fields = self.__class__.get_brok_plan(brok_type)
+        if getter is not None:
+            try:
+                # Fast path: all the untransformed properties are set
+                data.update(zip(names, getter(self)))
+            except AttributeError:
+                pass
+            else:
+                for prop, default, transformation in fields:
+                    if transformation is not None:
+                        data[prop] = transformation(self, getattr(self, prop, default))
+                return
+
+        for prop, default, transformation in fields:
+            # Get the current value, or the default if need
+            value = getattr(self, prop, default)
+            if transformation is not None:
+                value = transformation(self, value)
+            data[prop] = value
 
     def get_initial_status_brok(self, extra=None):
         """
@@ -1168,6 +1241,8 @@ class Items(object):
         name_property = getattr(self.__class__.inner_class, "my_name_property", None)
         if not name_property:  # pragma: no cover, never called
             raise "Missing my_name_property in class: %s" % self.__class__.inner_class
+        # The items are indexed on their specific index property, if any (eg. services...)
+        name_property = getattr(self.__class__.inner_class, "my_index_property", name_property)
 
         name = getattr(item, name_property, None)
         if not name:
@@ -52,6 +52,7 @@ import logging
 import time
 
 from alignak.util import strip_and_uniq, get_obj_name_two_args_and_void
+from alignak.brokqueue import BrokQueue
 from alignak.misc.serialization import serialize, unserialize, get_alignak_class
 from alignak.objects.item import Item, Items
 from alignak.property import (BoolProp, IntegerProp, FloatProp, StringProp,
@@ -237,10 +238,11 @@ class SatelliteLink(Item):
         logger.debug("Initialize a %s, params: %s", self.__class__.__name__, params)
 
         # My interface context
-        self.broks = []
+        self.broks = BrokQueue()
         self.actions = {}
         self.wait_homerun = {}
         self.pushed_commands = []
+        self.pushed_results = []
 
         self.init_running_properties()
 
@@ -290,6 +292,27 @@ class SatelliteLink(Item):
                   self.managed_conf_id, self.push_flavor)
     __str__ = __repr__
 
+    @property
+    def broks(self):
+        """Broks raised for the satellite
+
+        :return: the satellite broks queue
+        :rtype: alignak.brokqueue.BrokQueue
+        """
+        return self._broks
+
+    @broks.setter
+    def broks(self, broks):
+        """Set the broks raised for the satellite
+
+        :param broks: broks queue or broks list
+        :type broks: alignak.brokqueue.BrokQueue | list
+        :return: None
+        """
+        if not isinstance(broks, BrokQueue):
+            broks = BrokQueue(broks)
+        self._broks = broks
+
     @property
     def scheme(self):
         """Daemon interface scheme
@@ -367,7 +390,7 @@ class SatelliteLink(Item):
         :rtype: list
         """
         res = (self.broks, self.actions, self.wait_homerun, self.pushed_commands)
-        self.broks = []
+        self.broks = BrokQueue()
         self.actions = {}
         self.wait_homerun = {}
         self.pushed_commands = []
@@ -376,11 +399,11 @@ class SatelliteLink(Item):
     def get_and_clear_broks(self):
         """Get and clean all of our broks
 
-        :return: list of all broks of the satellite link
-        :rtype: list
+        :return: all broks of the satellite link
+        :rtype: alignak.brokqueue.BrokQueue
         """
         res = self.broks
-        self.broks = []
+        self.broks = BrokQueue()
         return res
 
     def prepare_for_conf(self):
@@ -591,15 +614,62 @@ class SatelliteLink(Item):
             return decorated
         return decorator
 
+    def communication_failed(self, fn_name, exp):
+        """Manage an error raised when communicating with the daemon
+
+        A connection error sets the daemon as dead, a timeout or another HTTP error adds
+        a failed attempt and a data error makes the current daemon bail out.
+
+        :param fn_name: name of the failed communication function
+        :type fn_name: str
+        :param exp: the raised exception
+        :type exp: Exception
+        :return: False for a connection timeout, else None
+        """
+        if isinstance(exp, HTTPClientConnectionException):
+            # A Connection error is raised when the daemon connection cannot be established
+            # No way with the configuration parameters!
+            if not self.stopping:
+                logger.warning("A daemon (%s/%s) that we must be related with "
+                               "cannot be connected: %s", self.type, self.name, exp)
+            else:
+                logger.info("Stopping... daemon (%s/%s) cannot be connected. "
+                            "It is also probably stopping or yet stopped.",
+                            self.type, self.name)
+            self.set_dead()
+        elif isinstance(exp, (LinkError, HTTPClientTimeoutException)):
+            self.add_failed_check_attempt("Connection timeout "
+                                          "with '%s': %s" % (fn_name, str(exp)))
+            return False
+        elif isinstance(exp, HTTPClientDataException):
+            # A Data error is raised when the daemon HTTP response is not 200!
+            # No way with the communication if some problems exist in the daemon interface!
+            # Abort all
+            err = "Some daemons that we must be related with " \
+                  "have some interface problems. Sorry, I bail out! Problems are: %s" \
+                  % str(exp)
+            logger.error(err)
+            os.sys.exit(err)
+        elif isinstance(exp, HTTPClientException):
+            self.add_failed_check_attempt("Error with '%s': %s" % (fn_name, str(exp)))
+
+        return None
+
     def communicate(*outer_args, **outer_kwargs):
         # pylint: disable=unused-argument, no-method-argument
-        """Check if the daemon connection is authorized and valid"""
+        """Check if the daemon connection is authorized and valid
+
+        If the decorated function is called with `defer_errors=True`, the communication
+        errors are raised rather than managed: the caller must manage them with
+        `communication_failed`. This is used when the function is called by another thread
+        than the daemon main thread that is the only one to change the link state."""
         def decorator(func):  # pylint: disable=missing-docstring
             def decorated(*args, **kwargs):  # pylint: disable=missing-docstring
                 # outer_args and outer_kwargs are the decorator arguments
                 # args and kwargs are the decorated function arguments
                 fn_name = func.__name__
                 link = args[0]
+                defer_errors = kwargs.pop('defer_errors', False)
                 if not link.alive:
                     logger.warning("%s is not alive for %s", link.name, fn_name)
                     return None
@@ -611,34 +681,11 @@ class SatelliteLink(Item):
 
                     logger.debug("[%s] Calling: %s, %s, %s", link.name, fn_name, args, kwargs)
                     return func(*args, **kwargs)
-                except HTTPClientConnectionException as exp:
-                    # A Connection error is raised when the daemon connection cannot be established
-                    # No way with the configuration parameters!
-                    if not link.stopping:
-                        logger.warning("A daemon (%s/%s) that we must be related with "
-                                       "cannot be connected: %s", link.type, link.name, exp)
-                    else:
-                        logger.info("Stopping... daemon (%s/%s) cannot be connected. "
-                                    "It is also probably stopping or yet stopped.",
-                                    link.type, link.name)
-                    link.set_dead()
-                except (LinkError, HTTPClientTimeoutException) as exp:
-                    link.add_failed_check_attempt("Connection timeout "
-                                                  "with '%s': %s" % (fn_name, str(exp)))
-                    return False
-                except HTTPClientDataException as exp:
-                    # A Data error is raised when the daemon HTTP response is not 200!
-                    # No way with the communication if some problems exist in the daemon interface!
-                    # Abort all
-                    err = "Some daemons that we must be related with " \
-                          "have some interface problems. Sorry, I bail out! Problems are: %s" \
-                          % str(exp)
-                    logger.error(err)
-                    os.sys.exit(err)
-                except HTTPClientException as exp:
-                    link.add_failed_check_attempt("Error with '%s': %s" % (fn_name, str(exp)))
-
-                return None
+                except (LinkError, HTTPClientConnectionException, HTTPClientTimeoutException,
+                        HTTPClientDataException, HTTPClientException) as exp:
+                    if defer_errors:
+                        raise
+                    return link.communication_failed(fn_name, exp)
 
             return decorated
         return decorator
@@ -754,18 +801,32 @@ class SatelliteLink(Item):
 
     @valid_connection()
     @communicate()
-    def get_initial_broks(self, broker_name):
+    def get_initial_broks(self, broker_name, page_size=0, token=''):
         """Send a HTTP request to the satellite (GET /_initial_broks)
 
         Used to build the initial broks for a broker connecting to a scheduler
 
+        If a page size is provided, get a page of the initial broks stream. The page broks
+        are un-serialized.
+
         :param broker_name: the concerned broker name
         :type broker_name: str
-        :return: Boolean indicating if the running id changed
-        :type: bool
+        :param page_size: maximum number of initial broks in the page
+        :type page_size: int
+        :param token: continuation token of the initial broks stream
+        :type token: str
+        :return: the number of initial broks, or the initial broks page
+        :type: int or dict
         """
         logger.debug("Getting initial broks for %s, %s %s", self.name, self.alive, self.reachable)
-        return self.con.get('_initial_broks', {'broker_name': broker_name}, wait=True)
+        if not page_size:
+            return self.con.get('_initial_broks', {'broker_name': broker_name}, wait=True)
+
+        res = self.con.get('_initial_broks', {'broker_name': broker_name,
+                                              'page_size': page_size, 'token': token}, wait=True)
+        if isinstance(res, dict) and 'broks' in res:
+            res['broks'] = unserialize(res['broks'], True)
+        return res
 
     @valid_connection()
     @communicate()
@@ -925,6 +986,20 @@ class SatelliteLink(Item):
         logger.debug("Pushing %d external commands", len(commands))
         return self.con.post('_run_external_commands', {'cmds': commands}, wait=True)
 
+    @valid_connection()
+    @communicate()
+    def push_check_results(self, results):
+        """Send a HTTP request to the satellite (POST /check_results)
+        to send the passive check results to the satellite
+
+        :param results: check results list to send
+        :type results: list
+        :return: True on success, False on failure
+        :rtype: bool
+        """
+        logger.debug("Pushing %d check results", len(results))
+        return self.con.post('check_results', {'results': results}, wait=True)
+
     @valid_connection()
     @communicate()
     def get_external_commands(self):
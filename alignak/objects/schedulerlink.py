@@ -45,7 +45,7 @@ This module provide SchedulerLink and SchedulerLinks classes used to manage sche
 """
 import logging
 from alignak.objects.satellitelink import SatelliteLink, SatelliteLinks
-from alignak.property import BoolProp, IntegerProp, StringProp, FULL_STATUS
+from alignak.property import BoolProp, IntegerProp, StringProp, DictProp, FULL_STATUS
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -83,6 +83,9 @@ class SchedulerLink(SatelliteLink):
         #     DictProp(default={}),
         'need_conf':
             StringProp(default=True),
+        # The configuration difference to push rather than the whole configuration
+        'cfg_diff':
+            DictProp(default=None),
         'external_commands':
             StringProp(default=[]),
     })
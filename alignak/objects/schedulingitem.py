@@ -85,8 +85,9 @@ from alignak.property import (BoolProp, IntegerProp, FloatProp,
 from alignak.util import (to_serialized, from_serialized, dict_to_serialized_dict)
 from alignak.notification import Notification
 from alignak.macroresolver import MacroResolver
+from alignak.livesynthesis import SynthesisAttribute
 from alignak.eventhandler import EventHandler
-from alignak.dependencynode import DependencyNodeFactory
+from alignak.dependencynode import DependencyNodeFactory, DependencyAttribute
 from alignak.acknowledge import Acknowledge
 from alignak.comment import Comment
 from alignak.commandcall import CommandCall
@@ -103,6 +104,20 @@ class SchedulingItem(Item):  # pylint: disable=too-many-instance-attributes
     current_event_id = 0
     current_problem_id = 0
 
+    # The scheduler live synthesis counters depend on these attributes (see LiveSynthesis)
+    state = SynthesisAttribute('state')
+    state_type = SynthesisAttribute('state_type')
+    is_problem = SynthesisAttribute('is_problem')
+    problem_has_been_acknowledged = DependencyAttribute('problem_has_been_acknowledged',
+                                                        synthesis=True)
+    in_scheduled_downtime = DependencyAttribute('in_scheduled_downtime', synthesis=True)
+    is_flapping = SynthesisAttribute('is_flapping')
+    active_checks_enabled = SynthesisAttribute('active_checks_enabled')
+    passive_checks_enabled = SynthesisAttribute('passive_checks_enabled')
+    # The business rules nodes states depend on the last hard state, the acknowledgement
+    # and the downtime attributes (see DependencyNode)
+    last_hard_state_id = DependencyAttribute('last_hard_state_id')
+
     properties = Item.properties.copy()
     properties.update({
         'display_name':
@@ -2626,8 +2641,13 @@ class SchedulingItem(Item):  # pylint: disable=too-many-instance-attributes
             self.processed_business_rule = rule
 
             fact = DependencyNodeFactory(self)
-            self.business_rule = fact.eval_cor_pattern(rule, hosts, services,
-                                                       hostgroups, servicegroups, running)
+            business_rule = fact.eval_cor_pattern(rule, hosts, services,
+                                                  hostgroups, servicegroups, running)
+            # The scheduler attached our former rule, the new one replaces it
+            if self.business_rule is not None and self.business_rule.is_attached():
+                self.business_rule.detach()
+                business_rule.attach(hosts, services)
+            self.business_rule = business_rule
 
     def get_business_rule_output(self, hosts, services, macromodulations, timeperiods):
         # pylint: disable=too-many-locals, too-many-branches
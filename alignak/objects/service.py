@@ -72,6 +72,8 @@ import logging
 import time
 import re
 
+from six import add_metaclass
+
 from alignak.objects.schedulingitem import SchedulingItem, SchedulingItems
 
 from alignak.autoslots import AutoSlots
@@ -84,13 +86,13 @@ from alignak.log import make_monitoring_log
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 
+@add_metaclass(AutoSlots)
 class Service(SchedulingItem):
     """Service class implements monitoring concepts for service.
     For example it defines parents, check_interval, check_command  etc.
     """
     # AutoSlots create the __slots__ with properties and
     # running_properties names
-    __metaclass__ = AutoSlots
 
     # The host and service do not have the same 0 value, now yes :)
     ok_up = u'OK'
@@ -116,18 +116,25 @@
 """
 This module provide Timeperiod class used to define time periods to do
 action or not if we are in right period
+
+A timeperiod compiles its dateranges, minus its excluded timeperiods, into a sorted list of
+[start, end) valid periods over a rolling horizon that starts at the beginning of the
+current day. The validity, next valid time and next invalid time queries are then answered
+with a binary search in this list. The periods list is compiled again when the queried time
+is out of the horizon, and the queries too far from now use the dateranges search.
 """
 
 import logging
 import time
 import re
+from bisect import bisect_right
 
 from alignak.objects.item import Item, Items
 
 from alignak.daterange import Daterange, CalendarDaterange
 from alignak.daterange import StandardDaterange, MonthWeekDayDaterange
 from alignak.daterange import MonthDateDaterange, WeekDayDaterange
-from alignak.daterange import MonthDayDaterange
+from alignak.daterange import MonthDayDaterange, get_day
 from alignak.property import IntegerProp, StringProp, ListProp, BoolProp, FULL_STATUS
 from alignak.log import make_monitoring_log
 from alignak.misc.serialization import get_alignak_class
@@ -135,6 +142,9 @@ from alignak.util import merge_periods
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
+# Number of days the valid periods of a timeperiod are compiled for
+COMPILED_HORIZON_DAYS = 7
+
 
 class Timeperiod(Item):
     """
@@ -197,6 +207,7 @@ class Timeperiod(Item):
         super(Timeperiod, self).__init__(params=standard_params, parsing=parsing)
         self.cache = {}  # For tuning purpose only
         self.invalid_cache = {}  # same but for invalid search
+        self.reset_compiled_periods()
 
         # We use the uuid presence to assume we are un-serializing
         if not parsing:
@@ -256,6 +267,130 @@ class Timeperiod(Item):
         """
         return super(Timeperiod, self).serialize(no_json=no_json, printing=printing)
 
+    def reset_compiled_periods(self):
+        """
+        Forget the compiled valid periods, they will be compiled again when needed
+
+        :return: None
+        """
+        self.compiled_starts = []
+        self.compiled_ends = []
+        self.compiled_horizon = (0, 0)
+        self.compiled_signature = None
+
+    def get_compiled_signature(self):
+        """
+        Get a signature of the dateranges and excluded timeperiods the valid periods
+        are compiled from, to know if they changed since the periods got compiled
+
+        :return: signature
+        :rtype: tuple
+        """
+        exclude = getattr(self, 'exclude', [])
+        return (id(self.dateranges), len(self.dateranges), id(exclude), len(exclude))
+
+    def get_valid_periods(self, start, end):
+        """
+        Get the sorted and merged [start, end) periods this timeperiod is valid in,
+        between the provided start and end times. The excluded timeperiods valid periods
+        are removed from the dateranges ones.
+
+        :param start: periods start time
+        :type start: int
+        :param end: periods end time
+        :type end: int
+        :return: list of (start, end) periods
+        :rtype: list
+        """
+        periods = []
+        for daterange in self.dateranges:
+            timestamp = daterange.get_next_valid_time_from_t(start)
+            while timestamp is not None and timestamp < end:
+                period_end = daterange.get_next_invalid_time_from_t(timestamp)
+                if period_end is None:
+                    period_end = end
+                if period_end <= timestamp:
+                    # Not really valid, search from the next second
+                    timestamp = daterange.get_next_valid_time_from_t(timestamp + 1)
+                    continue
+                periods.append((timestamp, min(period_end, end)))
+                timestamp = daterange.get_next_valid_time_from_t(period_end)
+
+        merged = []
+        for (period_start, period_end) in sorted(periods):
+            if merged and period_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], period_end))
+            else:
+                merged.append((period_start, period_end))
+
+        for timeperiod in getattr(self, 'exclude', []):
+            merged = self.remove_periods(merged, timeperiod.get_valid_periods(start, end))
+        return merged
+
+    @staticmethod
+    def remove_periods(periods, removed):
+        """
+        Remove some periods from a list of periods. Both lists are sorted and merged
+        lists of [start, end) periods.
+
+        :param periods: list of (start, end) periods
+        :type periods: list
+        :param removed: list of (start, end) periods to remove
+        :type removed: list
+        :return: list of (start, end) periods
+        :rtype: list
+        """
+        res = []
+        index = 0
+        for (start, end) in periods:
+            while index < len(removed) and removed[index][1] <= start:
+                index += 1
+            cursor = index
+            while start < end and cursor < len(removed) and removed[cursor][0] < end:
+                if removed[cursor][0] > start:
+                    res.append((start, removed[cursor][0]))
+                start = max(start, removed[cursor][1])
+                cursor += 1
+            if start < end:
+                res.append((start, end))
+        return res
+
+    def compile_periods(self, timestamp):
+        """
+        Compile the valid periods for the horizon starting at the beginning of the
+        day of the provided time
+
+        :param timestamp: time the horizon is to include
+        :type timestamp: int
+        :return: None
+        """
+        start = get_day(timestamp)
+        end = start + COMPILED_HORIZON_DAYS * 86400
+        periods = self.get_valid_periods(start, end)
+        self.compiled_starts = [period[0] for period in periods]
+        self.compiled_ends = [period[1] for period in periods]
+        self.compiled_horizon = (start, end)
+        self.compiled_signature = self.get_compiled_signature()
+
+    def get_compiled_index(self, timestamp):
+        """
+        Get the index of the last compiled valid period starting before the provided time.
+        The periods are compiled again if this time is out of the current horizon or if
+        the dateranges changed.
+
+        :param timestamp: time to search for
+        :type timestamp: int
+        :return: None if the time is too far from now to use the compiled periods,
+                 else the period index, -1 if no period starts before the time
+        :rtype: None | int
+        """
+        if not self.compiled_horizon[0] <= timestamp < self.compiled_horizon[1] \
+                or self.compiled_signature != self.get_compiled_signature():
+            if abs(timestamp - time.time()) >= COMPILED_HORIZON_DAYS * 86400:
+                return None
+            self.compile_periods(timestamp)
+        return bisect_right(self.compiled_starts, timestamp) - 1
+
     def is_time_valid(self, timestamp):
         """
         Check if a time is valid or not
@@ -263,6 +398,10 @@ class Timeperiod(Item):
         :return: time is valid or not
         :rtype: bool
         """
+        index = self.get_compiled_index(timestamp)
+        if index is not None:
+            return index >= 0 and timestamp < self.compiled_ends[index]
+
         if hasattr(self, 'exclude'):
             for daterange in self.exclude:
                 if daterange.is_time_valid(timestamp):
@@ -398,6 +537,13 @@ class Timeperiod(Item):
         timestamp = int(timestamp)
         original_t = timestamp
 
+        index = self.get_compiled_index(timestamp)
+        if index is not None:
+            if index >= 0 and timestamp < self.compiled_ends[index]:
+                return timestamp
+            if index + 1 < len(self.compiled_starts):
+                return self.compiled_starts[index + 1]
+
         res_from_cache = self.find_next_valid_time_from_cache(timestamp)
         if res_from_cache is not None:
             return res_from_cache
@@ -466,6 +612,14 @@ class Timeperiod(Item):
         timestamp = int(timestamp)
         original_t = timestamp
 
+        index = self.get_compiled_index(timestamp)
+        if index is not None:
+            if index < 0 or timestamp >= self.compiled_ends[index]:
+                return timestamp
+            # A period ending with the horizon may last after it
+            if self.compiled_ends[index] < self.compiled_horizon[1]:
+                return self.compiled_ends[index]
+
         dr_mins = []
         for daterange in self.dateranges:
             timestamp = original_t
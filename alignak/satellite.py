@@ -76,7 +76,7 @@ import psutil
 from alignak.http.generic_interface import GenericInterface
 
 from alignak.misc.serialization import unserialize, AlignakClassLookupException
-from alignak.property import BoolProp, IntegerProp, ListProp, FULL_STATUS
+from alignak.property import BoolProp, IntegerProp, FloatProp, ListProp, FULL_STATUS
 from alignak.brok import Brok
 from alignak.external_command import ExternalCommand
 
@@ -88,6 +88,8 @@ from alignak.stats import statsmgr
 from alignak.check import Check  # pylint: disable=W0611
 from alignak.objects.module import Module  # pylint: disable=W0611
 from alignak.objects.satellitelink import SatelliteLink, LinkError
+from alignak.linkspool import LinksPool
+from alignak.workersscaler import WorkersScaler
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -399,15 +401,31 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
             IntegerProp(default=256, fill_brok=[FULL_STATUS], to_send=True),
         'worker_polling_interval':
             IntegerProp(default=1, to_send=True),
+        'workers_event_driven':
+            BoolProp(default=False),
+        'worker_scale_latency':
+            FloatProp(default=5.0),
+        'worker_idle_timeout':
+            IntegerProp(default=60),
         'poller_tags':
             ListProp(default=['None'], to_send=True),
         'reactionner_tags':
             ListProp(default=['None'], to_send=True),
+        'schedulers_polling_threads':
+            IntegerProp(default=0),
+        'schedulers_polling_timeout':
+            FloatProp(default=1.0),
     })
 
     def __init__(self, name, **kwargs):
         super(Satellite, self).__init__(name, **kwargs)
 
+        # Concurrent communication with our schedulers
+        self.links_pool = None
+        if self.schedulers_polling_threads > 0:
+            self.links_pool = LinksPool(self.schedulers_polling_threads,
+                                        name='%s-schedulers' % self.name)
+
         # Move these properties to the base Daemon ?
         # todo: change this?
         # Keep broks so they can be eaten by a broker
@@ -459,6 +477,9 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         # round robin queue ic
         self.rr_qid = 0
 
+        # Workers load and scaling
+        self.workers_scaler = WorkersScaler(self)
+
     def manage_action_return(self, action):
         """Manage action return from Workers
         We just put them into the corresponding sched
@@ -479,6 +500,9 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         scheduler_uuid = action.my_scheduler
         logger.debug("Got action return: %s / %s", scheduler_uuid, action.uuid)
 
+        # Account the action return in its worker load
+        self.workers_scaler.action_returned(action)
+
         try:
             # Now that we know where to put the action result, we do not need any reference to
             # the scheduler nor the worker
@@ -534,7 +558,19 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
             # scheduler level, which shouldn't be a problem given they are
             # indexed by their "action_id".
 
-            scheduler_link.push_results(list(results.values()), self.name)
+            if self.links_pool is not None:
+                # The results are pushed by the pool, they will be managed with the actions
+                # got from the schedulers (see do_get_new_actions)
+                if not self.links_pool.submit('push', scheduler_link, scheduler_link.push_results,
+                                              list(results.values()), self.name,
+                                              defer_errors=True):
+                    # Still pushing former results to this scheduler, push later
+                    continue
+            else:
+                _t0 = time.time()
+                scheduler_link.push_results(list(results.values()), self.name)
+                statsmgr.timer('results.pushed.latency.%s' % scheduler_link.name,
+                               time.time() - _t0)
             results.clear()
 
     def create_and_launch_worker(self, module_name='fork'):
@@ -573,7 +609,8 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         queue = Queue()
         worker = Worker(module_name, queue, self.returns_queue, self.processes_by_worker,
                         max_plugins_output_length=self.max_plugins_output_length,
-                        target=target, loaded_into=self.name)
+                        target=target, loaded_into=self.name,
+                        event_driven=self.workers_event_driven)
         # worker.module_name = module_name
         # save this worker
         self.workers[worker.get_id()] = worker
@@ -613,6 +650,10 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         """
         self.do_stop_workers()
 
+        if self.links_pool is not None:
+            logger.info("Stopping the schedulers communication threads")
+            self.links_pool.stop(timeout=1)
+
         super(Satellite, self).do_stop()
 
     def add(self, elt):
@@ -685,8 +726,8 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         for worker_id in w_to_del:
             worker = self.workers[worker_id]
 
-            # Del the queue of the module queue
-            del self.q_by_mod[worker.module_name][worker.get_id()]
+            # Del the queue of the module queue, if the worker was not retiring
+            self.q_by_mod[worker.module_name].pop(worker.get_id(), None)
 
             for scheduler_uuid in self.schedulers:
                 sched = self.schedulers[scheduler_uuid]
@@ -699,7 +740,10 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
             del self.workers[worker_id]
 
     def adjust_worker_number_by_load(self):
-        """Try to create the minimum workers specified in the configuration
+        """Adjust the workers count of each module to its load
+
+        Start the minimum workers specified in the configuration, then scale the workers
+        of each module according to their load (see `WorkersScaler.scale_module`)
 
         :return: None
         """
@@ -729,11 +773,13 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
             logger.warning("The module %s is not a worker one, I remove it from the worker list.",
                            mod)
             del self.q_by_mod[mod]
-        # TODO: if len(workers) > 2*wish, maybe we can kill a worker?
+
+        self.workers_scaler.scale()
 
     def _get_queue_for_the_action(self, action):
         """Find action queue for the action depending on the module.
-        The id is found with action modulo on action id
+        The least loaded worker of the module is chosen, the round robin index
+        only rotates the choice between the equally loaded workers
 
         :param a: the action that need action queue to be assigned
         :type action: object
@@ -748,10 +794,10 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         if not queues:
             return (0, None)
 
-        # if not get action round robin index to get action queue based
-        # on the action id
+        # Get the least loaded worker, starting from the round robin index
         self.rr_qid = (self.rr_qid + 1) % len(queues)
-        (worker_id, queue) = queues[self.rr_qid]
+        queues = queues[self.rr_qid:] + queues[:self.rr_qid]
+        (worker_id, queue) = self.workers_scaler.get_least_loaded(queues)
 
         # return the id of the worker (i), and its queue
         return (worker_id, queue)
@@ -820,6 +866,7 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         logger.debug("Queuing message: %s", msg)
         queue.put_nowait(msg)
         logger.debug("Queued")
+        self.workers_scaler.action_assigned(worker_id, action)
 
     def get_new_actions(self):
         """ Wrapper function for do_get_new_actions
@@ -848,6 +895,12 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         do_checks = self.__class__.do_checks
         do_actions = self.__class__.do_actions
 
+        params = {'do_checks': do_checks, 'do_actions': do_actions,
+                  'poller_tags': self.poller_tags,
+                  'reactionner_tags': self.reactionner_tags,
+                  'worker_name': self.name,
+                  'module_types': list(self.q_by_mod.keys())}
+
         # We check and get the new actions to execute in each of our schedulers
         for scheduler_link_uuid in self.schedulers:
             scheduler_link = self.schedulers[scheduler_link_uuid]
@@ -858,20 +911,75 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
 
             logger.debug("get new actions, scheduler: %s", scheduler_link.name)
 
+            if self.links_pool is not None:
+                # The scheduler is requested by the pool
+                self.links_pool.submit('get', scheduler_link, scheduler_link.get_actions, params)
+                continue
+
             # OK, go for it :)
             _t0 = time.time()
-            actions = scheduler_link.get_actions({'do_checks': do_checks, 'do_actions': do_actions,
-                                                  'poller_tags': self.poller_tags,
-                                                  'reactionner_tags': self.reactionner_tags,
-                                                  'worker_name': self.name,
-                                                  'module_types': list(self.q_by_mod.keys())})
-            if actions:
-                logger.debug("Got %d actions from %s", len(actions), scheduler_link.name)
-                # We 'tag' them with my_scheduler and put into queue for workers
-                self.add_actions(actions, scheduler_link.instance_id)
-                logger.debug("Got %d actions from %s in %s",
-                             len(actions), scheduler_link.name, time.time() - _t0)
-            statsmgr.gauge('actions.added.count.%s' % (scheduler_link.name), len(actions))
+            actions = scheduler_link.get_actions(params)
+            self.manage_scheduler_actions(scheduler_link, actions, time.time() - _t0)
+
+        if self.links_pool is not None:
+            # Wait for the schedulers answers, but not for the slow ones that
+            # will be managed on a next loop turn
+            self._manage_links_pool_results(
+                self.links_pool.get_results(self.schedulers_polling_timeout))
+            statsmgr.gauge('actions.in-flight', len(self.links_pool))
+
+    def manage_scheduler_actions(self, scheduler_link, actions, latency):
+        """Manage the actions got from a scheduler
+
+        :param scheduler_link: the scheduler the actions were got from
+        :type scheduler_link: alignak.objects.schedulerlink.SchedulerLink
+        :param actions: the got actions
+        :type actions: list
+        :param latency: time spent to get the actions
+        :type latency: float
+        :return: None
+        """
+        if actions:
+            # We 'tag' them with my_scheduler and put into queue for workers
+            self.add_actions(actions, scheduler_link.instance_id)
+            logger.debug("Got %d actions from %s in %s",
+                         len(actions), scheduler_link.name, latency)
+        statsmgr.gauge('actions.added.count.%s' % (scheduler_link.name), len(actions or []))
+        statsmgr.timer('actions.got.latency.%s' % scheduler_link.name, latency)
+
+    def _manage_links_pool_results(self, results):
+        """Manage the results of the requests executed by the links pool
+
+        :param results: list of (kind, link, result, error, duration)
+        :type results: list
+        :return: None
+        """
+        for kind, scheduler_link, result, error, latency in results:
+            if error is not None and not isinstance(error, Exception):
+                # A pool thread request raised a SystemExit, exit from the main thread
+                raise error
+
+            if self.schedulers.get(scheduler_link.uuid) is not scheduler_link:
+                logger.debug("Ignoring a %s result for a former scheduler link: %s",
+                             kind, scheduler_link.name)
+                continue
+
+            if error is not None:
+                if kind == 'push':
+                    # The link state is only changed by the main thread
+                    scheduler_link.communication_failed('push_results', error)
+                if isinstance(error, LinkError):
+                    logger.warning("Scheduler connection failed, I could not %s: %s",
+                                   "send my results" if kind == 'push' else "get new actions",
+                                   error)
+                else:
+                    logger.error("Scheduler %s request failed: %s", kind, error)
+                continue
+
+            if kind == 'push':
+                statsmgr.timer('results.pushed.latency.%s' % scheduler_link.name, latency)
+            else:
+                self.manage_scheduler_actions(scheduler_link, result, latency)
 
     def clean_previous_run(self):
         """Clean variables from previous configuration,
@@ -905,49 +1013,8 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         # Call modules that manage a starting tick pass
         self.hook_point('tick')
 
-        # Print stats for debug
-        for _, sched in self.schedulers.items():
-            for mod in self.q_by_mod:
-                # In workers we've got actions sent to queue - queue size
-                for (worker_id, queue) in list(self.q_by_mod[mod].items()):
-                    try:
-                        actions_count = queue.qsize()
-                        results_count = self.returns_queue.qsize()
-                        logger.debug("[%s][%s][%s] actions queued: %d, results queued: %d",
-                                     sched.name, mod, worker_id, actions_count, results_count)
-                        # Update the statistics
-                        statsmgr.gauge('worker.%s.actions-queue-size' % worker_id,
-                                       actions_count)
-                        statsmgr.gauge('worker.%s.results-queue-size' % worker_id,
-                                       results_count)
-                    except (IOError, EOFError):
-                        pass
-
-        # todo temporaray deactivate all this stuff!
-        # Before return or get new actions, see how we managed
-        # the former ones: are they still in queue(s)? If so, we
-        # must wait more or at least have more workers
-        # wait_ratio = self.wait_ratio.get_load()
-        # total_q = 0
-        # try:
-        #     for mod in self.q_by_mod:
-        #         for queue in list(self.q_by_mod[mod].values()):
-        #             total_q += queue.qsize()
-        # except (IOError, EOFError):
-        #     pass
-        # if total_q != 0 and wait_ratio < 2 * self.worker_polling_interval:
-        #     logger.debug("I decide to increase the wait ratio")
-        #     self.wait_ratio.update_load(wait_ratio * 2)
-        #     # self.wait_ratio.update_load(self.worker_polling_interval)
-        # else:
-        #     # Go to self.worker_polling_interval on normal run, if wait_ratio
-        #     # was >2*self.worker_polling_interval,
-        #     # it make it come near 2 because if < 2, go up :)
-        #     self.wait_ratio.update_load(self.worker_polling_interval)
-        # wait_ratio = self.wait_ratio.get_load()
-        # statsmgr.timer('core.wait-ratio', wait_ratio)
-        # if self.log_loop:
-        #     logger.debug("[%s] wait ratio: %f", self.name, wait_ratio)
+        # Workers queues and load statistics
+        self.workers_scaler.send_stats()
 
         # Maybe we do not have enough workers, we check for it
         # and launch the new ones if needed
@@ -1095,13 +1162,10 @@ class Satellite(BaseSatellite):  # pylint: disable=too-many-instance-attributes
         counters['broks'] = len(self.broks)
         counters['events'] = len(self.events)
         counters['workers'] = len(self.workers)
+        counters['workers-added'] = self.workers_scaler.nb_added
+        counters['workers-retired'] = self.workers_scaler.nb_retired
 
-        if self.workers:
-            res['workers'] = {}
-            for worker in list(self.workers.values()):
-                stats = getattr(self.workers[worker.get_id()], 'stats', None)
-                if stats:
-                    res['workers'][worker.get_id()] = stats
+        res.update(self.workers_scaler.get_stats())
 
         return res
 
@@ -67,16 +67,20 @@ The major part of monitoring "intelligence" is in this module.
 """
 # pylint: disable=too-many-lines
 # pylint: disable=too-many-public-methods
+import copy
 import time
 from datetime import datetime
 import os
 import logging
+import itertools
 import tempfile
 import traceback
 import queue
+import threading
 from collections import defaultdict
 from six import string_types
 
+from alignak.alignakobject import get_a_new_object_id
 from alignak.objects.item import Item
 from alignak.objects.hostgroup import Hostgroup
 from alignak.objects.servicegroup import Servicegroup
@@ -88,6 +92,12 @@ from alignak.action import (ACT_STATUS_SCHEDULED, ACT_STATUS_POLLED,
                             ACT_STATUS_TIMEOUT, ACT_STATUS_ZOMBIE,
                             ACT_STATUS_WAIT_CONSUME, ACT_STATUS_WAIT_DEPEND,
                             ACT_STATUS_WAITING_ME)
+from alignak.actionqueue import ActionQueue, BUCKET_INTERNAL, BUCKET_MASTER
+from alignak.schedulingqueue import SchedulingQueue
+from alignak.livesynthesis import LiveSynthesis
+from alignak.loopprofiler import LoopProfiler
+from alignak.snapshot import SchedulerSnapshot
+from alignak.configdigest import DIFF_COLLECTIONS
 from alignak.external_command import ExternalCommand
 from alignak.check import Check
 from alignak.notification import Notification
@@ -97,7 +107,7 @@ from alignak.downtime import Downtime
 from alignak.comment import Comment
 from alignak.util import average_percentile
 from alignak.stats import statsmgr
-from alignak.misc.serialization import unserialize
+from alignak.misc.serialization import serialize, unserialize
 from alignak.acknowledge import Acknowledge
 from alignak.log import make_monitoring_log
 from alignak.property import FULL_STATUS
@@ -107,6 +117,16 @@ MULTIPLIER_MAX_CHECKS = 5
 MULTIPLIER_MAX_BROKS = 5
 MULTIPLIER_MAX_ACTIONS = 5
 
+# Delay before visiting again an host / service that did not get a check nor a next check time
+SCHEDULING_RETRY_DELAY = 60
+
+# Not retained running properties that an updated host / service gets from its former version
+KEPT_RUNNING_PROPERTIES = ('checks_in_progress', 'in_checking', 'actions', 'broks',
+                           'is_problem', 'is_impact', 'source_problems', 'impacts',
+                           'state_before_impact', 'state_id_before_impact',
+                           'state_changed_since_impact', 'notified_contacts_ids',
+                           'last_check_command')
+
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 
@@ -125,6 +145,21 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         # The scheduling is on/off, default is False
         self.must_schedule = False
 
+        # Read-only snapshot of our hosts and services state, for the HTTP interface. It is
+        # only built when some queries requested it since it was published
+        self.snapshot = None
+        self.snapshot_version = 0
+        self.snapshot_requested = False
+        # Objects (type, name) requested by the queries, copied in the next snapshot
+        self.snapshot_objects = set()
+        # Notified when a new snapshot is published
+        self.snapshot_published = threading.Condition()
+
+        # Send the hosts / services status and check results broks as delta broks
+        self.delta_broks = False
+        # Last state of the items sent in the delta broks
+        self.broks_states = {}
+
         # The actions results returned by satelittes or fetched from
         # passive satellites are stored in this queue
         self.waiting_results = queue.Queue()
@@ -180,6 +215,8 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                  self.get_objects_from_from_queues, 1),
             21: ('get_latency_average_percentile',
                  self.get_latency_average_percentile, 10),
+            22: ('publish_snapshot',
+                 self.publish_snapshot, 1),
         }
 
         # Statistics part
@@ -228,6 +265,21 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         # Our queues
         self.checks = {}
         self.actions = {}
+        # and their launch time indexes
+        self.checks_queue = ActionQueue()
+        self.actions_queue = ActionQueue()
+        # Hosts and services that are due for scheduling
+        self.scheduling_queue = SchedulingQueue()
+        # Hosts which retention data may have changed since the last retention save
+        self.retention_dirty = set()
+        # Configuration objects (hosts, services, groups, contacts) uuid -> object
+        self.items_registry = {}
+        # Hosts and services states counters
+        self.livesynthesis = None
+        # Hosts / services which business impact is modulated
+        self.business_impact_modulated = []
+        # Durations and processed items of the scheduling loop works
+        self.loop_profiler = LoopProfiler()
 
         # self.program_start = int(time.time())
         self.program_start = self.my_daemon.program_start
@@ -238,6 +290,9 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
 
         # This scheduler has raised the initial broks
         self.raised_initial_broks = False
+        # Initial broks streamed to the brokers: broker uuid -> (stream token, page number,
+        # initial broks generator)
+        self.initial_broks_streams = {}
 
         self.need_dump_environment = False
         self.need_objects_dump = False
@@ -267,6 +322,9 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             self.waiting_results.queue.clear()
         self.checks.clear()
         self.actions.clear()
+        self.checks_queue = ActionQueue()
+        self.actions_queue = ActionQueue()
+        self.scheduling_queue = SchedulingQueue()
 
     def all_my_hosts_and_services(self):
         """Create an iterator for all my known hosts and services
@@ -317,6 +375,28 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             statsmgr.gauge('configuration.templates_%s' % strclss,
                            len(getattr(lst_objects, 'templates')))
 
+        # Index our configuration objects by uuid
+        self.register_items()
+
+        # Share the equal values of our hosts and services properties
+        if getattr(self.pushed_conf, 'compact_objects', False):
+            self.compact_items()
+
+        # Send only the changed properties in the status and check results broks
+        self.delta_broks = getattr(self.pushed_conf, 'delta_broks', False)
+        self.broks_states = {}
+
+        # The previous snapshot is for the previous configuration
+        self.snapshot = None
+        self.reset_initial_broks()
+
+        # Maintain the live synthesis counters of our hosts and services
+        self.livesynthesis = LiveSynthesis(self.hosts, self.services)
+        MacroResolver().livesynthesis = self.livesynthesis
+
+        # Attach the business rules to the items they depend on
+        self.attach_business_rules()
+
         # We need reversed list for searching in the retention file read
         # todo: check what it is about...
         self.services.optimize_service_search(self.hosts)
@@ -343,6 +423,116 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         for item in self.all_my_hosts_and_services():
             item.instance_id = self.instance_id
 
+        # All our hosts/services are to be scheduled and saved in the retention
+        self.reschedule_items()
+        self.set_retention_dirty()
+
+    def update_conf(self, conf_diff):
+        """Update our loaded configuration with a configuration difference received
+        from the Arbiter (see alignak.configdigest)
+
+        Only the added, changed and removed hosts and services are updated in place:
+        the other hosts and services are kept as is, with their checks in progress and
+        their running state. A changed host or service gets the running state of its
+        former version.
+
+        :param conf_diff: configuration difference
+        :type conf_diff: dict
+        :return: the added and changed hosts and services
+        :rtype: list
+        """
+        _t0 = time.time()
+        updated = []
+        for strclss in DIFF_COLLECTIONS:
+            items = getattr(self, strclss)
+            for item_uuid in conf_diff[strclss]['removed']:
+                if item_uuid not in items:
+                    continue
+                self.remove_item(items[item_uuid])
+                del items[item_uuid]
+
+            for item_uuid, data in conf_diff[strclss]['changed'].items():
+                item = unserialize(data, no_json=True)
+                if item_uuid in items:
+                    former = items[item_uuid]
+                    self.scheduling_queue.remove(former)
+                    if getattr(former, 'got_business_rule', False) \
+                            and former.business_rule is not None:
+                        former.business_rule.detach()
+                    self.keep_item_running_state(former, item)
+                    del items[item_uuid]
+                items.add_item(item)
+                item.instance_id = self.instance_id
+                updated.append(item)
+
+        logger.info("Updated my configuration: %d changed hosts / services, "
+                    "%d removed hosts, %d removed services",
+                    len(updated), len(conf_diff['hosts']['removed']),
+                    len(conf_diff['services']['removed']))
+
+        self.register_items()
+        if getattr(self.pushed_conf, 'compact_objects', False):
+            self.compact_items()
+        self.snapshot = None
+        self.reset_initial_broks()
+        self.livesynthesis = LiveSynthesis(self.hosts, self.services)
+        MacroResolver().livesynthesis = self.livesynthesis
+        self.attach_business_rules()
+        self.services.optimize_service_search(self.hosts)
+
+        self.reschedule_items(updated)
+        self.set_retention_dirty(updated)
+        statsmgr.timer('configuration.update', time.time() - _t0)
+        return updated
+
+    def reset_initial_broks(self):
+        """Our brokers must get their initial broks again after our configuration changed.
+        The initial broks being streamed are dropped, they are for the former configuration.
+
+        :return: None
+        """
+        self.initial_broks_streams = {}
+        for broker_link in list(self.my_daemon.brokers.values()):
+            broker_link.initialized = False
+
+    def remove_item(self, item):
+        """Remove the checks, actions and scheduling of an host or a service that
+        is no more in our configuration
+
+        :param item: host or service
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        self.scheduling_queue.remove(item)
+        if getattr(item, 'got_business_rule', False) and item.business_rule is not None:
+            item.business_rule.detach()
+        for chk_uuid in item.checks_in_progress:
+            if chk_uuid in self.checks:
+                self.checks[chk_uuid].status = ACT_STATUS_ZOMBIE
+        for action in list(self.actions.values()):
+            if action.ref == item.uuid:
+                action.status = ACT_STATUS_ZOMBIE
+
+    @staticmethod
+    def keep_item_running_state(former, item):
+        """Give an host or a service the running state of its former version: the
+        properties that are retained, as they are restored from the retention on a full
+        configuration load (eg. the checks / notifications enabled by an external command),
+        and its checks in progress
+
+        :param former: former version of the host or service
+        :type former: alignak.objects.schedulingitem.SchedulingItem
+        :param item: new version of the host or service
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        for prop, entry in list(former.__class__.properties.items()):
+            if entry.retention and hasattr(former, prop):
+                setattr(item, prop, getattr(former, prop))
+        for prop, entry in list(former.__class__.running_properties.items()):
+            if entry.retention or prop in KEPT_RUNNING_PROPERTIES:
+                setattr(item, prop, getattr(former, prop))
+
     def update_recurrent_works_tick(self, conf):
         """Modify the tick value for the scheduler recurrent work
 
@@ -509,6 +699,8 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             self.nb_broks += 1
         else:
             logger.debug("Adding a brok %s to all brokers", brok.type)
+            if self.delta_broks:
+                brok.set_delta(self.broks_states)
             # add brok to all brokers
             for broker_link_uuid in self.my_daemon.brokers:
                 logger.debug("- adding to %s", self.my_daemon.brokers[broker_link_uuid])
@@ -528,6 +720,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
 
         logger.debug("Adding a notification: %s", notification)
         self.actions[notification.uuid] = notification
+        self.actions_queue.attach(notification)
         self.nb_notifications += 1
 
         # A notification which is not a master one raises a brok
@@ -550,6 +743,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
 
         # Add a new check to the scheduler checks list
         self.checks[check.uuid] = check
+        self.checks_queue.attach(check)
         self.nb_checks += 1
 
         # Raise a brok to inform about a next check is to come ...
@@ -570,6 +764,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             return
 
         self.actions[action.uuid] = action
+        self.actions_queue.attach(action)
         self.nb_event_handlers += 1
 
     def add_external_command(self, ext_cmd):
@@ -619,7 +814,9 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         :type hook_name: str
         :return:None
         """
+        _t0 = time.time()
         self.my_daemon.hook_point(hook_name=hook_name, handle=self)
+        self.loop_profiler.record('hook.%s' % hook_name, time.time() - _t0)
 
     def clean_queues(self):
         # pylint: disable=too-many-locals
@@ -660,12 +857,14 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                 elt = items[chk.ref]
                 # First remove the link in host/service
                 elt.remove_in_progress_check(chk)
+                self.scheduling_queue.push(elt)
                 # Then in dependent checks (I depend on, or check
                 # depend on me)
                 for dependent_checks in chk.depend_on_me:
                     dependent_checks.depend_on.remove(chk.uuid)
                 for c_temp in chk.depend_on:
                     c_temp.depend_on_me.remove(chk)
+                self.checks_queue.detach(chk)
                 del self.checks[c_id]  # Final Bye bye ...
 
         # For broks and actions, it's more simple
@@ -676,10 +875,11 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                 logger.warning("I have to drop some broks (%d > %d) for the broker %s "
                                "..., sorry :(", len(broker_link.broks), max_broks, broker_link)
 
-                kept_broks = sorted(broker_link.broks, key=lambda x: x.creation_time)
                 # Delete the oldest broks to keep the max_broks most recent...
-                # todo: is it a good choice !
-                broker_link.broks = kept_broks[0:max_broks]
+                self.nb_broks_dropped += broker_link.broks.truncate(max_broks)
+        if self.nb_broks_dropped:
+            # Some delta broks are lost, the next broks will contain all the items properties
+            self.broks_states = {}
 
         self.nb_actions_dropped = 0
         if max_actions and len(self.actions) > max_actions:
@@ -692,6 +892,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             for act in to_del_actions:
                 if act.is_a == 'notification':
                     self.find_item_by_id(act.ref).remove_in_progress_notification(act)
+                self.actions_queue.detach(act)
                 del self.actions[act.uuid]
 
     def clean_caches(self):
@@ -710,6 +911,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         :return: None
         """
         self.add(item.get_update_status_brok())
+        self.set_retention_dirty([item])
 
     def get_and_register_check_result_brok(self, item):
         """Get a check result brok for item and add it
@@ -719,6 +921,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         :return: None
         """
         self.add(item.get_check_result_brok())
+        self.set_retention_dirty([item])
 
     def check_for_expire_acknowledge(self):
         """Iter over host and service and check if any acknowledgement has expired
@@ -726,28 +929,165 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         :return: None
         """
         for elt in self.all_my_hosts_and_services():
+            if not elt.acknowledgement:
+                continue
             elt.check_for_expire_acknowledge()
+            if not elt.acknowledgement:
+                # The acknowledgement expired
+                self.set_retention_dirty([elt])
 
-    def update_business_values(self):
-        """Iter over host and service and update business_impact
+    def compact_items(self):
+        """Compact our hosts and services: the equal values of their properties (strings,
+        tuples, command of the command calls) are shared rather than duplicated
 
         :return: None
         """
+        _t0 = time.time()
+        cache = {}
+        commands = getattr(self, 'commands', None) or []
+        for command in commands:
+            command.compact(cache)
+            cache[(command.__class__, command.uuid)] = command
+        count = 0
         for elt in self.all_my_hosts_and_services():
-            if not elt.is_problem:
-                was = elt.business_impact
-                elt.update_business_impact_value(self.hosts, self.services,
-                                                 self.timeperiods, self.businessimpactmodulations)
-                new = elt.business_impact
-                # Ok, the business_impact change, we can update the broks
-                if new != was:
-                    self.get_and_register_status_brok(elt)
+            elt.compact(cache)
+            count += 1
+        logger.info("Compacted %d hosts and services, %d shared values, in %.2f seconds",
+                    count, len(cache), time.time() - _t0)
+
+    def publish_snapshot(self):
+        """Publish a new read-only snapshot of our hosts and services state and of our
+        monitoring problems. The HTTP interface gets the information from this snapshot
+        rather than from our live objects
+
+        The snapshot is only built if some queries requested it since the last publication,
+        and if the current snapshot is older than its maximum age or some of the requested
+        objects are not in the current snapshot.
+
+        :return: None
+        """
+        with self.snapshot_published:
+            if not self.snapshot_requested:
+                return
+            objects = self.snapshot_objects
+            if self.snapshot is not None and \
+                    time.time() - self.snapshot.timestamp < SchedulerSnapshot.max_age and \
+                    objects.issubset(self.snapshot.objects):
+                return
+            self.snapshot_requested = False
+            self.snapshot_objects = set()
+
+        _t0 = time.time()
+        self.snapshot_version += 1
+        snapshot = SchedulerSnapshot.build(
+            self.snapshot_version, self.hosts, self.services,
+            problems=self.my_daemon.get_monitoring_problems(),
+            objects=dict((key, copy.deepcopy(self.get_serialized_object(*key)))
+                         for key in objects))
+        with self.snapshot_published:
+            self.snapshot = snapshot
+            self.snapshot_published.notify_all()
+        self.loop_profiler.add_items(len(snapshot.hosts) + len(snapshot.services))
+        statsmgr.timer('snapshot.publish', time.time() - _t0)
+
+    def get_snapshot(self, obj=None, timeout=0):
+        """Get the published snapshot for a query and request a new snapshot
+
+        If the query requested an object that is not in the published snapshot, wait at most
+        timeout seconds for a snapshot including this object to be published.
+
+        :param obj: requested object type and name, if any
+        :type obj: tuple
+        :param timeout: maximum time to wait for the requested object
+        :type timeout: float
+        :return: the published snapshot, None if no snapshot was yet published
+        :rtype: alignak.snapshot.SchedulerSnapshot
+        """
+        with self.snapshot_published:
+            self.snapshot_requested = True
+            if obj is None:
+                return self.snapshot
+            self.snapshot_objects.add(obj)
+            if self.snapshot is not None and obj not in self.snapshot.objects and timeout:
+                self.snapshot_published.wait(timeout)
+            return self.snapshot
+
+    def get_serialized_object(self, o_type, o_name=None):
+        """Get a serialized object of our configuration
+
+        The object is searched first with o_name as its name and then with o_name as its
+        uuid. If no name is provided, all the objects of the required type are serialized.
+
+        :param o_type: searched object type
+        :type o_type: str
+        :param o_name: searched object name (or uuid)
+        :type o_name: str
+        :return: serialized object, None if not found
+        :rtype: dict
+        """
+        try:
+            _, _, strclss, _, _ = self.pushed_conf.types_creations[o_type]
+            o_list = getattr(self, strclss)
+            if not o_list:
+                return None
+            if o_name is None:
+                return serialize(o_list, no_json=True)
+            # We expected a name...
+            o_found = o_list.find_by_name(o_name)
+            if not o_found:
+                # ... but perhaps we got an object uuid
+                o_found = o_list[o_name]
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+        return serialize(o_found, no_json=True) if o_found else None
+
+    def attach_business_rules(self):
+        """Attach the hosts / services business rules to the hosts and services they
+        depend on, so that the business rules states are cached and updated on each change,
+        and index the hosts / services which business impact is modulated
+
+        :return: None
+        """
+        self.business_impact_modulated = []
+        for elt in self.all_my_hosts_and_services():
+            if elt.business_impact_modulations:
+                self.business_impact_modulated.append(elt)
+            if getattr(elt, 'got_business_rule', False) and elt.business_rule is not None:
+                elt.business_rule.attach(self.hosts, self.services)
+
+    def update_business_values(self):
+        """Update the business_impact of the hosts and services that have some business
+        impact modulations, then of the problems impacting them
+
+        The business impact of the other hosts and services only changes when they become
+        or are no more problems, and it is then updated at once.
+
+        :return: None
+        """
+        problems = {}
+        for elt in self.business_impact_modulated:
+            if elt.is_problem:
+                problems[elt.uuid] = elt
+                continue
+            was = elt.business_impact
+            elt.update_business_impact_value(self.hosts, self.services,
+                                             self.timeperiods, self.businessimpactmodulations)
+            new = elt.business_impact
+            # Ok, the business_impact change, we can update the broks
+            if new != was:
+                self.get_and_register_status_brok(elt)
+                # Its problems business impact may raise
+                for problem_uuid in elt.source_problems:
+                    if problem_uuid in self.hosts:
+                        problems[problem_uuid] = self.hosts[problem_uuid]
+                    elif problem_uuid in self.services:
+                        problems[problem_uuid] = self.services[problem_uuid]
 
         # When all impacts and classic elements are updated,
         # we can update problems (their value depend on impacts, so
         # they must be done after)
-        for elt in self.all_my_hosts_and_services():
-            # We first update impacts and classic elements
+        for elt in problems.values():
             if elt.is_problem:
                 was = elt.business_impact
                 elt.update_business_impact_value(self.hosts, self.services,
@@ -773,9 +1113,8 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         """
         now = time.time()
         # We only want the master scheduled notifications that are immediately launchable
-        notifications = [a for a in self.actions.values()
-                         if a.is_a == u'notification' and a.status == ACT_STATUS_SCHEDULED
-                         and not a.contact and a.is_launchable(now)]
+        notifications = self.actions_queue.pop_launchable(now, [BUCKET_MASTER], self.actions)
+        self.loop_profiler.add_items(len(notifications))
         if notifications:
             logger.debug("Scatter master notification: %d notifications",
                          len(notifications))
@@ -799,13 +1138,15 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                 children = item.scatter_notification(
                     notification, self.contacts, self.notificationways, self.timeperiods,
                     self.macromodulations, self.escalations,
-                    self.find_item_by_id(getattr(item, "host", None))
+                    self.get_host(getattr(item, "host", None))
                 )
                 for notif in children:
                     logger.debug(" - child notification: %s", notif)
                     notif.status = ACT_STATUS_SCHEDULED
                     # Add the notification to the scheduler objects
                     self.add(notif)
+                # The item notified contacts and notification number changed
+                self.set_retention_dirty([item])
 
             # If we have notification_interval then schedule
             # the next notification (problems only)
@@ -842,6 +1183,10 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                 # We don't repeat recover/downtime/flap/etc...
                 item.remove_in_progress_notification(notification)
 
+            # A still scheduled notification must be found again later
+            if notification.status == ACT_STATUS_SCHEDULED:
+                self.actions_queue.push(notification)
+
     def get_to_run_checks(self, do_checks=False, do_actions=False,
                           poller_tags=None, reactionner_tags=None,
                           worker_name='none', module_types=None):
@@ -883,50 +1228,31 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             if self.checks:
                 logger.debug("I have %d prepared checks", len(self.checks))
 
-            for check in list(self.checks.values()):
-                logger.debug("Check: %s (%s / %s)", check.uuid, check.poller_tag, check.module_type)
+            #  If the command is untagged, and the poller too, or if both are tagged
+            #  with same name, go for it
+            # if do_check, call for poller, and so poller_tags by default is ['None']
+            # by default poller_tag is 'None' and poller_tags is ['None']
+            # and same for module_type, the default is the 'fork' type
+            # Internally executed checks are in their own bucket, we do not care about them
+            buckets = [(tag, module_type) for tag in poller_tags for module_type in module_types]
+            for check in self.checks_queue.pop_launchable(now, buckets, self.checks):
+                if check._is_orphan and os.getenv('ALIGNAK_LOG_CHECKS', None):
+                    logger.info("--ALC-- orphan check: %s -> : worker %s (now)",
+                                check, check.status)
 
-                if check.internal:
-                    # Do not care about Alignak internally executed checks
-                    continue
+                logger.debug("Check to run: %s", check)
+                check.status = ACT_STATUS_POLLED
+                check.my_worker = worker_name
+                res.append(check)
 
-                #  If the command is untagged, and the poller too, or if both are tagged
-                #  with same name, go for it
-                # if do_check, call for poller, and so poller_tags by default is ['None']
-                # by default poller_tag is 'None' and poller_tags is ['None']
-                # and same for module_type, the default is the 'fork' type
-                if check.poller_tag not in poller_tags:
-                    logger.debug(" -> poller tag do not match")
-                    continue
-                if check.module_type not in module_types:
-                    logger.debug(" -> module type do not match")
-                    continue
+                # Stats
+                self.nb_checks_launched += 1
 
-                logger.debug(" -> : %s %s (%s)",
-                             'worker' if not check.internal else 'internal',
-                             check.status,
-                             'now' if check.is_launchable(now) else 'not yet')
-                if check._is_orphan and check.status == ACT_STATUS_SCHEDULED \
-                        and os.getenv('ALIGNAK_LOG_CHECKS', None):
-                    logger.info("--ALC-- orphan check: %s -> : %s %s (%s)",
-                                check, 'worker' if not check.internal else 'internal',
-                                check.status, 'now' if check.is_launchable(now) else 'not yet')
-
-                # must be ok to launch, and not an internal one (business rules based)
-                if check.status == ACT_STATUS_SCHEDULED and check.is_launchable(now):
-                    logger.debug("Check to run: %s", check)
-                    check.status = ACT_STATUS_POLLED
-                    check.my_worker = worker_name
-                    res.append(check)
-
-                    # Stats
-                    self.nb_checks_launched += 1
-
-                    if 'ALIGNAK_LOG_ACTIONS' in os.environ:
-                        if os.environ['ALIGNAK_LOG_ACTIONS'] == 'WARNING':
-                            logger.warning("Check to run: %s", check)
-                        else:
-                            logger.info("Check to run: %s", check)
+                if 'ALIGNAK_LOG_ACTIONS' in os.environ:
+                    if os.environ['ALIGNAK_LOG_ACTIONS'] == 'WARNING':
+                        logger.warning("Check to run: %s", check)
+                    else:
+                        logger.info("Check to run: %s", check)
 
             if res:
                 logger.debug("-> %d checks to start now", len(res))
@@ -938,52 +1264,30 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             if self.actions:
                 logger.debug("I have %d prepared actions", len(self.actions))
 
-            for action in list(self.actions.values()):
-                logger.debug("Action: %s (%s / %s)",
-                             action.uuid, action.reactionner_tag, action.module_type)
-
-                if action.internal:
-                    # Do not care about Alignak internally executed checks
-                    continue
-
-                is_master = (action.is_a == 'notification' and not action.contact)
-                if is_master:
-                    continue
-
-                # if do_action, call the reactionner,
-                # and so reactionner_tags by default is ['None']
-                # by default reactionner_tag is 'None' and reactionner_tags is ['None'] too
-                # So if not the good one, loop for next :)
-                if action.reactionner_tag not in reactionner_tags:
-                    logger.debug(" -> reactionner tag do not match")
-                    continue
-
-                # same for module_type
-                if action.module_type not in module_types:
-                    logger.debug(" -> module type do not match")
-                    continue
-
-                # And now look if we can launch or not :)
-                logger.debug(" -> : worker %s (%s)",
-                             action.status, 'now' if action.is_launchable(now) else 'not yet')
-                if action._is_orphan and action.status == ACT_STATUS_SCHEDULED and \
-                        os.getenv('ALIGNAK_LOG_CHECKS', None):
+            # if do_action, call the reactionner,
+            # and so reactionner_tags by default is ['None']
+            # by default reactionner_tag is 'None' and reactionner_tags is ['None'] too
+            # and same for module_type
+            # Master notifications and internal actions are in their own buckets
+            buckets = [(tag, module_type)
+                       for tag in reactionner_tags for module_type in module_types]
+            for action in self.actions_queue.pop_launchable(now, buckets, self.actions):
+                if action._is_orphan and os.getenv('ALIGNAK_LOG_CHECKS', None):
                     logger.info("--ALC-- orphan action: %s", action)
 
-                if action.status == ACT_STATUS_SCHEDULED and action.is_launchable(now):
-                    # This is for child notifications and eventhandlers
-                    action.status = ACT_STATUS_POLLED
-                    action.my_worker = worker_name
-                    res.append(action)
+                # This is for child notifications and eventhandlers
+                action.status = ACT_STATUS_POLLED
+                action.my_worker = worker_name
+                res.append(action)
 
-                    # Stats
-                    self.nb_actions_launched += 1
+                # Stats
+                self.nb_actions_launched += 1
 
-                    if 'ALIGNAK_LOG_ACTIONS' in os.environ:
-                        if os.environ['ALIGNAK_LOG_ACTIONS'] == 'WARNING':
-                            logger.warning("Action to run: %s", action)
-                        else:
-                            logger.info("Action to run: %s", action)
+                if 'ALIGNAK_LOG_ACTIONS' in os.environ:
+                    if os.environ['ALIGNAK_LOG_ACTIONS'] == 'WARNING':
+                        logger.warning("Action to run: %s", action)
+                    else:
+                        logger.info("Action to run: %s", action)
 
             if res:
                 logger.debug("-> %d actions to start now", len(res))
@@ -1168,6 +1472,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                     continue
 
                 logger.debug("Sending %d actions to the %s '%s'", len(lst), s_type, link.name)
+                self.loop_profiler.add_items(len(lst))
                 link.push_actions(lst, self.instance_id)
 
     def get_results_from_passive_satellites(self):
@@ -1195,6 +1500,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                 results = unserialize(results, no_json=True)
                 if results:
                     logger.debug("Received %d passive results from %s", len(results), link.name)
+                    self.loop_profiler.add_items(len(results))
 
                 for result in results:
                     logger.debug("-> result: %s", result)
@@ -1210,15 +1516,8 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         if os.getenv('ALIGNAK_MANAGE_INTERNAL', '1') != '1':
             return
         now = time.time()
-        for chk in list(self.checks.values()):
-            if not chk.internal:
-                # Exclude checks that are not internal ones
-                continue
-
-            # Exclude checks that are not yet ready to launch
-            if not chk.is_launchable(now) or chk.status not in [ACT_STATUS_SCHEDULED]:
-                continue
-
+        # Only the internal checks that are scheduled and ready to launch
+        for chk in self.checks_queue.pop_launchable(now, [BUCKET_INTERNAL], self.checks):
             item = self.find_item_by_id(chk.ref)
             # Only if active checks are enabled
             if not item or not item.active_checks_enabled:
@@ -1228,6 +1527,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             logger.debug("Run internal check for %s", item)
 
             self.nb_internal_checks += 1
+            self.loop_profiler.add_items(1)
 
             # Execute internal check
             item.manage_internal_check(self.hosts, self.services, chk, self.hostgroups,
@@ -1304,61 +1604,100 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         for elt in self.services:
             elt.raise_initial_state()
 
-    def get_retention_data(self):  # pylint: disable=too-many-branches,too-many-statements
-        # pylint: disable=too-many-locals
+    def set_retention_dirty(self, items=None):
+        """Mark some hosts and services as having retention data that may have changed
+        since the last retention save. For a service, its host is marked because the
+        retention data of the services are stored with their host.
+
+        If items is None, all our hosts are marked.
+
+        :param items: None or list of hosts / services to mark
+        :type items: None | list
+        :return: None
+        """
+        if items is None:
+            self.retention_dirty.update(host.uuid for host in self.hosts)
+            return
+
+        for item in items:
+            if item.my_type == 'service':
+                self.retention_dirty.add(item.host)
+            else:
+                self.retention_dirty.add(item.uuid)
+
+    def get_retention_dirty_hosts(self):
+        """Get the hosts which retention data may have changed since the last call
+        of this function
+
+        :return: set of hosts uuid
+        :rtype: set
+        """
+        dirty, self.retention_dirty = self.retention_dirty, set()
+        return dirty
+
+    @staticmethod
+    def get_item_retention_data(item):
+        """Get the retention data of an host or a service
+
+        :param item: host or service
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: properties to be retained
+        :rtype: dict
+        """
+        i_dict = {}
+
+        # Get the item properties and running properties
+        properties = item.__class__.properties
+        properties.update(item.__class__.running_properties)
+        for prop, entry in list(properties.items()):
+            if not entry.retention:
+                continue
+
+            val = getattr(item, prop)
+            # If a preparation function exists...
+            prepare_retention = entry.retention_preparation
+            if prepare_retention:
+                val = prepare_retention(item, val)
+            i_dict[prop] = val
+
+        return i_dict
+
+    def get_retention_data(self, hosts=None):
         """Get all hosts and services data to be sent to the retention storage.
 
         This function only prepares the data because a module is in charge of making
         the data survive to the scheduler restart.
 
+        If hosts is provided, only the data of these hosts and of their services are
+        prepared (see `get_retention_dirty_hosts`).
+
         todo: Alignak scheduler creates two separate dictionaries: hosts and services
         It would be better to merge the services into the host dictionary!
 
+        :param hosts: None or hosts uuid to get the data for
+        :type hosts: None | set
         :return: dict containing host and service data
         :rtype: dict
         """
         retention_data = {
             'hosts': {}, 'services': {}
         }
-        for host in self.hosts:
-            h_dict = {}
-
-            # Get the hosts properties and running properties
-            properties = host.__class__.properties
-            properties.update(host.__class__.running_properties)
-            for prop, entry in list(properties.items()):
-                if not entry.retention:
-                    continue
-
-                val = getattr(host, prop)
-                # If a preparation function exists...
-                prepare_retention = entry.retention_preparation
-                if prepare_retention:
-                    val = prepare_retention(host, val)
-                h_dict[prop] = val
+        if hosts is None:
+            my_hosts = list(self.hosts)
+            my_services = list(self.services)
+        else:
+            my_hosts = [self.hosts[uuid] for uuid in hosts if uuid in self.hosts]
+            my_services = [self.services[uuid] for host in my_hosts
+                           for uuid in host.services if uuid in self.services]
 
-            retention_data['hosts'][host.host_name] = h_dict
+        for host in my_hosts:
+            retention_data['hosts'][host.host_name] = self.get_item_retention_data(host)
         logger.info('%d hosts sent to retention', len(retention_data['hosts']))
 
         # Same for services
-        for service in self.services:
-            s_dict = {}
-
-            # Get the services properties and running properties
-            properties = service.__class__.properties
-            properties.update(service.__class__.running_properties)
-            for prop, entry in list(properties.items()):
-                if not entry.retention:
-                    continue
-
-                val = getattr(service, prop)
-                # If a preparation function exists...
-                prepare_retention = entry.retention_preparation
-                if prepare_retention:
-                    val = prepare_retention(service, val)
-                s_dict[prop] = val
-
-            retention_data['services'][(service.host_name, service.service_description)] = s_dict
+        for service in my_services:
+            retention_data['services'][(service.host_name, service.service_description)] = \
+                self.get_item_retention_data(service)
         logger.info('%d services sent to retention', len(retention_data['services']))
 
         return retention_data
@@ -1437,6 +1776,8 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
 
         # todo: is it useful? We do not save/restore checks in the retention data...
         item.update_in_checking()
+        # The item next check may have been restored
+        self.scheduling_queue.push(item)
 
         # And also add downtimes and comments
         # Downtimes are in a list..
@@ -1518,8 +1859,37 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
 
         initial_broks_count = len(self.my_daemon.brokers[broker_uuid].broks)
 
+        # The broker did not get the previous delta broks, the next broks will contain
+        # all the items properties
+        self.broks_states = {}
+
+        for brok in self.get_initial_broks():
+            self.add_brok(brok, broker_uuid)
+
+        final_broks_count = len(self.my_daemon.brokers[broker_uuid].broks)
+        self.my_daemon.brokers[broker_uuid].initialized = True
+
+        # Send the initial broks to our modules
+        self.send_broks_to_modules()
+
+        # We now have raised all the initial broks
+        self.raised_initial_broks = True
+
+        logger.info("Created %d initial broks for %s",
+                    final_broks_count - initial_broks_count, broker_name)
+        return final_broks_count - initial_broks_count
+
+    def get_initial_broks(self):
+        """Generator of the initial broks for a broker
+
+        The initial broks are built when they are iterated: the program status, the
+        initial status of the items and templates and a final initial_broks_done brok
+
+        :return: initial broks generator
+        :rtype: generator
+        """
         # First the program status
-        self.add_brok(self.get_program_status_brok(), broker_uuid)
+        yield self.get_program_status_brok()
 
         self.pushed_conf.skip_initial_broks = getattr(self.pushed_conf, 'skip_initial_broks', False)
         logger.debug("Skipping initial broks? %s", str(self.pushed_conf.skip_initial_broks))
@@ -1541,33 +1911,78 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                         members = self.services
                     if isinstance(item, Contactgroup):
                         members = self.contacts
-                    self.add_brok(item.get_initial_status_brok(members), broker_uuid)
+                    yield item.get_initial_status_brok(members)
 
             #  Get initial_status broks for all these types of templates
             #  The order is important, service need host...
             for t in [self.contacts, self.hosts, self.services]:
                 if not t:
                     continue
-                for item_uuid in t.templates:
+                for item_uuid in list(t.templates):
                     item = t.templates[item_uuid]
-                    self.add_brok(item.get_initial_status_brok(extra=None), broker_uuid)
+                    yield item.get_initial_status_brok(extra=None)
 
         # Add a brok to say that we finished all initial_pass
-        brok = Brok({'type': 'initial_broks_done', 'data': {'instance_id': self.instance_id}})
-        self.add_brok(brok, broker_uuid)
+        yield Brok({'type': 'initial_broks_done', 'data': {'instance_id': self.instance_id}})
 
-        final_broks_count = len(self.my_daemon.brokers[broker_uuid].broks)
-        self.my_daemon.brokers[broker_uuid].initialized = True
+    def get_initial_broks_page(self, broker_name, page_size, token=''):
+        """Get a page of the initial broks for a broker
 
-        # Send the initial broks to our modules
-        self.send_broks_to_modules()
+        The initial broks are streamed to the broker: each page contains at most
+        `page_size` broks, built when the page is requested, and a continuation token to
+        request the next page. An empty token starts a new stream. The last page has an
+        empty continuation token.
 
-        # We now have raised all the initial broks
-        self.raised_initial_broks = True
+        The broker gets its other broks as usual while it gets its initial broks pages.
 
-        logger.info("Created %d initial broks for %s",
-                    final_broks_count - initial_broks_count, broker_name)
-        return final_broks_count - initial_broks_count
+        :param broker_name: broker name
+        :type broker_name: str
+        :param page_size: maximum number of broks in the page
+        :type page_size: int
+        :param token: continuation token returned with the previous page
+        :type token: str
+        :return: the page broks and the continuation token, None if the broker is unknown
+                 or the token is not the expected one
+        :rtype: tuple
+        """
+        for broker_link in list(self.my_daemon.brokers.values()):
+            if broker_name == broker_link.name:
+                break
+        else:
+            logger.info("Requested initial broks for an unknown broker: %s", broker_name)
+            return None
+
+        if not token:
+            logger.info("Streaming initial broks for %s", broker_name)
+            # The broker did not get the previous delta broks, the next broks will contain
+            # all the items properties
+            self.broks_states = {}
+            broker_link.initialized = False
+            self.initial_broks_streams[broker_link.uuid] = (get_a_new_object_id(), 0,
+                                                            self.get_initial_broks())
+
+        stream = self.initial_broks_streams.get(broker_link.uuid, None)
+        if stream is None or (token and token != '%s-%d' % (stream[0], stream[1])):
+            logger.warning("Requested initial broks for %s with an unexpected token: %s",
+                           broker_name, token)
+            return None
+
+        stream_id, page, generator = stream
+        page_size = max(1, page_size)
+        broks = list(itertools.islice(generator, page_size))
+        for brok in broks:
+            brok.instance_id = self.instance_id
+
+        if len(broks) < page_size:
+            # No more initial broks
+            del self.initial_broks_streams[broker_link.uuid]
+            broker_link.initialized = True
+            self.raised_initial_broks = True
+            logger.info("Streamed %d pages of initial broks for %s", page + 1, broker_name)
+            return broks, ''
+
+        self.initial_broks_streams[broker_link.uuid] = (stream_id, page + 1, generator)
+        return broks, '%s-%d' % (stream_id, page + 1)
 
     def initial_program_status(self):
         """Create and add a program_status brok
@@ -1641,9 +2056,10 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             self.manage_results(self.waiting_results.get())
 
         # Then we consume them
-        for chk in list(self.checks.values()):
+        for chk in self.checks_queue.get_by_status(ACT_STATUS_WAIT_CONSUME, self.checks):
             if chk.status == ACT_STATUS_WAIT_CONSUME:
                 logger.debug("Consuming: %s", chk)
+                self.loop_profiler.add_items(1)
                 item = self.find_item_by_id(chk.ref)
 
                 notification_period = None
@@ -1657,6 +2073,9 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                                                  self.resultmodulations, self.checks,
                                                  self.pushed_conf.log_active_checks and
                                                  not chk.passive_check)
+                # The item may need a new check
+                self.scheduling_queue.push(item)
+                self.set_retention_dirty([item])
 
                 # # Raise the log only when the check got consumed!
                 # # Else the item information are not up-to-date :/
@@ -1672,7 +2091,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         while have_resolved_checks:
             have_resolved_checks = False
             # All 'finished' checks (no more dep) raise checks they depend on
-            for chk in list(self.checks.values()):
+            for chk in self.checks_queue.get_by_status(ACT_STATUS_WAITING_ME, self.checks):
                 if chk.status == ACT_STATUS_WAITING_ME:
                     for dependent_checks in chk.depend_on_me:
                         # Ok, now dependent will no more wait
@@ -1682,8 +2101,9 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                     chk.status = ACT_STATUS_ZOMBIE
 
             # Now, inclmude dependent checks
-            for chk in list(self.checks.values()):
+            for chk in self.checks_queue.get_by_status(ACT_STATUS_WAIT_DEPEND, self.checks):
                 if chk.status == ACT_STATUS_WAIT_DEPEND and not chk.depend_on:
+                    self.loop_profiler.add_items(1)
                     item = self.find_item_by_id(chk.ref)
                     notification_period = None
                     if getattr(item, 'notification_period', None) is not None:
@@ -1695,6 +2115,8 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                                                      self.resultmodulations, self.checks,
                                                      self.pushed_conf.log_active_checks and
                                                      not chk.passive_check)
+                    self.scheduling_queue.push(item)
+                    self.set_retention_dirty([item])
                     for check in dep_checks:
                         self.add(check)
 
@@ -1703,28 +2125,26 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
 
         :return: None
         """
-        id_to_del = []
-        for chk in list(self.checks.values()):
-            if chk.status == ACT_STATUS_ZOMBIE:
-                id_to_del.append(chk.uuid)
         # une petite tape dans le dos et tu t'en vas, merci...
         # *pat pat* GFTO, thks :)
-        for c_id in id_to_del:
-            del self.checks[c_id]  # ZANKUSEN!
+        zombies = self.checks_queue.drain_status(ACT_STATUS_ZOMBIE)
+        self.loop_profiler.add_items(len(zombies))
+        for chk in zombies:
+            if self.checks.get(chk.uuid) is chk:
+                del self.checks[chk.uuid]  # ZANKUSEN!
 
     def delete_zombie_actions(self):
         """Remove actions that have a zombie status (usually timeouts)
 
         :return: None
         """
-        id_to_del = []
-        for act in list(self.actions.values()):
-            if act.status == ACT_STATUS_ZOMBIE:
-                id_to_del.append(act.uuid)
         # une petite tape dans le dos et tu t'en vas, merci...
         # *pat pat* GFTO, thks :)
-        for a_id in id_to_del:
-            del self.actions[a_id]  # ZANKUSEN!
+        zombies = self.actions_queue.drain_status(ACT_STATUS_ZOMBIE)
+        self.loop_profiler.add_items(len(zombies))
+        for act in zombies:
+            if self.actions.get(act.uuid) is act:
+                del self.actions[act.uuid]  # ZANKUSEN!
 
     def update_downtimes_and_comments(self):
         # pylint: disable=too-many-branches
@@ -1807,24 +2227,57 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         for brok in broks:
             self.add(brok)
 
+    def reschedule_items(self, items=None):
+        """Push some hosts and services in the scheduling queue, they will be visited
+        on the next scheduling loop turn
+
+        If items is None, all our hosts and services are pushed.
+
+        :param items: None or list of hosts / services to push
+        :type items: None | list
+        :return: None
+        """
+        if items is None:
+            items = self.all_my_hosts_and_services()
+
+        for item in items:
+            self.scheduling_queue.push(item)
+
     def schedule(self, elements=None):
-        """Iterate over all hosts and services and call schedule method
+        """Iterate over the due hosts and services and call schedule method
         (schedule next check)
 
-        If elements is None all our hosts and services are scheduled for a check.
+        If elements is None, only our hosts and services that are due in the scheduling queue
+        are scheduled for a check. An item leaves the queue when it is scheduled and it is
+        pushed again when its check result is consumed (see `reschedule_items`).
+
+        An item that should be actively checked but that did not get a check (eg. one of
+        its check dependencies is failing, no check period...) is pushed again to be
+        visited at its next check time.
 
         :param elements: None or list of host / services to schedule
         :type elements: None | list
         :return: None
         """
         if not elements:
-            elements = self.all_my_hosts_and_services()
+            elements = self.scheduling_queue.pop_due(time.time())
+        self.loop_profiler.add_items(len(elements))
 
         # ask for service and hosts their next check
+        now = time.time()
         for elt in elements:
             logger.debug("Add check for: %s", elt)
-            self.add(elt.schedule(self.hosts, self.services, self.timeperiods,
-                                  self.macromodulations, self.checkmodulations, self.checks))
+            chk = elt.schedule(self.hosts, self.services, self.timeperiods,
+                               self.macromodulations, self.checkmodulations, self.checks)
+            if chk is None:
+                if elt.in_checking or not elt.active_checks_enabled:
+                    continue
+                if elt.next_chk and elt.next_chk > now:
+                    self.scheduling_queue.push(elt, elt.next_chk)
+                else:
+                    self.scheduling_queue.push(elt, now + SCHEDULING_RETRY_DELAY)
+                continue
+            self.add(chk)
 
     def get_new_actions(self):
         """Call 'get_new_actions' hook point
@@ -1837,6 +2290,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         statsmgr.timer('hook.get-new-actions', time.time() - _t0)
         # ask for service and hosts their next check
         for elt in self.all_my_hosts_and_services():
+            self.loop_profiler.add_items(len(elt.actions))
             for action in elt.actions:
                 logger.debug("Got a new action for %s: %s", elt, action)
                 self.add(action)
@@ -1851,10 +2305,15 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         # ask for service and hosts their broks waiting
         # be eaten
         for elt in self.all_my_hosts_and_services():
+            if not elt.broks:
+                continue
+            self.loop_profiler.add_items(len(elt.broks))
             for brok in elt.broks:
                 self.add(brok)
             # We got all, clear item broks list
             elt.broks = []
+            # Something changed for this item
+            self.set_retention_dirty([elt])
 
         # Also fetch broks from contact (like contactdowntime)
         for contact in self.contacts:
@@ -2010,10 +2469,12 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         nb_sent = 0
         broks = []
         for broker_link in list(self.my_daemon.brokers.values()):
-            for brok in broker_link.broks:
-                if not getattr(brok, 'sent_to_externals', False):
+            for brok in broker_link.broks.get_pending():
+                # The same brok may be pending for several brokers
+                if not getattr(brok, 'to_send', False):
                     brok.to_send = True
                     broks.append(brok)
+        self.loop_profiler.add_items(len(broks))
         if not broks:
             return
         logger.debug("sending %d broks to modules...", len(broks))
@@ -2023,15 +2484,19 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             module_queue = mod.to_q
             if module_queue:
                 to_send = [b for b in broks if mod.want_brok(b)]
-                module_queue.put(to_send)
+                try:
+                    module_queue.put(to_send)
+                except queue.Full:
+                    logger.warning("Module %s queue is full, %d broks are not sent to the module",
+                                   mod.get_name(), len(to_send))
+                    continue
                 nb_sent += len(to_send)
 
         # No more need to send them
+        for brok in broks:
+            brok.to_send = False
         for broker_link in list(self.my_daemon.brokers.values()):
-            for brok in broker_link.broks:
-                if not getattr(brok, 'sent_to_externals', False):
-                    brok.to_send = False
-                    brok.sent_to_externals = True
+            broker_link.broks.set_sent_to_externals()
         logger.debug("Time to send %d broks (after %d secs)", nb_sent, time.time() - t00)
 
     def get_objects_from_from_queues(self):
@@ -2224,6 +2689,50 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             res[chk.status] += 1
         return res
 
+    def register_items(self):
+        """Build the uuid -> object registry of the configuration objects used by
+        `find_item_by_id`. The checks and actions are not registered because they already
+        are in their own uuid indexed dicts.
+
+        :return: None
+        """
+        self.items_registry = {}
+        for items in [self.hosts, self.services, self.hostgroups, self.servicegroups,
+                      self.contacts, self.contactgroups]:
+            if items is not None:
+                self.items_registry.update(items.items)
+        logger.debug("Registered %d items", len(self.items_registry))
+
+    def get_host(self, host_id):
+        """Get an host based on its uuid
+
+        :param host_id: host uuid
+        :type host_id: str
+        :return: the host or None if it does not exist
+        :rtype: alignak.objects.host.Host | None
+        """
+        return self.hosts.items.get(host_id)
+
+    def get_service(self, service_id):
+        """Get a service based on its uuid
+
+        :param service_id: service uuid
+        :type service_id: str
+        :return: the service or None if it does not exist
+        :rtype: alignak.objects.service.Service | None
+        """
+        return self.services.items.get(service_id)
+
+    def get_check(self, check_id):
+        """Get a check based on its uuid
+
+        :param check_id: check uuid
+        :type check_id: str
+        :return: the check or None if it does not exist
+        :rtype: alignak.check.Check | None
+        """
+        return self.checks.get(check_id)
+
     def find_item_by_id(self, object_id):
         """Get item based on its id or uuid
 
@@ -2232,24 +2741,25 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         :return:
         :rtype: alignak.objects.item.Item | None
         """
-        # Item id may be an item
-        if isinstance(object_id, Item):
-            return object_id
-
         # Item id should be a uuid string
-        if not isinstance(object_id, string_types):
-            logger.debug("Find an item by id, object_id is not int nor string: %s", object_id)
-            return object_id
-
-        for items in [self.hosts, self.services, self.actions, self.checks, self.hostgroups,
-                      self.servicegroups, self.contacts, self.contactgroups]:
-            if object_id in items:
-                return items[object_id]
+        if isinstance(object_id, string_types):
+            item = self.items_registry.get(object_id)
+            if item is None:
+                item = self.actions.get(object_id)
+            if item is None:
+                item = self.checks.get(object_id)
+            if item is not None:
+                return item
+
+            # raise AttributeError("Item with id %s not found" % object_id)  # pragma: no cover,
+            logger.error("Item with id %s not found", str(object_id))  # pragma: no cover,
+            return None
+            # simple protection this should never happen
 
-        # raise AttributeError("Item with id %s not found" % object_id)  # pragma: no cover,
-        logger.error("Item with id %s not found", str(object_id))  # pragma: no cover,
-        return None
-        # simple protection this should never happen
+        # Item id may be an item
+        if not isinstance(object_id, Item):
+            logger.debug("Find an item by id, object_id is not int nor string: %s", object_id)
+        return object_id
 
     def before_run(self):
         """Initialize the scheduling process"""
@@ -2313,6 +2823,7 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
         self.ticks += 1
 
         loop_start_ts = time.time()
+        self.loop_profiler.loop_started()
         # Do recurrent works like schedule, consume, delete_zombie_checks
         for i in self.recurrent_works:
             (name, fun, nb_ticks) = self.recurrent_works[i]
@@ -2321,15 +2832,21 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
                 if self.ticks % nb_ticks == 0:
                     # Call it and save the time spend in it
                     _t0 = time.time()
+                    self.loop_profiler.start('recurrent.%s' % name)
                     fun()
+                    self.loop_profiler.stop(time.time() - _t0)
                     statsmgr.timer('loop.recurrent.%s' % name, time.time() - _t0)
         statsmgr.timer('loop.recurrent', time.time() - loop_start_ts)
 
         _ts = time.time()
+        self.loop_profiler.start('push_actions_to_passive_satellites')
         self.push_actions_to_passive_satellites()
+        self.loop_profiler.stop(time.time() - _ts)
         statsmgr.timer('loop.push_actions_to_passive_satellites', time.time() - _ts)
         _ts = time.time()
+        self.loop_profiler.start('get_results_from_passive_satellites')
         self.get_results_from_passive_satellites()
+        self.loop_profiler.stop(time.time() - _ts)
         statsmgr.timer('loop.get_results_from_passive_satellites', time.time() - _ts)
 
         # Scheduler statistics
@@ -2387,3 +2904,6 @@ class Scheduler(object):  # pylint: disable=too-many-instance-attributes
             statsmgr.gauge('activity.checks_dropped', self.nb_checks_dropped)
             statsmgr.gauge('activity.actions_dropped', self.nb_actions_dropped)
             self.nb_checks_dropped = self.nb_broks_dropped = self.nb_actions_dropped = 0
+
+        self.loop_profiler.record('loop', time.time() - loop_start_ts)
+        self.loop_profiler.loop_ended()
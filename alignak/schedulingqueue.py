@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the SchedulingQueue class. It is used by the scheduler to know
+which hosts and services must be visited by its scheduling recurrent work.
+
+When an item is visited, it either gets a new check (and it is then in checking until
+this check result is consumed), or it does not need any check (no active checks...).
+In both cases, there is no need to visit this item again until something changed for it:
+
+* one of its checks result got consumed or one of its checks got dropped,
+* an external command changed its active checks or its scheduling,
+* its state got restored from the retention.
+
+The scheduler then pushes the item again in this queue, with the time it becomes due.
+
+The queue is a min-heap keyed on the item due time. It is lazily maintained: an item pushed
+again invalidates its former entry, and the outdated entries are dropped when they are popped.
+"""
+import heapq
+import itertools
+
+
+class SchedulingQueue(object):
+    """Due-time ordered queue of the hosts and services to be scheduled"""
+
+    def __init__(self):
+        # heap of (due time, sequence, item)
+        self.heap = []
+        # item uuid -> sequence of its valid heap entry
+        self.sequences = {}
+        self._counter = itertools.count(1)
+
+    def __len__(self):
+        return len(self.sequences)
+
+    def __contains__(self, item):
+        return item.uuid in self.sequences
+
+    def push(self, item, due_time=0):
+        """Push an item to be scheduled at the provided time.
+        Any former entry of this item gets invalidated.
+
+        :param item: host or service to push
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :param due_time: time the item should be scheduled at, default is as soon as possible
+        :type due_time: float
+        :return: None
+        """
+        sequence = next(self._counter)
+        self.sequences[item.uuid] = sequence
+        heapq.heappush(self.heap, (due_time, sequence, item))
+
+    def remove(self, item):
+        """Remove an item from the queue. Its heap entry, if any, is no more valid.
+
+        :param item: host or service to remove
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        self.sequences.pop(item.uuid, None)
+
+    def pop_due(self, now):
+        """Pop the items that are due at the `now` time
+
+        :param now: time to compare the items due time with
+        :type now: float
+        :return: due items, ordered by due time
+        :rtype: list
+        """
+        res = []
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            _, sequence, item = heapq.heappop(heap)
+            if self.sequences.get(item.uuid) != sequence:
+                continue
+            del self.sequences[item.uuid]
+            res.append(item)
+        return res
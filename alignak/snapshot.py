@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the SchedulerSnapshot class. It is a read-only copy of the scheduler
+hosts and services state and of its monitoring problems, used by the scheduler HTTP interface.
+
+The scheduler main loop publishes a new snapshot (see the publish_snapshot recurrent work)
+only when some queries requested it since the last publication: a snapshot is rebuilt once it
+is older than its maximum age, or as soon as an object it does not hold is requested. The HTTP
+interface threads get the current snapshot and build their responses from it, without walking
+the scheduler live objects that the main loop is updating. The requested objects are copied
+serialized in the snapshot.
+
+A snapshot is never modified once built, except for its responses cache: the responses
+built from a snapshot are cached until the next snapshot is published.
+"""
+import time
+from collections import OrderedDict
+
+# The hosts / services properties copied in the snapshot state records
+STATE_PROPERTIES = (
+    'last_check', 'state_id', 'state', 'state_type', 'is_problem', 'is_impact', 'output',
+    'uuid', 'address', 'alias', 'business_impact', 'tags', 'customs', 'parents',
+    'long_output', 'perf_data',
+    'check_period', 'active_checks_enabled', 'passive_checks_enabled',
+    'check_freshness', 'freshness_threshold', 'freshness_state',
+    'get_overall_state', 'overall_state_id', 'passive_check', 'acknowledged', 'downtimed',
+    'next_check', 'last_time_up', 'last_time_down',
+    'last_time_ok', 'last_time_warning', 'last_time_critical',
+    'last_time_unknown', 'last_time_unreachable'
+)
+
+
+def get_state_record(item, services):
+    """Get the state record of an host or a service
+
+    The record is a dictionary with the item name and its state properties. An host
+    callable property is called with the services list, the mutable values are copied.
+
+    :param item: host or service
+    :type item: alignak.objects.schedulingitem.SchedulingItem
+    :param services: scheduler services
+    :type services: alignak.objects.service.Services
+    :return: state record
+    :rtype: dict
+    """
+    record = {'name': item.get_name()}
+    for prop in STATE_PROPERTIES:
+        if not hasattr(item, prop):
+            continue
+        value = getattr(item, prop)
+        if callable(value):
+            if item.my_type != 'host':
+                continue
+            value = value(services)
+        elif isinstance(value, (set, list, tuple)):
+            value = list(value)
+        elif isinstance(value, dict):
+            value = dict(value)
+        record[prop] = value
+    return record
+
+
+class SchedulerSnapshot(object):
+    """Read-only copy of the scheduler hosts and services state"""
+    # A requested snapshot is rebuilt once it is older than this delay (in seconds)
+    max_age = 5
+    # Maximum delay (in seconds) a query waits for a snapshot holding its requested object
+    wait_timeout = 5
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, version, hosts, services, problems=None, objects=None):
+        """
+        :param version: snapshot version
+        :type version: int
+        :param hosts: hosts state records, host uuid -> record, the record 'services'
+                      property is the list of the host services uuid
+        :type hosts: OrderedDict
+        :param services: services state records, service uuid -> record
+        :type services: dict
+        :param problems: scheduler live synthesis and problems
+        :type problems: dict
+        :param objects: serialized objects, (type, name) -> object, None if not found
+        :type objects: dict
+        """
+        self.version = version
+        self.timestamp = time.time()
+        self.hosts = hosts
+        self.services = services
+        self.problems = problems or {}
+        self.objects = objects or {}
+        self.hosts_by_name = dict((record['name'], uuid) for uuid, record in hosts.items())
+        # Responses built from this snapshot
+        self.cache = {}
+
+    def __repr__(self):  # pragma: no cover
+        return '<SchedulerSnapshot #%d, %d hosts, %d services />' \
+               % (self.version, len(self.hosts), len(self.services))
+
+    @classmethod
+    def build(cls, version, hosts, services, problems=None, objects=None):
+        # pylint: disable=too-many-arguments
+        """Build a snapshot of the hosts and services state
+
+        :param version: snapshot version
+        :type version: int
+        :param hosts: scheduler hosts
+        :type hosts: alignak.objects.host.Hosts
+        :param services: scheduler services
+        :type services: alignak.objects.service.Services
+        :param problems: scheduler live synthesis and problems
+        :type problems: dict
+        :param objects: serialized objects, (type, name) -> object, None if not found
+        :type objects: dict
+        :return: the snapshot
+        :rtype: SchedulerSnapshot
+        """
+        hosts_records = OrderedDict()
+        services_records = {}
+        for host in hosts:
+            record = get_state_record(host, services)
+            record['services'] = []
+            for service_uuid in host.services:
+                if service_uuid not in services:
+                    continue
+                services_records[service_uuid] = get_state_record(services[service_uuid],
+                                                                  services)
+                record['services'].append(service_uuid)
+            hosts_records[host.uuid] = record
+        return cls(version, hosts_records, services_records, problems, objects)
+
+    def find_host(self, name):
+        """Get an host state record
+
+        :param name: host name or uuid
+        :type name: str
+        :return: host uuid and state record, or None if not found
+        :rtype: tuple
+        """
+        uuid = self.hosts_by_name.get(name, name)
+        if uuid not in self.hosts:
+            return None
+        return uuid, self.hosts[uuid]
+
+    def get_cached(self, key, builder):
+        """Get a response built from this snapshot
+
+        The response is built once and then cached with the snapshot
+
+        :param key: response key
+        :type key: tuple
+        :param builder: function building the response
+        :type builder: function
+        :return: the response
+        """
+        try:
+            return self.cache[key]
+        except KeyError:
+            response = self.cache[key] = builder()
+            return response
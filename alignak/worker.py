@@ -47,12 +47,26 @@
 #  along with Shinken.  If not, see <http://www.gnu.org/licenses/>.
 """
 This module provide Worker class. It is used to spawn new processes in Poller and Reactionner
+
+An event driven worker waits for the events of its launched actions (output available on their
+stdout or stderr, process exit) and of its actions queue with a selector, instead of polling
+its actions and sleeping. An action output is read as soon as it is available and an action
+is finished as soon as its process exits.
+
+The satellite that launched a worker accounts for the worker load: the actions assigned to
+the worker and not yet returned, and the time the actions waited before being executed
+(see the alignak.workersscaler module).
 """
 import os
 import time
 import signal
 import logging
 
+try:
+    import selectors
+except ImportError:  # pragma: no cover, Python 2
+    selectors = None
+
 from queue import Empty, Full
 from multiprocessing import Process
 from six import string_types
@@ -61,12 +75,96 @@ from alignak.action import ACT_STATUS_QUEUED, ACT_STATUS_LAUNCHED, \
     ACT_STATUS_DONE, ACT_STATUS_TIMEOUT
 from alignak.action import ActionError
 from alignak.message import Message
+from alignak.workersscaler import WorkerLoad
 from alignak.misc.common import setproctitle, SIGNALS_TO_NAMES_DICT
 
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 
+class ActionsWatcher(object):
+    """Watch the events of the actions launched by an event driven worker and of its
+    actions queue
+    """
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        # Launched actions uuid -> watched file descriptors
+        self.watched = {}
+        self.queue_watched = False
+
+    def watch(self, action):
+        """Watch the events of a launched action: its output streams and, when the system
+        provides it, its process exit
+
+        :param action: launched action
+        :type action: alignak.action.ActionBase
+        :return: None
+        """
+        fds = []
+        for stream in (action.process.stdout, action.process.stderr):
+            self.selector.register(stream.fileno(), selectors.EVENT_READ, (action, stream))
+            fds.append(stream.fileno())
+        if hasattr(os, 'pidfd_open'):
+            try:
+                pidfd = os.pidfd_open(action.process.pid)  # pylint: disable=no-member
+            except OSError:
+                pass
+            else:
+                self.selector.register(pidfd, selectors.EVENT_READ, (action, None))
+                fds.append(pidfd)
+        self.watched[action.uuid] = fds
+
+    def unwatch(self, action, fd_=None):
+        """Stop watching one or all the events of an action
+
+        :param action: watched action
+        :type action: alignak.action.ActionBase
+        :param fd_: file descriptor to stop watching, None for all the action ones
+        :type fd_: int
+        :return: None
+        """
+        fds = self.watched.get(action.uuid, [])
+        for file_desc in list(fds):
+            if fd_ is not None and file_desc != fd_:
+                continue
+            fds.remove(file_desc)
+            key = self.selector.unregister(file_desc)
+            if key.data[1] is None:
+                # The process exit file descriptor is ours
+                os.close(file_desc)
+        if not fds:
+            self.watched.pop(action.uuid, None)
+
+    def watch_queue(self, queue_reader, watch):
+        """Start or stop watching the actions queue
+
+        :param queue_reader: readable end of the actions queue
+        :type queue_reader: multiprocessing.connection.Connection
+        :param watch: True to watch the queue
+        :type watch: bool
+        :return: None
+        """
+        if watch == self.queue_watched:
+            return
+        if watch:
+            self.selector.register(queue_reader, selectors.EVENT_READ, None)
+        else:
+            self.selector.unregister(queue_reader)
+        self.queue_watched = watch
+
+    def close(self):
+        """Stop watching all the events
+
+        :return: None
+        """
+        for key in list(self.selector.get_map().values()):
+            if key.data is not None and key.data[1] is None:
+                # The process exit file descriptor is ours
+                os.close(key.fd)
+        self.selector.close()
+        self.watched = {}
+
+
 class Worker(object):  # pylint: disable=too-many-instance-attributes
     """This class is used for poller and reactionner to work.
     The worker is a process launch by theses process and read Message in a Queue
@@ -86,7 +184,7 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-many-arguments
     def __init__(self, module_name, actions_queue, returns_queue, processes_by_worker,
                  timeout=300, max_plugins_output_length=8192, target=None,
-                 loaded_into='unknown'):
+                 loaded_into='unknown', event_driven=False):
         """
 
         :param module_name:
@@ -100,6 +198,8 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
         :type max_plugins_output_length: int
         :param target:
         :param loaded_into:
+        :param event_driven: wait for the actions events instead of polling the actions
+        :type event_driven: bool
         """
         # Set our own identifier
         cls = self.__class__
@@ -132,6 +232,13 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
         # Keep a trace where the worker is launched from (poller or reactionner?)
         self.loaded_into = loaded_into
 
+        # Event driven mode, only when the selectors are available
+        self.event_driven = event_driven and selectors is not None and os.name != 'nt'
+        self.watcher = None
+
+        # Load accounting, only maintained by our master satellite
+        self.load = WorkerLoad(processes_by_worker)
+
         # By default, take our own code
         if target is None:
             target = self.work
@@ -301,6 +408,8 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
             else:
                 if not isinstance(process, string_types):
                     logger.debug("Launched check: %s, pid=%d", chk.uuid, process.pid)
+                    if self.watcher is not None:
+                        self.watcher.watch(chk)
 
     def manage_finished_checks(self, queue):
         """Check the status of checks
@@ -309,7 +418,6 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
 
         :return: None
         """
-        to_del = []
         wait_time = 1.0
         now = time.time()
         logger.debug("--- manage finished checks")
@@ -319,6 +427,19 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
             if action.status == ACT_STATUS_LAUNCHED and action.last_poll < now - action.wait_time:
                 action.check_finished(self.max_plugins_output_length)
                 wait_time = min(wait_time, action.wait_time)
+        self.send_finished_checks(queue)
+
+        # Little sleep
+        logger.debug("--- manage finished checks terminated, I will wait: %s", wait_time)
+        time.sleep(wait_time)
+
+    def send_finished_checks(self, queue):
+        """Send the finished checks to our master and forget about them
+
+        :return: None
+        """
+        to_del = []
+        for action in self.checks:
             # If action done, we can launch a new one
             if action.status in [ACT_STATUS_DONE, ACT_STATUS_TIMEOUT]:
                 logger.debug("--- check done/timeout: %s", action.uuid)
@@ -336,9 +457,59 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
             logger.debug("--- delete check: %s", chk.uuid)
             self.checks.remove(chk)
 
-        # Little sleep
-        logger.debug("--- manage finished checks terminated, I will wait: %s", wait_time)
-        time.sleep(wait_time)
+    def wait_events(self, timeout):
+        """Wait for the launched actions events, at most timeout seconds.
+        Read the available outputs and finish the actions which process exited.
+
+        :param timeout: maximum time to wait for
+        :type timeout: float
+        :return: None
+        """
+        exited = []
+        for key, _ in self.watcher.selector.select(timeout):
+            if key.data is None:
+                # Some actions are queued, they will be got in the next loop turn
+                continue
+            action, stream = key.data
+            if action.status != ACT_STATUS_LAUNCHED:
+                continue
+            if stream is None:
+                # The process exited
+                exited.append(action)
+            elif not action.read_output(stream):
+                self.watcher.unwatch(action, key.fd)
+                if action.uuid not in self.watcher.watched:
+                    exited.append(action)
+
+        now = time.time()
+        for action in self.checks:
+            if action.status != ACT_STATUS_LAUNCHED:
+                continue
+            # Exited, on timeout, or too long not polled (the streams may be kept open
+            # by a process launched by the action)
+            if action in exited or now - action.check_time > action.timeout \
+                    or now - action.last_poll > 1.0:
+                action.check_finished(self.max_plugins_output_length)
+            if action.status in [ACT_STATUS_DONE, ACT_STATUS_TIMEOUT]:
+                self.watcher.unwatch(action)
+            elif action in exited:
+                # The streams ended before the process exit
+                action.last_poll = 0
+
+    def get_events_timeout(self):
+        """Get the maximum time to wait for the actions events
+
+        :return: time to wait for, at most one second
+        :rtype: float
+        """
+        now = time.time()
+        timeout = 1.0
+        for action in self.checks:
+            if action.status == ACT_STATUS_LAUNCHED:
+                if not action.last_poll:
+                    return 0.01
+                timeout = min(timeout, action.check_time + action.timeout - now)
+        return max(timeout, 0)
 
     def check_for_system_time_change(self):  # pragma: no cover, hardly testable with unit tests...
         """Check if our system time change. If so, change our
@@ -383,6 +554,91 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
             logger.exception(exp)
             raise
 
+    def must_die(self, control_queue):
+        """Get the orders of our master, if any, and check if the worker must die
+
+        :param control_queue: control queue of our master
+        :type control_queue: Queue.Queue
+        :return: True if the worker must stop working
+        :rtype: bool
+        """
+        # Now get order from master, if any...
+        if control_queue:
+            try:
+                control_message = control_queue.get_nowait()
+                logger.info("[%s] Got a message: %s", self._id, control_message)
+                if control_message and control_message.get_type() == 'Die':
+                    logger.info("[%s] The master said we must die... :(", self._id)
+                    return True
+            except Full:
+                logger.warning("Worker control queue is full")
+            except Empty:
+                pass
+            except Exception as exp:  # pylint: disable=broad-except
+                logger.error("Exception when getting master orders: %s. ", str(exp))
+
+        # Maybe someone asked us to die, if so, do it :)
+        if self.interrupted:
+            logger.info("I die because someone asked ;)")
+            return True
+
+        # Look if we are dying, and if we finish all current checks
+        # if so, we really die, our master poller will launch a new
+        # worker because we were too weak to manage our job :(
+        if not self.checks and self.i_am_dying:
+            logger.warning("I die because I cannot do my job as I should "
+                           "(too many open files?)... forgive me please.")
+            return True
+        return False
+
+    def do_work_events(self, actions_queue, returns_queue, control_queue=None):
+        """Main function of the event driven worker.
+        * Get checks
+        * Launch new checks
+        * Wait for the queued actions and the launched checks events
+
+        :param actions_queue: Global Queue Master->Slave
+        :type actions_queue: Queue.Queue
+        :param returns_queue: queue managed by manager
+        :type returns_queue: Queue.Queue
+        :return: None
+        """
+        self.watcher = ActionsWatcher()
+        # The multiprocessing queue pipe is readable when some actions are queued
+        queue_reader = getattr(actions_queue, '_reader', None)
+
+        self.checks = []
+        self.t_each_loop = time.time()
+        while True:
+            if not self.i_am_dying:
+                self.get_new_checks(actions_queue, returns_queue)
+                self.launch_new_checks()
+            self.send_finished_checks(returns_queue)
+
+            if self.must_die(control_queue):
+                break
+
+            self.check_for_system_time_change()
+
+            # Watch the actions queue only when we may get some more actions
+            if queue_reader is not None:
+                self.watcher.watch_queue(queue_reader, not self.i_am_dying and
+                                         len(self.checks) < self.processes_by_worker)
+
+            timeout = self.get_events_timeout()
+            if queue_reader is None:
+                # We are not notified of the queued actions
+                timeout = min(timeout, 0.1)
+            self.wait_events(timeout)
+
+            logger.debug("+++ loop end: idle: %s, checks: %d, "
+                         "actions (got: %d, launched: %d, finished: %d)",
+                         self._idletime, len(self.checks),
+                         self.actions_got, self.actions_launched, self.actions_finished)
+
+        self.watcher.close()
+        self.watcher = None
+
     def do_work(self, actions_queue, returns_queue, control_queue=None):  # pragma: no cover
         """Main function of the worker.
         * Get checks
@@ -402,6 +658,10 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
 
         setproctitle("alignak-%s worker %s" % (self.loaded_into, self._id))
 
+        if self.event_driven:
+            self.do_work_events(actions_queue, returns_queue, control_queue)
+            return
+
         timeout = 1.0
         self.checks = []
         self.t_each_loop = time.time()
@@ -421,32 +681,7 @@ class Worker(object):  # pylint: disable=too-many-instance-attributes
 
             logger.debug("loop middle, %d checks", len(self.checks))
 
-            # Now get order from master, if any...
-            if control_queue:
-                try:
-                    control_message = control_queue.get_nowait()
-                    logger.info("[%s] Got a message: %s", self._id, control_message)
-                    if control_message and control_message.get_type() == 'Die':
-                        logger.info("[%s] The master said we must die... :(", self._id)
-                        break
-                except Full:
-                    logger.warning("Worker control queue is full")
-                except Empty:
-                    pass
-                except Exception as exp:  # pylint: disable=broad-except
-                    logger.error("Exception when getting master orders: %s. ", str(exp))
-
-            # Maybe someone asked us to die, if so, do it :)
-            if self.interrupted:
-                logger.info("I die because someone asked ;)")
-                break
-
-            # Look if we are dying, and if we finish all current checks
-            # if so, we really die, our master poller will launch a new
-            # worker because we were too weak to manage our job :(
-            if not self.checks and self.i_am_dying:
-                logger.warning("I die because I cannot do my job as I should "
-                               "(too many open files?)... forgive me please.")
+            if self.must_die(control_queue):
                 break
 
             # Manage a possible time change (our avant will be change with the diff)
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the WorkerLoad and WorkersScaler classes. They are used by the
+satellites (pollers and reactionners) to account for their workers load and to adjust
+the number of workers of each module to its load.
+
+The load of a worker is the number of actions assigned to the worker and not yet returned.
+Its latency is the moving average of the time its returned actions waited before being
+executed. The load is only maintained by the satellite that launched the worker.
+
+A worker is added to a module when its workers are overloaded or when the actions wait too
+long before being executed. A worker is retired when the module workers are under-used for
+a while: it does not get any new action and it is stopped when it returned all its actions.
+"""
+import time
+import logging
+
+from alignak.stats import statsmgr
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class WorkerLoad(object):
+    """Load accounting of a worker"""
+    # Weight of the last returned action in the worker latency moving average
+    latency_weight = 0.2
+
+    def __init__(self, processes_by_worker):
+        """
+        :param processes_by_worker: number of actions the worker may execute at once
+        :type processes_by_worker: int
+        """
+        self.processes_by_worker = processes_by_worker
+        # Assigned actions uuid -> assignment time
+        self.in_flight = {}
+        # Moving average of the time the returned actions waited before being executed
+        self.latency = 0.0
+        self.last_activity = time.time()
+        # The worker does not get any more actions, it will be stopped when idle
+        self.retiring = False
+
+    def action_assigned(self, action, now=None):
+        """Account an action assigned to the worker
+
+        :param action: assigned action
+        :type action: alignak.action.Action
+        :param now: assignment time, default is now
+        :type now: float
+        :return: None
+        """
+        now = now or time.time()
+        self.in_flight[action.uuid] = now
+        self.last_activity = now
+
+    def action_returned(self, action, now=None):
+        """Account an action returned by the worker
+
+        :param action: returned action
+        :type action: alignak.action.Action
+        :param now: return time, default is now
+        :type now: float
+        :return: None
+        """
+        now = now or time.time()
+        assigned = self.in_flight.pop(action.uuid, None)
+        self.last_activity = now
+        if assigned is None:
+            return
+        latency = max(now - assigned - (getattr(action, 'execution_time', 0) or 0), 0)
+        self.latency += self.latency_weight * (latency - self.latency)
+
+    def get_load(self):
+        """Get the worker load: the number of assigned actions not yet returned
+
+        :return: worker load
+        :rtype: int
+        """
+        return len(self.in_flight)
+
+    def get_utilisation(self):
+        """Get the worker utilisation: its load relatively to the number of actions
+        it may execute at once
+
+        :return: worker utilisation
+        :rtype: float
+        """
+        return float(len(self.in_flight)) / max(self.processes_by_worker, 1)
+
+
+class WorkersScaler(object):
+    """Adjust the number of workers of each module of a satellite to the workers load"""
+    # Minimum delay (in seconds) between two workers scaling decisions for a module
+    scaling_delay = 10
+    # A worker is retired if the other workers load would be less than this ratio
+    # of their capacity
+    low_load_ratio = 0.5
+
+    def __init__(self, satellite):
+        """
+        :param satellite: satellite which workers are scaled
+        :type satellite: alignak.satellite.Satellite
+        """
+        self.satellite = satellite
+        # module -> last scaling decision time / low load start time
+        self.scaled = {}
+        self.low_load = {}
+        # module -> last scaling decision
+        self.decisions = {}
+        self.nb_added = 0
+        self.nb_retired = 0
+
+    def action_assigned(self, worker_id, action):
+        """Account an action assigned to a worker
+
+        :param worker_id: worker the action is assigned to
+        :type worker_id: str
+        :param action: assigned action
+        :type action: alignak.action.Action
+        :return: None
+        """
+        if worker_id in self.satellite.workers:
+            self.satellite.workers[worker_id].load.action_assigned(action)
+
+    def action_returned(self, action):
+        """Account an action returned by its worker
+
+        :param action: returned action
+        :type action: alignak.action.Action
+        :return: None
+        """
+        worker = self.satellite.workers.get(getattr(action, 'my_worker', None), None)
+        if worker is not None:
+            worker.load.action_returned(action)
+
+    def get_least_loaded(self, queues):
+        """Get the least loaded worker of some workers queues, the first one
+        if several workers are equally loaded
+
+        :param queues: list of (worker id, worker queue)
+        :type queues: list
+        :return: worker id and queue of the least loaded worker
+        :rtype: tuple
+        """
+        workers = self.satellite.workers
+        return min(queues, key=lambda item: workers[item[0]].load.get_load()
+                   if item[0] in workers else 0)
+
+    def get_module_load(self, mod):
+        """Get the load of the workers of a module
+
+        :param mod: module name
+        :type mod: str
+        :return: workers count, load (assigned actions not yet returned), capacity (actions
+                 the workers may execute at once) and highest workers latency
+        :rtype: tuple
+        """
+        workers = [self.satellite.workers[worker_id].load
+                   for worker_id in self.satellite.q_by_mod[mod]
+                   if worker_id in self.satellite.workers]
+        load = sum(worker.get_load() for worker in workers)
+        latency = max([worker.latency for worker in workers] or [0.0])
+        return len(workers), load, len(workers) * self.satellite.processes_by_worker, latency
+
+    def scale(self, now=None):
+        """Scale the workers of each module of the satellite and stop the retired workers
+        that returned all their actions
+
+        :param now: current time, default is now
+        :type now: float
+        :return: None
+        """
+        now = now or time.time()
+        for mod in self.satellite.q_by_mod:
+            self.scale_module(mod, now)
+        self.stop_retired_workers()
+
+    def scale_module(self, mod, now):
+        """Add or retire a worker of a module according to its workers load
+
+        A worker is added, up to max_workers, if some actions are waiting for a worker
+        process (the load is greater than the capacity) or if the actions wait more than
+        worker_scale_latency seconds before being executed.
+
+        A worker is retired, down to min_workers, if the other workers would still be
+        under-used and the actions do not wait, during worker_idle_timeout seconds. The
+        least loaded worker does not get new actions anymore and it is stopped when it
+        returned all its actions.
+
+        :param mod: module name
+        :type mod: str
+        :param now: current time
+        :type now: float
+        :return: None
+        """
+        satellite = self.satellite
+        count, load, capacity, latency = self.get_module_load(mod)
+        if not count or now - self.scaled.get(mod, 0) < self.scaling_delay:
+            return
+
+        if count < satellite.max_workers and \
+                (load > capacity or latency > satellite.worker_scale_latency):
+            logger.info("Adding a '%s' worker, load: %d/%d, latency: %.2f seconds",
+                        mod, load, capacity, latency)
+            self.decide(mod, now, 'add', count, load, capacity, latency)
+            satellite.create_and_launch_worker(module_name=mod)
+            self.nb_added += 1
+            return
+
+        if count <= satellite.min_workers or \
+                load > (count - 1) * satellite.processes_by_worker * self.low_load_ratio or \
+                latency > satellite.worker_scale_latency / 2:
+            self.low_load.pop(mod, None)
+            return
+
+        if now - self.low_load.setdefault(mod, now) < satellite.worker_idle_timeout:
+            return
+
+        worker_id = min(satellite.q_by_mod[mod],
+                        key=lambda w_id: satellite.workers[w_id].load.get_load())
+        logger.info("Retiring the '%s' worker %s, load: %d/%d, latency: %.2f seconds",
+                    mod, worker_id, load, capacity, latency)
+        self.decide(mod, now, 'retire', count, load, capacity, latency)
+        # No more actions for this worker
+        del satellite.q_by_mod[mod][worker_id]
+        satellite.workers[worker_id].load.retiring = True
+        self.nb_retired += 1
+
+    def decide(self, mod, now, decision, *load):
+        """Store a scaling decision for a module
+
+        :param mod: module name
+        :type mod: str
+        :param now: decision time
+        :type now: float
+        :param decision: 'add' or 'retire'
+        :type decision: str
+        :param load: workers count, load, capacity and latency of the module
+        :type load: tuple
+        :return: None
+        """
+        self.decisions[mod] = dict(zip(('workers', 'load', 'capacity', 'latency'), load),
+                                   time=int(now), decision=decision)
+        self.scaled[mod] = now
+        self.low_load.pop(mod, None)
+
+    def stop_retired_workers(self):
+        """Stop the retiring workers that returned all their actions
+
+        :return: None
+        """
+        for worker in list(self.satellite.workers.values()):
+            if not worker.load.retiring or worker.load.get_load():
+                continue
+            logger.info("Stopping the retired worker %s", worker.get_id())
+            # The worker stops on SIGTERM
+            worker.terminate()
+            worker.join(timeout=1)
+            del self.satellite.workers[worker.get_id()]
+
+    def get_stats(self):
+        """Get the workers load and the modules workers scaling statistics
+
+        :return: stats dictionary
+        :rtype: dict
+        """
+        satellite = self.satellite
+        res = {'workers_scaling': {}}
+        if satellite.workers:
+            res['workers'] = {}
+            for worker in list(satellite.workers.values()):
+                res['workers'][worker.get_id()] = {
+                    'module': worker.module_name,
+                    'load': worker.load.get_load(),
+                    'utilisation': worker.load.get_utilisation(),
+                    'latency': worker.load.latency,
+                    'retiring': worker.load.retiring
+                }
+                stats = getattr(worker, 'stats', None)
+                if stats:
+                    res['workers'][worker.get_id()].update(stats)
+
+        for mod in satellite.q_by_mod:
+            count, load, capacity, latency = self.get_module_load(mod)
+            res['workers_scaling'][mod] = {
+                'workers': count, 'min_workers': satellite.min_workers,
+                'max_workers': satellite.max_workers, 'load': load, 'capacity': capacity,
+                'latency': latency, 'last_decision': self.decisions.get(mod, None)
+            }
+        return res
+
+    def send_stats(self):
+        """Send the workers queues size and load statistics
+
+        :return: None
+        """
+        satellite = self.satellite
+        for mod in satellite.q_by_mod:
+            # In workers we've got actions sent to queue - queue size
+            for (worker_id, queue) in list(satellite.q_by_mod[mod].items()):
+                try:
+                    actions_count = queue.qsize()
+                    results_count = satellite.returns_queue.qsize()
+                    logger.debug("[%s][%s] actions queued: %d, results queued: %d",
+                                 mod, worker_id, actions_count, results_count)
+                    statsmgr.gauge('worker.%s.actions-queue-size' % worker_id, actions_count)
+                    statsmgr.gauge('worker.%s.results-queue-size' % worker_id, results_count)
+                    if worker_id in satellite.workers:
+                        worker = satellite.workers[worker_id]
+                        statsmgr.gauge('worker.%s.load' % worker_id, worker.load.get_load())
+                        statsmgr.timer('worker.%s.latency' % worker_id, worker.load.latency)
+                except (IOError, EOFError):
+                    pass
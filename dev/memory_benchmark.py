@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+# -----------------------------------------------------------------------------
+#  ./memory_benchmark.py measures the memory used by the hosts and services of a
+# synthetic configuration once they are un-serialized by a scheduler, and once they
+# are compacted (see the compact_objects configuration parameter).
+#
+#  The hosts and services are built from prototypes that are serialized, json encoded
+# and decoded, then un-serialized, exactly as a scheduler gets them from the arbiter.
+#
+#  Default is 10000 hosts with 10 services each:
+#   python dev/memory_benchmark.py --hosts 10000 --services 10
+#
+#  This script requires Python 3 (tracemalloc).
+# -----------------------------------------------------------------------------
+"""Scheduler hosts and services memory benchmark"""
+from __future__ import print_function
+
+import gc
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from alignak.misc.serialization import unserialize
+from alignak.objects.command import Command, Commands
+from alignak.commandcall import CommandCall
+from alignak.objects.host import Host
+from alignak.objects.service import Service
+
+
+def get_prototypes():
+    """Get the serialized host and service prototypes
+
+    :return: host and service serialized prototypes
+    :rtype: tuple
+    """
+    commands = Commands([
+        Command({'command_name': 'check_host_alive',
+                 'command_line': '$USER1$/check_ping -H $HOSTADDRESS$ -w 1000,100% -c 3000,100%'}),
+        Command({'command_name': 'check_service',
+                 'command_line': '$USER1$/check_service.py -H $HOSTADDRESS$ -s $ARG1$'})
+    ])
+    host = Host({'host_name': 'host', 'alias': 'A synthetic host', 'address': '127.0.0.1',
+                 'hostgroups': 'servers,linux', 'tags': 'linux,synthetic',
+                 '_OS': 'Linux', '_LOCATION': 'Datacenter'})
+    host.check_command = CommandCall({'command_line': 'check_host_alive',
+                                      'commands': commands}, parsing=True)
+    service = Service({'host_name': 'host', 'service_description': 'service',
+                       'servicegroups': 'synthetic', 'tags': 'synthetic',
+                       '_CRITICALITY': 'high'})
+    service.check_command = CommandCall({'command_line': 'check_service!service',
+                                         'commands': commands}, parsing=True)
+    return (json.dumps(host.serialize(no_json=True)),
+            json.dumps(service.serialize(no_json=True)))
+
+
+def load_items(nb_hosts, nb_services):
+    """Un-serialize the synthetic hosts and services
+
+    :param nb_hosts: number of hosts
+    :type nb_hosts: int
+    :param nb_services: number of services per host
+    :type nb_services: int
+    :return: hosts and services
+    :rtype: list
+    """
+    host_proto, service_proto = get_prototypes()
+    items = []
+    for host_idx in range(nb_hosts):
+        host_name = 'host-%05d' % host_idx
+        data = json.loads(host_proto)
+        data.update({'uuid': 'h-%d' % host_idx, 'host_name': host_name})
+        items.append(Host(unserialize(data, no_json=True), parsing=False))
+        for service_idx in range(nb_services):
+            data = json.loads(service_proto)
+            data.update({'uuid': 's-%d-%d' % (host_idx, service_idx), 'host': 'h-%d' % host_idx,
+                         'host_name': host_name, 'service_description': 'svc-%d' % service_idx})
+            items.append(Service(unserialize(data, no_json=True), parsing=False))
+    return items
+
+
+def compact_items(items):
+    """Compact the hosts and services, as the scheduler does
+
+    :param items: hosts and services
+    :type items: list
+    :return: None
+    """
+    cache = {}
+    for item in items:
+        item.compact(cache)
+
+
+def main():
+    """Measure and print the hosts and services memory usage"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hosts', type=int, default=10000, help='number of hosts')
+    parser.add_argument('--services', type=int, default=10, help='number of services per host')
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    _t0 = time.time()
+    items = load_items(args.hosts, args.services)
+    gc.collect()
+    loaded = tracemalloc.get_traced_memory()[0]
+    print("Loaded %d hosts and %d services in %.1f seconds: %.1f MB, %d bytes per object"
+          % (args.hosts, args.hosts * args.services, time.time() - _t0,
+             loaded / 1048576.0, loaded // len(items)))
+
+    _t0 = time.time()
+    compact_items(items)
+    gc.collect()
+    compacted = tracemalloc.get_traced_memory()[0]
+    print("Compacted in %.1f seconds: %.1f MB, %d bytes per object (-%.0f%%)"
+          % (time.time() - _t0, compacted / 1048576.0, compacted // len(items),
+             100.0 * (loaded - compacted) / loaded))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -203,6 +203,22 @@ class TestConfigClassBase(AlignakTest):
             assert getattr(alignak_cfg.properties, '$%s$' % macro, None) is None, \
                 "Macro: %s property is not existing as an attribute of properties!" % ('$%s$' % macro)
 
+    def test_config_parsing_processes(self):
+        """Test the configuration files parsed by several processes"""
+        legacy_cfg_files = [os.path.join(self._test_dir, './cfg/cfg_default.cfg')]
+
+        alignak_cfg = Config({})
+        reference = alignak_cfg.read_config_buf(
+            alignak_cfg.read_legacy_cfg_files(legacy_cfg_files))
+        assert reference['host']
+
+        # Same objects when the files are parsed by several processes
+        alignak_cfg = Config({})
+        alignak_cfg.config_parsing_processes = 2
+        cfg_buffer = alignak_cfg.read_legacy_cfg_files(legacy_cfg_files)
+        assert len(alignak_cfg.split_config_buf(cfg_buffer)) == len(alignak_cfg.my_cfg_files)
+        assert alignak_cfg.read_config_buf(cfg_buffer) == reference
+
     def test_config_serialization(self):
         """Test the object initialization and base features"""
         # ---
@@ -133,6 +133,9 @@ class TestConfig(PropertiesTester, AlignakTest):
 
     properties = dict([
         ('clean_objects', False),
+        ('compact_objects', False),
+        ('delta_broks', False),
+        ('differential_conf_push', False),
         ('forced_realms_hostgroups', True),
         ('program_start', 0),
         ('last_alive', 0),
@@ -268,6 +271,7 @@ class TestConfig(PropertiesTester, AlignakTest):
         # ('pack_distribution_file', 'pack_distribution.dat'),
 
         ('daemon_thread_pool_size', 8),
+        ('config_parsing_processes', 0),
         ('timeout_exit_status', 2),
 
         # daemons part
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the scheduler checks and actions launch queue
+"""
+import time
+from .alignak_test import AlignakTest
+from alignak.check import Check
+from alignak.eventhandler import EventHandler
+from alignak.notification import Notification
+from alignak.actionqueue import ActionQueue, BUCKET_INTERNAL, BUCKET_MASTER
+from alignak.action import (ACT_STATUS_SCHEDULED, ACT_STATUS_POLLED,
+                            ACT_STATUS_WAIT_CONSUME, ACT_STATUS_ZOMBIE)
+
+
+class TestActionQueue(AlignakTest):
+    """This class tests the checks and actions launch queue
+    """
+    def setUp(self):
+        super(TestActionQueue, self).setUp()
+
+    def test_buckets(self):
+        """ Actions are stored in a bucket according to their tags and type
+
+        :return: None
+        """
+        check = Check({'command': 'check_me', 'poller_tag': 'north', 'module_type': 'nrpe'})
+        assert ActionQueue.get_bucket(check) == ('north', 'nrpe')
+
+        check = Check({'command': '_internal_check'})
+        assert check.internal
+        assert ActionQueue.get_bucket(check) == BUCKET_INTERNAL
+
+        notification = Notification({'command': 'notify', 'contact': ''})
+        assert ActionQueue.get_bucket(notification) == BUCKET_MASTER
+
+        notification = Notification({'command': 'notify', 'contact': 'contact_uuid',
+                                     'reactionner_tag': 'south'})
+        assert ActionQueue.get_bucket(notification) == ('south', 'fork')
+
+        event_handler = EventHandler({'command': 'handle_me'})
+        assert ActionQueue.get_bucket(event_handler) == ('None', 'fork')
+
+    def test_pop_launchable(self):
+        """ Only the scheduled and launchable actions are popped, ordered by launch time
+
+        :return: None
+        """
+        now = time.time()
+        queue = ActionQueue()
+        checks = {}
+        for delay in [30, -10, 0, -20]:
+            check = Check({'command': 'check_me', 't_to_go': now + delay})
+            checks[check.uuid] = check
+            queue.attach(check)
+        assert len(queue) == 4
+
+        launchable = queue.pop_launchable(now, [('None', 'fork')], checks)
+        assert [chk.t_to_go for chk in launchable] == [now - 20, now - 10, now]
+        # Popped checks are not popped twice
+        assert queue.pop_launchable(now, [('None', 'fork')], checks) == []
+        assert len(queue) == 1
+
+        # No check for other buckets
+        assert queue.pop_launchable(now + 60, [('north', 'fork')], checks) == []
+
+        # The launch time changed, the check is available now
+        future = [chk for chk in list(checks.values()) if chk.t_to_go > now][0]
+        future.t_to_go = now - 1
+        assert queue.pop_launchable(now, [('None', 'fork')], checks) == [future]
+
+        # A check which is scheduled again is queued again
+        future.status = ACT_STATUS_POLLED
+        future.status = ACT_STATUS_SCHEDULED
+        assert queue.pop_launchable(now, [('None', 'fork')], checks) == [future]
+
+        # A check that is not scheduled or not in the checks list is not popped
+        future.status = ACT_STATUS_POLLED
+        future.t_to_go = now - 2
+        assert queue.pop_launchable(now, [('None', 'fork')], checks) == []
+        future.status = ACT_STATUS_SCHEDULED
+        assert queue.pop_launchable(now, [('None', 'fork')], {}) == []
+
+        # A detached check is not notifying anymore
+        queue.detach(future)
+        future.t_to_go = now - 3
+        assert queue.pop_launchable(now, [('None', 'fork')], checks) == []
+        assert '_index' not in future.__dict__
+
+    def test_status_index(self):
+        """ Actions are indexed on their status
+
+        :return: None
+        """
+        queue = ActionQueue()
+        checks = {}
+        for _ in range(3):
+            check = Check({'command': 'check_me', 't_to_go': time.time()})
+            checks[check.uuid] = check
+            queue.attach(check)
+        assert len(queue.get_by_status(ACT_STATUS_SCHEDULED, checks)) == 3
+        assert queue.get_by_status(ACT_STATUS_WAIT_CONSUME, checks) == []
+
+        first, second, third = list(checks.values())
+        second.status = ACT_STATUS_WAIT_CONSUME
+        first.status = ACT_STATUS_WAIT_CONSUME
+        # Ordered by status change
+        assert queue.get_by_status(ACT_STATUS_WAIT_CONSUME, checks) == [second, first]
+        assert queue.get_by_status(ACT_STATUS_SCHEDULED, checks) == [third]
+        # Only the checks of the provided dict
+        assert queue.get_by_status(ACT_STATUS_WAIT_CONSUME, {first.uuid: first}) == [first]
+
+        # Drain the zombies
+        first.status = ACT_STATUS_ZOMBIE
+        assert queue.drain_status(ACT_STATUS_ZOMBIE) == [first]
+        assert queue.drain_status(ACT_STATUS_ZOMBIE) == []
+        assert '_index' not in first.__dict__
+        # A detached check is not indexed anymore
+        first.status = ACT_STATUS_WAIT_CONSUME
+        assert queue.get_by_status(ACT_STATUS_WAIT_CONSUME, checks) == [second]
+
+    def test_scheduler_get_to_run_checks(self):
+        """ The scheduler only gets the launchable checks from its queue
+
+        :return: None
+        """
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+
+        # Create the initial checks
+        self._scheduler.schedule()
+        assert len(self._scheduler.checks) > 0
+        for check in list(self._scheduler.checks.values()):
+            check.t_to_go = time.time() + 3600
+
+        assert self._scheduler.get_to_run_checks(True, False, worker_name='tester') == []
+
+        for check in list(self._scheduler.checks.values()):
+            check.t_to_go = 0
+        checks = self._scheduler.get_to_run_checks(True, False, worker_name='tester')
+        assert len(checks) == len(self._scheduler.checks)
+        for check in checks:
+            assert check.status == ACT_STATUS_POLLED
+            assert check.my_worker == 'tester'
+        assert self._scheduler.get_to_run_checks(True, False, worker_name='tester') == []
+
+        # Zombie checks are removed from the queue
+        for check in checks:
+            check.status = u'zombie'
+        self._scheduler.delete_zombie_checks()
+        assert len(self._scheduler.checks) == 0
+        assert len(self._scheduler.checks_queue) == 0
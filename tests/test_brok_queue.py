@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the per broker broks queues
+"""
+from .alignak_test import AlignakTest
+
+from alignak.brok import Brok
+from alignak.brokqueue import BrokQueue
+
+
+class TestBrokQueue(AlignakTest):
+    """This class tests the per broker broks queues
+    """
+    def setUp(self):
+        super(TestBrokQueue, self).setUp()
+
+    @staticmethod
+    def get_broks(count):
+        """Get some log broks"""
+        return [Brok({'type': 'log', 'data': {'log': 'Brok %d' % idx}}) for idx in range(count)]
+
+    def test_brok_queue(self):
+        """ Only the broks sent to the external modules are drained, oldest first
+
+        :return: None
+        """
+        broks = self.get_broks(5)
+        queue = BrokQueue()
+        for brok in broks[:3]:
+            queue.append(brok)
+        assert len(queue) == 3
+        assert list(queue.get_pending()) == broks[:3]
+        assert queue.drain() == []
+
+        queue.set_sent_to_externals()
+        assert all(brok.sent_to_externals for brok in broks[:3])
+        for brok in broks[3:]:
+            queue.append(brok)
+        assert list(queue) == broks
+        assert queue.drain() == broks[:3]
+        assert list(queue) == broks[3:]
+
+        # The oldest broks are dropped first
+        queue.set_sent_to_externals()
+        queue.extend(self.get_broks(3))
+        assert queue.truncate(3) == 2
+        assert len(queue.get_pending()) == 3
+        assert queue.drain() == []
+
+        # A list of broks is converted when set on a satellite link
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+        self._main_broker.broks = broks
+        assert isinstance(self._main_broker.broks, BrokQueue)
+        assert self._main_broker.broks.drain() == broks
+
+    def test_give_broks(self):
+        """ The broks are sent once to the modules, then given to each broker
+
+        :return: None
+        """
+        self.setup_with_file('cfg/multibroker/cfg_multi_broker_one_scheduler.cfg',
+                             dispatching=True)
+        scheduler = self._scheduler
+        brokers = list(scheduler.my_daemon.brokers.values())
+        assert len(brokers) == 2
+        for broker_link in brokers:
+            broker_link.broks.clear()
+
+        broks = self.get_broks(3)
+        for brok in broks:
+            scheduler.add_brok(brok)
+        for broker_link in brokers:
+            assert list(broker_link.broks) == broks
+            assert scheduler.my_daemon.give_broks(broker_link.name) == []
+
+        scheduler.send_broks_to_modules()
+        assert not any(brok.to_send for brok in broks)
+        for broker_link in brokers:
+            assert scheduler.my_daemon.give_broks(broker_link.name) == broks
+            assert len(broker_link.broks) == 0
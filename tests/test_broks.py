@@ -28,6 +28,21 @@ from six import string_types
 from .alignak_test import AlignakTest
 from alignak.misc.serialization import serialize, unserialize
 from alignak.external_command import ExternalCommand, ExternalCommandManager
+from alignak.basemodule import BaseModule
+from alignak.brok import Brok
+from alignak.objects.module import Module
+from alignak.objects.checkmodulation import CheckModulation
+from alignak.http.scheduler_interface import SchedulerInterface
+
+
+class BatchModule(BaseModule):
+    """An internal module that records the broks batches it gets"""
+    def __init__(self, mod_conf):
+        super(BatchModule, self).__init__(mod_conf)
+        self.batches = []
+
+    def manage_broks(self, broks):
+        self.batches.append([brok.uuid for brok in broks])
 
 
 class TestBroks(AlignakTest):
@@ -229,3 +244,239 @@ class TestBroks(AlignakTest):
 
         res = serialize(my_events, True)
         print("My events: %s" % res)
+
+    def test_broker_manage_broks_batches(self):
+        """Test the broker internal modules get the broks by batches
+        """
+        mod = Module({'name': 'batch-module', 'type': 'test'})
+        mod.properties = {'daemons': ['broker'], 'type': 'test', 'external': False}
+        module = BatchModule(mod)
+        self._broker_daemon.modules_manager.instances.append(module)
+
+        broks = [Brok({'type': 'log', 'data': {'log': 'Brok %d' % idx}}) for idx in range(10)]
+        self._broker_daemon.external_broks.extend(broks)
+        self._broker_daemon.manage_broks_batch = 4
+        assert self._broker_daemon.manage_internal_broks() == 10
+        assert len(self._broker_daemon.external_broks) == 0
+        assert module.batches == [[brok.uuid for brok in broks[0:4]],
+                                  [brok.uuid for brok in broks[4:8]],
+                                  [brok.uuid for brok in broks[8:10]]]
+        for brok in broks:
+            assert brok.prepared
+
+        # No time budget, only one batch is managed in a loop turn
+        module.batches = []
+        self._broker_daemon.external_broks.extend(broks)
+        self._broker_daemon.manage_broks_time_budget = -1
+        assert self._broker_daemon.manage_internal_broks() == 4
+        assert len(self._broker_daemon.external_broks) == 6
+        assert module.batches == [[brok.uuid for brok in broks[0:4]]]
+
+        # The default module implementation manages each brok of the batch
+        default_module = BaseModule(mod)
+        default_module.manage_log_brok = lambda brok: module.batches.append(brok.uuid)
+        default_module.manage_broks(broks[0:2])
+        assert module.batches[1:] == [broks[0].uuid, broks[1].uuid]
+
+    def test_brok_plans(self):
+        """The broks are filled with the class properties having the brok type in fill_brok
+
+        :return: None
+        """
+        def reference_fill(item, brok_type):
+            """The properties values, as got one by one"""
+            data = {}
+            cls = item.__class__
+            for props in (cls.properties, getattr(cls, 'running_properties', {})):
+                for prop, entry in props.items():
+                    if brok_type in entry.fill_brok:
+                        data[prop] = item.get_property_value_for_brok(prop, props)
+            return data
+
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                     "test_ok_0")
+        modulation = CheckModulation({'checkmodulation_name': 'modulation',
+                                      'check_command': 'check_ping'})
+        modulation.check_period = self._scheduler.timeperiods[host.check_period]
+        for item in (host, svc, modulation):
+            for brok_type in ('full_status', 'check_result', 'next_schedule'):
+                data = {}
+                item.fill_data_brok_from(data, brok_type)
+                reference = reference_fill(item, brok_type)
+                if brok_type == 'check_result' and item is not modulation:
+                    reference['command_name'] = data['command_name']
+                assert data == reference
+
+        # The plans are built once per class
+        plan = host.__class__.get_brok_plan('check_result')
+        assert host.__class__.get_brok_plan('check_result') is plan
+        assert svc.__class__.get_brok_plan('check_result') is not plan
+        data = {}
+        modulation.fill_data_brok_from(data, 'full_status')
+        assert data['check_period'] == '24x7'
+        names, _, fields = plan
+        assert 'state' in names
+        assert len(fields) == len(reference_fill(host, 'check_result'))
+
+        # A missing property gets its default value
+        del host.output
+        data = {}
+        host.fill_data_brok_from(data, 'check_result')
+        assert data['output'] == host.__class__.running_properties['output'].default
+
+    def test_delta_broks(self):
+        """The delta broks only contain the changed properties and the full broks
+        are restored for the broker modules that need them
+
+        :return: None
+        """
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        host.checks_in_progress = []
+        host.act_depend_of = []  # ignore the router
+        host.event_handler_enabled = False
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0", "test_ok_0")
+        svc.checks_in_progress = []
+        svc.act_depend_of = []
+        svc.event_handler_enabled = False
+
+        self._scheduler.delta_broks = True
+        self._main_broker.broks.clear()
+        self.scheduler_loop(1, [[host, 2, 'DOWN'], [svc, 0, 'OK']])
+        time.sleep(0.1)
+        self.scheduler_loop(1, [[host, 2, 'DOWN']])
+        time.sleep(0.1)
+
+        broks = list(self._main_broker.broks)
+        assert not [brok for brok in broks if brok.type in ['host_check_result',
+                                                           'update_host_status']]
+        host_results = [brok for brok in broks if brok.type == 'host_check_result_delta']
+        assert len(host_results) == 2
+        # The first brok contains all the properties
+        assert set(host_results[0].data) == set(host.get_check_result_brok().data)
+        # The next ones contain the changed properties
+        assert host_results[1].data['host_name'] == 'test_host_0'
+        assert 'state' not in host_results[1].data
+        assert 'attempt' in host_results[1].data
+        assert len(host_results[1].data) < len(host_results[0].data)
+        svc_results = [brok for brok in broks if brok.type == 'service_check_result_delta']
+        assert svc_results[0].data['service_description'] == 'test_ok_0'
+
+        # The broker restores the full broks from the received broks
+        received = [Brok(brok.serialize()) for brok in broks]
+        module = BaseModule(Module({'name': 'full-module', 'type': 'test',
+                                    'full_status_broks': '1'}))
+        module.properties = {'daemons': ['broker'], 'type': 'test', 'external': False}
+        assert module.full_status_broks is True
+        got = []
+        module.manage_broks = got.extend
+        self._broker_daemon.modules_manager.instances.append(module)
+        self._broker_daemon.restore_full_broks(received)
+        self._broker_daemon.manage_broks(received)
+        assert len(got) == len(received)
+        full_results = [brok for brok in got if brok.type == 'host_check_result']
+        assert len(full_results) == 2
+        assert full_results[1].data['state'] == 'DOWN'
+        assert full_results[1].data['attempt'] == host.attempt
+        assert full_results[1].data['output'] == host.output
+        assert not [brok for brok in got if brok.type.endswith('_delta')]
+
+        # The states are reset when a broker gets its initial broks
+        assert self._scheduler.broks_states
+        self._main_broker.initialized = False
+        self._scheduler.fill_initial_broks(self._main_broker.name)
+        assert self._scheduler.broks_states == {}
+
+    def test_delta_broks_changed_in_place(self):
+        """The delta broks contain the item properties that changed in place
+
+        :return: None
+        """
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0", "test_ok_0")
+        self._scheduler.delta_broks = True
+        self._scheduler.get_and_register_status_brok(svc)
+        self._scheduler.get_and_register_status_brok(svc)
+        broks = [brok for brok in self._main_broker.broks
+                 if brok.type == 'update_service_status_delta']
+        assert len(broks) == 2
+        assert 'comments' in broks[0].data
+        assert 'comments' not in broks[1].data
+
+        # A comment is added to the service comments
+        self._main_broker.broks.clear()
+        excmd = '[%d] ADD_SVC_COMMENT;test_host_0;test_ok_0;1;me;My comment' % time.time()
+        self._scheduler.run_external_commands([excmd])
+        self.external_command_loop()
+        assert len(svc.comments) == 1
+        self._scheduler.get_and_register_status_brok(svc)
+        broks = [brok for brok in self._main_broker.broks
+                 if brok.type == 'update_service_status_delta' and
+                 brok.data['uuid'] == svc.uuid and 'comments' in brok.data]
+        assert len(broks) == 1
+        assert list(broks[0].data['comments']) == list(svc.comments)
+
+        # Unchanged, the comments are not sent again
+        self._main_broker.broks.clear()
+        self._scheduler.get_and_register_status_brok(svc)
+        broks = [brok for brok in self._main_broker.broks
+                 if brok.type == 'update_service_status_delta']
+        assert 'comments' not in broks[0].data
+
+    def test_initial_broks_stream(self):
+        """The initial broks are streamed to the broker by pages
+
+        :return: None
+        """
+        interface = SchedulerInterface(self._scheduler_daemon)
+        broker_name = self._main_broker.name
+        self._main_broker.broks.clear()
+        self._main_broker.initialized = False
+        count = self._scheduler.fill_initial_broks(broker_name)
+        expected = [brok.type for brok in self._main_broker.broks]
+        assert len(expected) == count
+        self._main_broker.broks.clear()
+
+        pages = []
+        token = ''
+        while True:
+            res = interface._initial_broks(broker_name, page_size='5', token=token)
+            assert res['_status'] == u'OK'
+            pages.append(unserialize(res['broks'], True))
+            # The other broks are still raised during the stream
+            self._scheduler.add(Brok({'type': 'log', 'data': {'log': 'Page %d' % len(pages)}}))
+            token = res['token']
+            if not token:
+                break
+            assert not self._main_broker.initialized
+        assert all(len(page) <= 5 for page in pages)
+        assert [brok.type for page in pages for brok in page] == expected
+        assert pages[-1][-1].type == 'initial_broks_done'
+        assert self._main_broker.initialized
+        assert [brok.type for brok in self._main_broker.broks] == ['log'] * len(pages)
+
+        # An unexpected token or broker
+        res = interface._initial_broks(broker_name, page_size=5, token=token + 'x')
+        assert res['_status'] == u'ERR'
+        res = interface._initial_broks('unknown', page_size=5)
+        assert res['_status'] == u'ERR'
+        assert interface._initial_broks(broker_name, page_size='x')['_status'] == u'ERR'
+
+        # The broker gets a page of initial broks from its scheduler in each loop turn
+        def get_initial_broks(name, page_size=0, token=''):
+            """Get the initial broks from the scheduler interface"""
+            res = interface._initial_broks(name, page_size=page_size, token=token)
+            if 'broks' in res:
+                res['broks'] = unserialize(res['broks'], True)
+            return res
+
+        broker = self._broker_daemon
+        broker.initial_broks_page_size = 10
+        broker.external_broks.clear()
+        for scheduler_link in broker.schedulers.values():
+            scheduler_link.get_initial_broks = get_initial_broks
+        turns = 0
+        while not broker.got_initial_broks:
+            assert broker.get_initial_broks_pages()
+            turns += 1
+        assert turns == len(expected) // 10 + 1
+        assert [brok.type for brok in broker.external_broks] == expected
@@ -2496,4 +2496,85 @@ class TestBusinessCorrelator(AlignakTest):
         assert 1 == A.last_hard_state_id
 
         state = bp_rule.get_state(self._sched.hosts, self._sched.services)
-        assert 0 == state
\ No newline at end of file
+        assert 0 == state
+    def test_incremental_states(self):
+        """ BR - the scheduler business rules nodes states are cached and only the nodes
+        depending on a modified item are re-evaluated
+
+        bp_rule!(test_host_0,db1| (test_host_0,db2 & (test_host_0,lvs1|test_host_0,lvs2) ) )
+        & test_router_0
+        :return:
+        """
+        router = self._sched.hosts.find_by_name("test_router_0")
+        svc_db1 = self._sched.services.find_srv_by_name_and_hostname("test_host_0", "db1")
+        svc_db2 = self._sched.services.find_srv_by_name_and_hostname("test_host_0", "db2")
+        svc_lvs1 = self._sched.services.find_srv_by_name_and_hostname("test_host_0", "lvs1")
+        svc_cor = self._sched.services.find_srv_by_name_and_hostname("test_host_0", "Multi_levels")
+        bp_rule = svc_cor.business_rule
+        assert bp_rule.is_attached()
+        assert 0 == bp_rule.cached_state
+
+        # Each leaf node is registered in its item
+        or_node = bp_rule.sons[0]
+        and_node = or_node.sons[1]
+        db1_node = or_node.sons[0]
+        assert db1_node.item is svc_db1
+        assert db1_node in svc_db1._dependency_nodes
+        assert db1_node.parent is or_node
+        assert bp_rule.sons[1] in router._dependency_nodes
+
+        # Count the nodes states computations, the items are also in some other rules
+        tree = [bp_rule]
+        for node in tree:
+            if node.item is None:
+                tree.extend(node.sons)
+        computed = []
+        compute_state = DependencyNode.compute_state
+
+        def counting_compute_state(node, hosts, services):
+            if node in tree:
+                computed.append(node)
+            return compute_state(node, hosts, services)
+        DependencyNode.compute_state = counting_compute_state
+        try:
+            # db2 AND node is in an OR with db1: the root node is not re-evaluated
+            svc_db2.last_hard_state_id = 2
+            assert [and_node, or_node] == computed
+            assert 2 == and_node.cached_state
+            assert 0 == or_node.cached_state
+            assert 0 == bp_rule.get_state(self._sched.hosts, self._sched.services)
+
+            # db1 is now critical too: the whole path up to the root is re-evaluated
+            computed[:] = []
+            svc_db1.last_hard_state_id = 2
+            assert [or_node, bp_rule] == computed
+            assert 2 == bp_rule.get_state(self._sched.hosts, self._sched.services)
+
+            # An acknowledged problem is considered as OK
+            computed[:] = []
+            svc_db1.problem_has_been_acknowledged = True
+            assert 0 == bp_rule.get_state(self._sched.hosts, self._sched.services)
+
+            # lvs1 is in an OR with lvs2: the db2 AND node is not re-evaluated
+            computed[:] = []
+            svc_lvs1.last_hard_state_id = 1
+            assert [and_node.sons[1]] == computed
+
+            # Changing a node rule re-evaluates it
+            or_node.not_value = True
+            assert 2 == bp_rule.get_state(self._sched.hosts, self._sched.services)
+        finally:
+            DependencyNode.compute_state = compute_state
+
+        # The cached states are the computed ones
+        for node in [bp_rule, or_node, and_node]:
+            assert node.cached_state == node.compute_state(self._sched.hosts,
+                                                           self._sched.services)
+
+        # A detached rule is no more updated
+        bp_rule.detach()
+        assert not bp_rule.is_attached()
+        assert db1_node not in svc_db1._dependency_nodes
+        svc_db1.problem_has_been_acknowledged = False
+        assert or_node.cached_state is None
+        assert 0 == bp_rule.get_state(self._sched.hosts, self._sched.services)
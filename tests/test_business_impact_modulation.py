@@ -71,6 +71,8 @@ class TestBusinessImpactModulation(AlignakTest):
         assert bi_modulation.uuid in svc.business_impact_modulations
         # Service BI is defined as 2
         assert svc.business_impact == 2
+        # Only the modulated items business impact is periodically updated
+        assert self._scheduler.business_impact_modulated == [svc]
 
         # Default scheduler loop updates the BI every 60 loop turns
         # Update business impact on each scheduler tick
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the structured passive check results
+"""
+import time
+import cherrypy
+from .alignak_test import AlignakTest
+
+from alignak.external_command import ExternalCommandManager
+from alignak.http.scheduler_interface import SchedulerInterface
+from alignak.http.receiver_interface import ReceiverInterface
+
+
+class TestCheckResults(AlignakTest):
+    """This class tests the structured passive check results
+    """
+    def setUp(self):
+        super(TestCheckResults, self).setUp()
+        self.setup_with_file('cfg/cfg_external_commands.cfg', dispatching=True)
+        assert self.conf_is_correct
+
+    def test_scheduler_check_results(self):
+        """ The check results are processed as the passive check results commands
+
+        :return: None
+        """
+        host = self._scheduler.hosts.find_by_name('test_host_0')
+        host.event_handler_enabled = False
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                     "test_ok_0")
+        svc.event_handler_enabled = False
+        svc.act_depend_of = []
+
+        manager = self._scheduler.external_commands_manager
+        count = manager.process_check_results([
+            {'host': 'test_host_0', 'return_code': 0, 'output': 'Host is UP|rtt=9999;5;10',
+             'timestamp': int(time.time())},
+            {'host': 'test_host_0', 'service': 'test_ok_0', 'return_code': '1',
+             'output': 'Service is WARNING'},
+            # Badly formatted results
+            {'host': 'test_host_0', 'return_code': 'warning'},
+            {'service': 'test_ok_0', 'return_code': 1},
+        ])
+        assert count == 2
+        # The items are scheduled again
+        assert host in self._scheduler.scheduling_queue
+        self.external_command_loop()
+        assert 'UP' == host.state
+        assert 'Host is UP' == host.output
+        assert 'rtt=9999;5;10' == host.perf_data
+        assert 'WARNING' == svc.state
+        assert 'Service is WARNING' == svc.output
+
+        # Unknown items
+        self.clear_logs()
+        manager.accept_passive_unknown_check_results = False
+        assert manager.process_check_results([
+            {'host': 'test_host_0', 'service': 'unknown', 'return_code': 1}]) == 0
+        self.assert_any_log_match("A check result was received for the unknown service "
+                                  "'test_host_0/unknown'")
+
+        for broker_link in self._scheduler.my_daemon.brokers.values():
+            broker_link.broks.clear()
+        manager.accept_passive_unknown_check_results = True
+        manager.process_check_results([
+            {'host': 'unknown', 'return_code': 2, 'output': 'Down|rtt=1', 'timestamp': 1234}])
+        broks = [brok for brok in self._main_broker.broks
+                 if brok.type == 'unknown_host_check_result']
+        assert len(broks) == 1
+        assert broks[0].data == {'time_stamp': 1234, 'host_name': 'unknown', 'return_code': '2',
+                                 'output': 'Down', 'perf_data': 'rtt=1'}
+
+    def test_http_interfaces(self):
+        """ The check results are posted to the scheduler and receiver interfaces
+
+        :return: None
+        """
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                     "test_ok_0")
+        svc.act_depend_of = []
+        cherrypy.request.json = {'results': [
+            {'host': 'test_host_0', 'service': 'test_ok_0', 'return_code': 2, 'output': 'Bad'},
+            {'host': 'test_host_0', 'service': 'test_ok_0'}
+        ]}
+        res = SchedulerInterface(self._scheduler_daemon).check_results()
+        assert res['_status'] == u'OK'
+        assert res['accepted'] == 1
+        assert res['rejected'] == 1
+        self.external_command_loop()
+        assert 'Bad' == svc.output
+
+        # The receiver dispatches the results to the schedulers
+        receiver = self._receiver_daemon
+        receiver.external_commands_manager = ExternalCommandManager(None, 'receiver', receiver)
+        res = ReceiverInterface(receiver).check_results()
+        assert res['accepted'] == 1
+        assert len(receiver.unprocessed_check_results) == 1
+
+        scheduler_link = receiver.get_scheduler_from_hostname('test_host_0')
+        sent = []
+        scheduler_link.push_check_results = sent.extend
+        receiver.push_check_results_to_schedulers()
+        assert receiver.unprocessed_check_results == []
+        assert sent == [cherrypy.request.json['results'][0]]
+
+        cherrypy.request.json = {}
+        assert ReceiverInterface(receiver).check_results()['_status'] == u'ERR'
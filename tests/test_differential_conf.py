@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the differential configuration push on a configuration reload
+"""
+import time
+import requests_mock
+from .alignak_test import AlignakTest
+
+from alignak.dispatcher import Dispatcher
+from alignak.configdigest import ConfigurationDigest
+
+
+class TestDifferentialConf(AlignakTest):
+    """This class tests the differential configuration push
+    """
+    def setUp(self):
+        super(TestDifferentialConf, self).setUp()
+        self.setup_with_file('cfg/cfg_differential_conf.cfg', dispatching=True)
+        assert self.conf_is_correct
+
+    def reload_configuration(self, configuration_file):
+        """Load a configuration in a new arbiter and prepare its dispatch with the
+        digests of the current dispatcher, as the arbiter does when it reloads
+        its configuration
+
+        :return: the new dispatcher
+        """
+        digests = self._arbiter.dispatcher.digests
+        main_config_file = self._arbiter.conf.main_config_file
+        # The running scheduler is not restarted
+        scheduler_daemon, scheduler = self._scheduler_daemon, self._scheduler
+        self.setup_with_file(configuration_file)
+        assert self.conf_is_correct
+        self._scheduler_daemon, self._scheduler = scheduler_daemon, scheduler
+        # The arbiter reloads the same main configuration file
+        for conf in [self._arbiter.conf] + list(self._arbiter.conf.parts.values()):
+            conf.main_config_file = main_config_file
+        dispatcher = Dispatcher(self._arbiter.conf, self._arbiter.link_to_myself,
+                                digests=digests)
+        self._arbiter.dispatcher = dispatcher
+        dispatcher.prepare_dispatch()
+
+        with requests_mock.mock() as mockreq:
+            for link in dispatcher.all_daemons_links:
+                mockreq.get('http://%s:%s/identity' % (link.address, link.port),
+                            json={"start_time": 0, "running_id": 123456.123456})
+                mockreq.get('http://%s:%s/managed_configurations'
+                            % (link.address, link.port), json={})
+            dispatcher.check_reachable(test=True)
+        return dispatcher
+
+    def push_configuration(self, scheduler_daemon, configuration):
+        """Push a configuration to a scheduler daemon
+
+        :return: None
+        """
+        with requests_mock.mock() as mockreq:
+            for link in self._arbiter.dispatcher.all_daemons_links:
+                mockreq.get('http://%s:%s/identity' % (link.address, link.port),
+                            json={"start_time": 0, "running_id": 123456.123456})
+            scheduler_daemon.new_conf = configuration
+            scheduler_daemon.setup_new_conf()
+
+    def test_digest(self):
+        """ The configuration digests are the same for the same configuration
+
+        :return: None
+        """
+        cfg_part = list(self._arbiter.conf.parts.values())[0]
+        digest, s_conf_part = ConfigurationDigest.build(cfg_part)
+        assert digest.get_diff(None, s_conf_part) is None
+        assert 'services:test_host_0/test_ok_0' in digest.hashes['services']
+        assert 'hosts:template:generic-host' in digest.hashes['hosts']
+
+        former = self._arbiter.dispatcher.digests['scheduler-master']
+        self.setup_with_file('cfg/cfg_differential_conf.cfg')
+        cfg_part = list(self._arbiter.conf.parts.values())[0]
+        digest, s_conf_part = ConfigurationDigest.build(cfg_part, former)
+        assert digest.hashes == former.hashes
+        assert digest.uuids == former.uuids
+        diff = digest.get_diff(former, s_conf_part)
+        assert diff == {'base': former.push_flavor,
+                        'hosts': {'changed': {}, 'removed': []},
+                        'services': {'changed': {}, 'removed': []}}
+
+        # Some global parameters changed
+        former.global_hash = ''
+        assert digest.get_diff(former, s_conf_part) is None
+
+    def test_differential_push(self):
+        """ Only the configuration difference is pushed to the scheduler
+
+        :return: None
+        """
+        scheduler_daemon = self._scheduler_daemon
+        scheduler = self._scheduler
+        pushed_conf = scheduler.pushed_conf
+        host = scheduler.hosts.find_by_name("test_host_0")
+        host.checks_in_progress = []
+        host.act_depend_of = []
+        host.event_handler_enabled = False
+        svc_ok = scheduler.services.find_srv_by_name_and_hostname("test_host_0", "test_ok_0")
+        svc_ok.event_handler_enabled = False
+        svc_changed = scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                       "test_ok_changed")
+        svc_removed = scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                       "test_ok_removed")
+        for svc in (svc_ok, svc_changed, svc_removed):
+            svc.act_depend_of = []
+        self.scheduler_loop(2, [[host, 0, 'UP'], [svc_ok, 2, 'CRITICAL'],
+                                [svc_changed, 1, 'WARNING'], [svc_removed, 0, 'OK']])
+        assert 'HARD' == svc_ok.state_type
+        assert 'WARNING' == svc_changed.state
+        assert 'before the configuration reload' == svc_changed.notes
+        # An operator disables the service notifications
+        excmd = '[%d] DISABLE_SVC_NOTIFICATIONS;test_host_0;test_ok_changed' % time.time()
+        scheduler.run_external_commands([excmd])
+        self.external_command_loop()
+        assert not svc_changed.notifications_enabled
+        assert svc_changed.modified_attributes
+
+        dispatcher = self.reload_configuration('cfg/cfg_differential_conf_changed.cfg')
+        scheduler_link = list(dispatcher.schedulers)[0]
+        pushed = scheduler_link.unit_test_pushed_configuration
+        assert pushed['conf_part'] is None
+        assert pushed['push_flavor'] == scheduler_link.push_flavor
+        # The whole configuration will be pushed if needed
+        assert scheduler_link.cfg_diff is None
+        assert scheduler_link.cfg['conf_part'] is not None
+
+        conf_diff = pushed['conf_diff']
+        assert conf_diff['base'] == scheduler.push_flavor
+        assert list(conf_diff['hosts']['changed']) == [host.uuid]
+        assert conf_diff['hosts']['removed'] == []
+        assert svc_changed.uuid in conf_diff['services']['changed']
+        assert len(conf_diff['services']['changed']) == 2
+        assert conf_diff['services']['removed'] == [svc_removed.uuid]
+
+        # A broker is getting its initial broks
+        broker_name = list(scheduler_daemon.brokers.values())[0].name
+        _, token = scheduler.get_initial_broks_page(broker_name, 1)
+        assert token
+
+        self.push_configuration(scheduler_daemon, pushed)
+        assert scheduler.pushed_conf is pushed_conf
+        # The initial broks are to be streamed again, for the updated configuration
+        assert scheduler.initial_broks_streams == {}
+        assert scheduler.get_initial_broks_page(broker_name, 1, token) is None
+        assert not [link for link in scheduler_daemon.brokers.values() if link.initialized]
+        assert scheduler.push_flavor == scheduler_link.push_flavor
+        assert scheduler_daemon.get_managed_configurations()[scheduler_daemon.cur_conf[
+            'instance_id']]['push_flavor'] == scheduler_link.push_flavor
+
+        # The unchanged service is kept as is
+        assert scheduler.services[svc_ok.uuid] is svc_ok
+        assert 'CRITICAL' == svc_ok.state
+        # The changed items get the running state of their former version
+        new_host = scheduler.hosts[host.uuid]
+        assert new_host is not host
+        assert 'UP' == new_host.state
+        assert scheduler.find_item_by_id(host.uuid) is new_host
+        new_svc = scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                   "test_ok_changed")
+        assert new_svc.uuid == svc_changed.uuid
+        assert 'after the configuration reload' == new_svc.notes
+        assert 'WARNING' == new_svc.state
+        assert not new_svc.notifications_enabled
+        assert new_svc.modified_attributes == svc_changed.modified_attributes
+        assert new_svc in scheduler.scheduling_queue
+        # The removed service is no more scheduled
+        assert svc_removed.uuid not in scheduler.services
+        assert scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                "test_ok_removed") is None
+        assert svc_removed not in scheduler.scheduling_queue
+        added = scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                 "test_ok_added")
+        assert added.uuid in new_host.services
+        assert added in scheduler.scheduling_queue
+        assert len(scheduler.livesynthesis.keys) == \
+            len(scheduler.hosts) + len(scheduler.services)
+
+        added.act_depend_of = []
+        self.scheduler_loop(1, [[new_svc, 0, 'OK'], [added, 2, 'CRITICAL']])
+        assert 'OK' == new_svc.state
+        assert 'CRITICAL' == added.state
+
+        # A difference for another configuration is not applied
+        self.push_configuration(scheduler_daemon, pushed)
+        assert scheduler_daemon.cur_conf == {}
+        assert scheduler_daemon.get_managed_configurations() == {}
@@ -2948,3 +2948,40 @@ class TestExternalCommands(AlignakTest):
             ('warning', 'CHANGE_GLOBAL_SVC_EVENT_HANDLER: this command is not implemented!'),
         ])
         self.check_monitoring_events_log(expected_logs)
+
+    def test_dispatcher_batches(self):
+        """ The arbiter dispatches the external commands to their scheduler in batches
+
+        :return: None
+        """
+        ecm = self._arbiter.external_commands_manager
+        assert 'test_host_0' in ecm.hosts_parts
+        scheduler_link = ecm.hosts_parts['test_host_0'].scheduler_link
+
+        pushed = []
+
+        def push_external_commands(commands):
+            pushed.append(list(commands))
+            return True
+        scheduler_link.push_external_commands = push_external_commands
+
+        now = int(time.time())
+        for count in range(10):
+            self._arbiter.add(ExternalCommand(
+                '[%d] PROCESS_HOST_CHECK_RESULT;test_host_0;0;Host is UP %d' % (now, count)))
+        self._arbiter.add(ExternalCommand(
+            '[%d] PROCESS_HOST_CHECK_RESULT;unknown_host;0;Host is UP' % now))
+        self._arbiter.push_external_commands_to_schedulers()
+
+        # Only one request for all the commands of the scheduler
+        assert len(pushed) == 1
+        assert len(pushed[0]) == 10
+        assert scheduler_link.pushed_commands == []
+        assert self._arbiter.external_commands == []
+
+        # Not sent commands are kept for a next try
+        scheduler_link.push_external_commands = lambda commands: False
+        self._arbiter.add(ExternalCommand(
+            '[%d] PROCESS_HOST_CHECK_RESULT;test_host_0;0;Host is UP' % now))
+        self._arbiter.push_external_commands_to_schedulers()
+        assert len(scheduler_link.pushed_commands) == 1
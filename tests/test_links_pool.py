@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the satellite links communication pool
+"""
+import time
+import threading
+from .alignak_test import AlignakTest
+from alignak.linkspool import LinksPool
+from alignak.objects.schedulerlink import SchedulerLink
+from alignak.objects.satellitelink import LinkError
+
+
+class TestLinksPool(AlignakTest):
+    """This class tests the links communication pool
+    """
+    def setUp(self):
+        super(TestLinksPool, self).setUp()
+        self.fast = SchedulerLink({'name': 'fast'})
+        self.slow = SchedulerLink({'name': 'slow'})
+        self.release = threading.Event()
+
+    def request(self, link):
+        """A request that is slow for the slow link"""
+        if link is self.slow:
+            self.release.wait(5)
+        return ['action for %s' % link.name]
+
+    def test_concurrent_requests(self):
+        """ A slow link does not delay the other links
+
+        :return: None
+        """
+        pool = LinksPool(2)
+        assert pool.submit('get', self.slow, self.request, self.slow)
+        assert pool.submit('get', self.fast, self.request, self.fast)
+        assert len(pool) == 2
+
+        _t0 = time.time()
+        results = pool.get_results(0.5)
+        assert time.time() - _t0 >= 0.5
+        assert [(kind, link, result, error) for kind, link, result, error, _ in results] == \
+            [('get', self.fast, ['action for fast'], None)]
+
+        # Only one request of each kind in flight for a link
+        assert not pool.submit('get', self.slow, self.request, self.slow)
+        assert pool.submit('push', self.slow, self.request, self.fast)
+        assert len(pool) == 2
+
+        self.release.set()
+        results = pool.get_results(2)
+        assert len(pool) == 0
+        assert sorted([(kind, link.name) for kind, link, _, _, _ in results]) == \
+            [('get', 'slow'), ('push', 'slow')]
+        pool.stop()
+        assert pool.threads == []
+
+    def test_request_error(self):
+        """ A request exception is got back with the result
+
+        :return: None
+        """
+        def failing_request():
+            raise LinkError("Not reachable")
+
+        pool = LinksPool(1)
+        assert pool.submit('get', self.fast, failing_request)
+        results = pool.get_results(2)
+        assert len(results) == 1
+        assert results[0][2] is None
+        assert isinstance(results[0][3], LinkError)
+        pool.stop()
+
+    def test_request_exit(self):
+        """ A request exiting the thread is got back with the result and the thread
+        still executes the next requests
+
+        :return: None
+        """
+        def exiting_request():
+            raise SystemExit("Bail out")
+
+        pool = LinksPool(1)
+        assert pool.submit('push', self.fast, exiting_request)
+        results = pool.get_results(2)
+        assert len(pool) == 0
+        assert len(results) == 1
+        assert isinstance(results[0][3], SystemExit)
+
+        assert pool.submit('push', self.fast, self.request, self.fast)
+        results = pool.get_results(2)
+        assert [result for _, _, result, _, _ in results] == [['action for fast']]
+        pool.stop()
+
+    def test_deferred_communication_errors(self):
+        """ The communication errors of a request executed by a pool thread do not change
+        the link state, the main thread manages them
+
+        :return: None
+        """
+        self.fast.con = True
+        self.fast.running_id = 1
+        self.fast.alive = True
+        self.fast.reachable = False
+
+        pool = LinksPool(1)
+        assert pool.submit('push', self.fast, self.fast.push_results, [], 'me',
+                           defer_errors=True)
+        results = pool.get_results(2)
+        assert isinstance(results[0][3], LinkError)
+        assert self.fast.attempt == 0
+
+        assert self.fast.communication_failed('push_results', results[0][3]) is False
+        assert self.fast.attempt == 1
+        pool.stop()
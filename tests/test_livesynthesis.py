@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the scheduler live synthesis counters
+"""
+import time
+from .alignak_test import AlignakTest
+from alignak.macroresolver import MacroResolver
+
+
+class TestLiveSynthesis(AlignakTest):
+    """This class tests the live synthesis counters
+    """
+    def setUp(self):
+        super(TestLiveSynthesis, self).setUp()
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+
+    def get_livesynthesis(self, scan=False):
+        """Get the scheduler live synthesis, from the counters or by scanning the items"""
+        m_solver = MacroResolver()
+        synthesis = m_solver.livesynthesis
+        if scan:
+            m_solver.livesynthesis = None
+        try:
+            return self._scheduler.get_scheduler_stats()['livesynthesis']
+        finally:
+            m_solver.livesynthesis = synthesis
+
+    def test_counters(self):
+        """ The counters are the same as the ones got by scanning all the items
+
+        :return: None
+        """
+        assert MacroResolver().get_livesynthesis() is self._scheduler.livesynthesis
+        livesynthesis = self.get_livesynthesis()
+        assert livesynthesis == self.get_livesynthesis(scan=True)
+        assert livesynthesis['hosts_total'] == len(self._scheduler.hosts)
+        assert livesynthesis['hosts_down_hard'] == 0
+
+        router = self._scheduler.hosts.find_by_name("test_router_0")
+        router.checks_in_progress = []
+        router.event_handler_enabled = False
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        host.checks_in_progress = []
+        host.act_depend_of = []  # ignore the router
+        host.event_handler_enabled = False
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                     "test_ok_0")
+        svc.checks_in_progress = []
+        svc.act_depend_of = []  # no hostchecks on critical checkresults
+        svc.event_handler_enabled = False
+
+        self.scheduler_loop(3, [[router, 0, 'UP'], [host, 2, 'DOWN'], [svc, 2, 'CRITICAL']])
+        time.sleep(0.1)
+        livesynthesis = self.get_livesynthesis()
+        assert livesynthesis == self.get_livesynthesis(scan=True)
+        assert livesynthesis['hosts_down_hard'] == 1
+        assert livesynthesis['hosts_problems'] == 1
+
+        # Acknowledge, downtime and disable the checks
+        now = int(time.time())
+        for command in ['ACKNOWLEDGE_HOST_PROBLEM;test_host_0;2;1;1;admin;Ack',
+                        'SCHEDULE_HOST_DOWNTIME;test_host_0;%d;%d;1;;3600;admin;Down'
+                        % (now, now + 3600),
+                        'DISABLE_SVC_CHECK;test_host_0;test_ok_0',
+                        'DISABLE_PASSIVE_SVC_CHECKS;test_host_0;test_ok_0']:
+            self._scheduler.run_external_commands(['[%d] %s' % (now, command)])
+        self.external_command_loop()
+        livesynthesis = self.get_livesynthesis()
+        assert livesynthesis == self.get_livesynthesis(scan=True)
+        assert livesynthesis['hosts_acknowledged'] == 1
+        assert livesynthesis['hosts_problems'] == 0
+        assert livesynthesis['hosts_in_downtime'] == 1
+        assert livesynthesis['services_not_monitored'] == 1
+
+        # Attributes that are directly changed are also accounted
+        host.is_flapping = True
+        svc.state = u'WARNING'
+        livesynthesis = self.get_livesynthesis()
+        assert livesynthesis == self.get_livesynthesis(scan=True)
+        assert livesynthesis['hosts_flapping'] == 1
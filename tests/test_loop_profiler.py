@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the scheduler loop profiler
+"""
+import os
+import pstats
+import tempfile
+from .alignak_test import AlignakTest
+
+from alignak.loopprofiler import RollingHistogram, LoopProfiler, get_bucket, get_bucket_value
+from alignak.http.scheduler_interface import SchedulerInterface
+
+
+class TestLoopProfiler(AlignakTest):
+    """This class tests the scheduler loop profiler
+    """
+    def setUp(self):
+        super(TestLoopProfiler, self).setUp()
+
+    def test_histogram(self):
+        """ The histogram percentiles are accurate and only account for the last periods
+
+        :return: None
+        """
+        for value in (0, 1, 31, 32, 33, 1000, 123456789):
+            bucket = get_bucket(value)
+            assert value <= get_bucket_value(bucket)
+            assert get_bucket_value(bucket) - value <= value / 32.0
+
+        histogram = RollingHistogram(window=10, windows=3)
+        for value in range(1, 1001):
+            histogram.record(value, now=100)
+        stats = histogram.get_stats(now=100)
+        assert stats['count'] == 1000
+        assert stats['mean'] == 500.5
+        assert stats['max'] == 1000
+        for percentile in (50, 95, 99):
+            expected = percentile * 10
+            assert expected <= stats['p%d' % percentile] <= expected * 1.04
+
+        # Another period
+        histogram.record(5000, now=115)
+        stats = histogram.get_stats(now=115)
+        assert stats['count'] == 1001
+        assert stats['max'] == 5000
+        # The first period is out of the histogram windows
+        stats = histogram.get_stats(now=135)
+        assert stats['count'] == 1
+        assert stats['p50'] == 5000
+        stats = histogram.get_stats(now=200)
+        assert stats == {'count': 0, 'mean': 0, 'max': 0, 'p50': 0, 'p95': 0, 'p99': 0}
+
+    def test_profiler(self):
+        """ The profiler records the works durations and processed items
+
+        :return: None
+        """
+        profiler = LoopProfiler()
+        profiler.loop_started()
+        profiler.start('counted')
+        profiler.add_items(3)
+        profiler.start('nested')
+        profiler.stop(0.1)
+        profiler.add_items(2)
+        profiler.stop(0.25)
+        profiler.record('loop', 1)
+        profiler.loop_ended()
+
+        stats = profiler.get_stats()
+        assert stats['loops'] == 1
+        assert stats['window'] == 300
+        assert stats['capture'] is None
+        assert sorted(stats['profile']) == ['counted', 'loop', 'nested']
+        assert stats['profile']['counted']['count'] == 1
+        assert 0.25 <= stats['profile']['counted']['p99'] <= 0.26
+        assert stats['profile']['counted']['items']['max'] == 5
+        # The works that do not count their items
+        assert 'items' not in stats['profile']['nested']
+        assert stats['profile']['loop']['max'] == 1
+
+    def test_capture(self):
+        """ A Python profile of the requested number of loops is written
+
+        :return: None
+        """
+        filename = os.path.join(tempfile.mkdtemp(), 'profile.prof')
+        profiler = LoopProfiler()
+        assert profiler.request_capture(2, filename) == {'loops': 2, 'file': filename, 'done': 0}
+        # Only one capture at once
+        profiler.request_capture(5, 'other.prof')
+        assert profiler.get_stats()['capture']['loops'] == 2
+
+        for _ in range(2):
+            assert not os.path.exists(filename)
+            profiler.loop_started()
+            sorted(range(1000), key=lambda x: -x)
+            assert profiler.get_stats()['capture']['file'] == filename
+            profiler.loop_ended()
+
+        assert profiler.get_stats()['capture'] is None
+        assert pstats.Stats(filename).total_calls > 0
+
+    def test_scheduler_profile(self):
+        """ The scheduler loop works are profiled and served by the HTTP interface
+
+        :return: None
+        """
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+        self._scheduler.before_run()
+        for _ in range(3):
+            self._scheduler.run()
+
+        interface = SchedulerInterface(self._scheduler_daemon)
+        stats = interface.profile()
+        assert stats['name'] == self._scheduler_daemon.name
+        assert stats['loops'] == 3
+        assert stats['profile']['loop']['count'] == 3
+        assert stats['profile']['recurrent.schedule']['items']['count'] >= 1
+        assert stats['profile']['recurrent.consume_results']['count'] >= 1
+        assert 'push_actions_to_passive_satellites' in stats['profile']
+        assert 'hook.scheduler_tick' in stats['profile']
+
+        self._scheduler_daemon.workdir = tempfile.mkdtemp()
+        stats = interface.profile(capture='1')
+        assert stats['capture']['loops'] == 1
+        self._scheduler.run()
+        assert os.listdir(self._scheduler_daemon.workdir)[0].endswith('.prof')
+
+        # The captured loops count is limited
+        stats = interface.profile(capture='100000')
+        assert stats['capture']['loops'] == 100
+
+        assert interface.profile(capture='x')['_status'] == u'ERR'
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the scheduler hosts and services compact representation
+"""
+import json
+import pickle
+from .alignak_test import AlignakTest
+
+from alignak.alignakobject import compact_value
+from alignak.misc.serialization import serialize, unserialize
+from alignak.objects.host import Host
+from alignak.objects.service import Service
+
+
+class TestMemoryCompact(AlignakTest):
+    """This class tests the scheduler hosts and services compact representation
+    """
+    def setUp(self):
+        super(TestMemoryCompact, self).setUp()
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+
+    def test_slots(self):
+        """ The hosts and services properties are stored in slots
+
+        :return: None
+        """
+        for cls in (Host, Service):
+            assert 'state_type_id' in cls.__slots__
+            assert 'check_command' in cls.__slots__
+            # Not the live synthesis attributes
+            assert 'state' not in cls.__slots__
+        assert 'service_includes' not in Host.__slots__
+
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        assert 'state_type_id' not in host.__dict__
+        assert 'state' in host.__dict__
+        # The class level default value is still available
+        assert host.service_includes == []
+
+        # Un-serialized objects are the same
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                     "test_ok_0")
+        copied = unserialize(json.loads(json.dumps(serialize(svc))), no_json=True)
+        assert isinstance(copied, Service)
+        assert copied.state_type_id == svc.state_type_id
+        assert copied.check_command.command_line == svc.check_command.command_line
+
+    def test_slots_arbiter(self):
+        """ The slots also apply to the arbiter hosts and services, they are parsed,
+        serialized and pickled as before
+
+        :return: None
+        """
+        assert self.conf_is_correct
+        host = self._arbiter.conf.hosts.find_by_name("test_host_0")
+        svc = self._arbiter.conf.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                        "test_ok_0")
+        assert host.host_name == 'test_host_0'
+        assert 'host_name' not in host.__dict__
+        assert svc.uuid in host.services
+
+        def as_json(item):
+            """The json dump of an item, the tuples are dumped as lists"""
+            return json.dumps(item.serialize(), sort_keys=True)
+
+        for item in (host, svc):
+            copied = unserialize(json.loads(json.dumps(serialize(item))), no_json=True)
+            assert as_json(copied) == as_json(item)
+            copied = pickle.loads(pickle.dumps(item, pickle.HIGHEST_PROTOCOL))
+            assert as_json(copied) == as_json(item)
+
+        # The whole configuration part that is pushed to a scheduler
+        cfg_part = list(self._arbiter.conf.parts.values())[0]
+        copied = pickle.loads(pickle.dumps(cfg_part, pickle.HIGHEST_PROTOCOL))
+        assert copied.hosts[host.uuid].host_name == 'test_host_0'
+        copied = unserialize(serialize(cfg_part), no_json=True)
+        assert as_json(copied.services[svc.uuid]) == as_json(cfg_part.services[svc.uuid])
+
+    def test_compact_value(self):
+        """ The equal strings and tuples are shared, the containers are compacted in place
+
+        :return: None
+        """
+        cache = {}
+        first = u''.join([u'test_', u'host'])
+        second = u''.join([u'test_', u'host'])
+        assert first is not second
+        assert compact_value(first, cache) is first
+        assert compact_value(second, cache) is first
+
+        names = [u''.join([u'test_', u'host']), 1]
+        assert compact_value(names, cache) is names
+        assert names[0] is first
+
+        customs = {u''.join([u'_HOST', u'NAME']): u''.join([u'test_', u'host'])}
+        assert compact_value(customs, cache) is customs
+        assert customs == {u'_HOSTNAME': u'test_host'}
+        assert customs[u'_HOSTNAME'] is first
+
+        couple = (u''.join([u'a', u'b']), u'c')
+        assert compact_value(couple, cache) is couple
+        assert compact_value((u''.join([u'a', u'b']), u'c'), cache) is couple
+        # Only the tuples of strings are shared, (1, ) == (True, )
+        assert compact_value((True, ), cache) == (True, )
+        assert compact_value((1, ), cache)[0] is not True
+
+    def test_compact_items(self):
+        """ The scheduler hosts and services share their equal values
+
+        :return: None
+        """
+        svc1 = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                      "test_ok_0")
+        # A copy of the service, as un-serialized from the arbiter configuration
+        svc2 = unserialize(json.loads(json.dumps(serialize(svc1))), no_json=True)
+        svc2.uuid = u'compacted'
+        self._scheduler.services.items[svc2.uuid] = svc2
+        before = svc1.serialize()
+
+        assert svc1.host_name is not svc2.host_name
+        assert svc1.check_command.command is not svc2.check_command.command
+        self._scheduler.compact_items()
+
+        assert svc1.host_name is svc2.host_name
+        assert svc1.check_command.command_line is svc2.check_command.command_line
+        # The command calls share the scheduler command
+        command = self._scheduler.commands[svc1.check_command.command.uuid]
+        assert svc1.check_command.command is command
+        assert svc2.check_command.command is command
+
+        # The values did not change
+        assert svc1.serialize() == before
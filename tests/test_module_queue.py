@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the pipe transport of the external modules queues
+"""
+import os
+import pickle
+import threading
+from multiprocessing import Process
+from queue import Empty, Full
+import pytest
+from .alignak_test import AlignakTest
+from alignak.basemodule import BaseModule
+from alignak.brok import Brok
+from alignak.modulequeue import PipeQueue
+from alignak.objects.module import Module
+
+
+def echo(to_q, from_q):
+    """Module process main function: send back the got broks count"""
+    while True:
+        broks = to_q.get(timeout=5)
+        if broks is None:
+            return
+        from_q.put(len(broks))
+
+
+class TestModuleQueue(AlignakTest):
+    """This class tests the pipe transport of the external modules queues
+    """
+    def setUp(self):
+        super(TestModuleQueue, self).setUp()
+
+    def test_pipe_queue(self):
+        """ Objects are got in the order they are put, by another process
+
+        :return: None
+        """
+        to_q = PipeQueue()
+        from_q = PipeQueue()
+        proc = Process(target=echo, args=(to_q, from_q))
+        proc.start()
+
+        broks = [Brok({'type': 'log', 'data': {'log': 'Brok %d' % idx}}) for idx in range(10)]
+        for count in range(1, 11):
+            assert to_q.put(broks[:count])
+        assert to_q.get_stats()['high_water_mark'] >= 1
+        assert [from_q.get(timeout=5) for _ in range(10)] == list(range(1, 11))
+        with pytest.raises(Empty):
+            from_q.get_nowait()
+        assert to_q.qsize() == 0
+        assert from_q.qsize() == 0
+
+        to_q.put(None)
+        proc.join(5)
+        assert proc.exitcode == 0
+        for queue in (to_q, from_q):
+            queue.close()
+            queue.join_thread()
+
+    def test_drop_policies(self):
+        """ When the queue is full, the objects are dropped according to the policy
+
+        :return: None
+        """
+        queue = PipeQueue(maxsize=2, policy='drop-new')
+        assert queue.put('first')
+        assert queue.put('second')
+        assert not queue.put('third')
+        assert queue.get_stats() == {'size': 2, 'high_water_mark': 2, 'dropped': 1}
+        assert queue.get(timeout=1) == 'first'
+        assert queue.put('fourth')
+        assert [queue.get(timeout=1) for _ in range(2)] == ['second', 'fourth']
+
+        queue = PipeQueue(maxsize=2, policy='block', put_timeout=0.1)
+        queue.put('first')
+        queue.put('second')
+        with pytest.raises(Full):
+            queue.put('third')
+        assert queue.qsize() == 2
+        assert queue.get(timeout=1) == 'first'
+        queue.put('third')
+        assert [queue.get(timeout=1) for _ in range(2)] == ['second', 'third']
+
+        # Only the frames not yet written to the pipe may be dropped
+        queue = PipeQueue(maxsize=2, policy='drop-old')
+        # No feeder is writing the frames
+        queue.feeder_pid = os.getpid()
+        queue.feeder = threading.current_thread()
+        queue.put('first')
+        queue.put('second')
+        assert queue.put('third')
+        assert queue.get_stats() == {'size': 2, 'high_water_mark': 2, 'dropped': 1}
+        assert [pickle.loads(frame) for frame in queue.frames] == ['second', 'third']
+
+    def test_module_transport(self):
+        """ The module configuration selects the queues transport
+
+        :return: None
+        """
+        mod = Module({'name': 'piped-module', 'type': 'test', 'queue_transport': 'pipe',
+                      'queue_max_size': '100', 'queue_drop_policy': 'drop-old'})
+        mod.properties = {'daemons': ['broker'], 'type': 'test', 'external': True}
+        module = BaseModule(mod)
+        module.create_queues(None)
+        assert isinstance(module.to_q, PipeQueue)
+        assert isinstance(module.from_q, PipeQueue)
+        assert module.to_q.maxsize == 100
+        assert module.to_q.policy == 'drop-old'
+        module.clear_queues(None)
+        assert module.to_q is None
+
+        mod = Module({'name': 'default-module', 'type': 'test'})
+        mod.properties = {'daemons': ['broker'], 'type': 'test', 'external': True}
+        module = BaseModule(mod)
+        module.create_queues(None)
+        assert not isinstance(module.to_q, PipeQueue)
+        module.clear_queues(None)
@@ -375,3 +375,103 @@ class TestRetention(AlignakTest):
         # Former it was a set, now it is a list!
         # assert set([self._scheduler.contacts.find_by_name("test_contact").uuid]) == \
         #        hostn.notified_contacts_ids
+
+    def test_scheduler_retention_incremental(self):
+        """ Test the incremental retention save: only the changed hosts are saved
+
+        :return: None
+        """
+        self.setup_with_file('cfg/cfg_default_retention.cfg',
+                             dispatching=True)
+        module = [m for m in self._scheduler_daemon.modules_manager.instances
+                  if m.name == 'inner-retention'][0]
+        module.incremental_save = True
+
+        router = self._scheduler.hosts.find_by_name("test_router_0")
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        host.checks_in_progress = []
+        host.act_depend_of = []  # ignore the router
+        host.event_handler_enabled = False
+
+        # All the hosts are to be saved after a configuration load
+        assert self._scheduler.retention_dirty == set(self._scheduler.hosts.items)
+        host_file = '/tmp/alignak/retention/test_host_0.json'
+        router_file = '/tmp/alignak/retention/test_router_0.json'
+        for file_name in [host_file, router_file]:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+        assert module.hook_save_retention(self._scheduler)
+        module.wait_for_writer()
+        assert self._scheduler.retention_dirty == set()
+        assert os.path.exists(host_file)
+        assert os.path.exists(router_file)
+        assert not os.path.exists(host_file + '.tmp')
+
+        # Nothing changed, nothing is written
+        os.remove(router_file)
+        self._scheduler.set_retention_dirty([router])
+        assert module.hook_save_retention(self._scheduler)
+        module.wait_for_writer()
+        assert not os.path.exists(router_file)
+
+        # Only the changed host is written, the router is not scheduled meanwhile
+        os.remove(host_file)
+        self._scheduler.scheduling_queue.remove(router)
+        router.checks_in_progress = []
+        router.update_in_checking()
+        router.broks = []
+        self.scheduler_loop(1, [[host, 2, 'DOWN!']])
+        assert host.uuid in self._scheduler.retention_dirty
+        assert router.uuid not in self._scheduler.retention_dirty
+        assert module.hook_save_retention(self._scheduler)
+        module.wait_for_writer()
+        assert not os.path.exists(router_file)
+        with open(host_file, "r") as fd:
+            retention_check = json.load(fd)
+        assert retention_check['name'] == 'test_host_0'
+        assert retention_check['state'] == 'DOWN'
+
+        # An expired acknowledgement changes the host retention data
+        excmd = '[%d] ACKNOWLEDGE_HOST_PROBLEM_EXPIRE;test_host_0;1;1;1;%d;me;Ack' \
+                % (time.time(), time.time() + 1)
+        self._scheduler.run_external_commands([excmd])
+        self.external_command_loop()
+        assert host.problem_has_been_acknowledged
+        self._scheduler.get_retention_dirty_hosts()
+        time.sleep(1.1)
+        self._scheduler.check_for_expire_acknowledge()
+        assert not host.problem_has_been_acknowledged
+        assert self._scheduler.retention_dirty == set([host.uuid])
+
+    def test_scheduler_retention_incremental_file(self):
+        """ Test the incremental retention save in a unique retention file
+
+        :return: None
+        """
+        self.setup_with_file('cfg/cfg_default_retention.cfg',
+                             dispatching=True)
+        module = [m for m in self._scheduler_daemon.modules_manager.instances
+                  if m.name == 'inner-retention'][0]
+        module.incremental_save = True
+        module.retention_file = '/tmp/alignak/retention/test-incremental.json'
+        if os.path.exists(module.retention_file):
+            os.remove(module.retention_file)
+
+        router = self._scheduler.hosts.find_by_name("test_router_0")
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        assert module.hook_save_retention(self._scheduler)
+        module.wait_for_writer()
+        with open(module.retention_file, "r") as fd:
+            retention_check = json.load(fd)
+        assert sorted(retention_check) == ['test_host_0', 'test_router_0']
+
+        # The unique file still contains the unchanged hosts
+        host.state = 'DOWN'
+        self._scheduler.set_retention_dirty([host])
+        assert module.hook_save_retention(self._scheduler)
+        module.wait_for_writer()
+        with open(module.retention_file, "r") as fd:
+            retention_check = json.load(fd)
+        assert sorted(retention_check) == ['test_host_0', 'test_router_0']
+        assert retention_check['test_host_0']['state'] == 'DOWN'
+        assert retention_check['test_router_0']['name'] == router.host_name
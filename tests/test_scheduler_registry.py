@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the scheduler items lookup by uuid
+"""
+from .alignak_test import AlignakTest
+
+
+class TestSchedulerRegistry(AlignakTest):
+    """This class tests the scheduler items lookup by uuid
+    """
+    def setUp(self):
+        super(TestSchedulerRegistry, self).setUp()
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+
+    def test_find_item_by_id(self):
+        """ All the scheduler objects are found by their uuid
+
+        :return: None
+        """
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                     "test_ok_0")
+        contact = self._scheduler.contacts.find_by_name("test_contact")
+        hostgroup = self._scheduler.hostgroups.find_by_name("hostgroup_01")
+        for item in [host, svc, contact, hostgroup]:
+            assert self._scheduler.find_item_by_id(item.uuid) is item
+            # An item is its own item
+            assert self._scheduler.find_item_by_id(item) is item
+        assert self._scheduler.find_item_by_id('unknown') is None
+        assert self._scheduler.find_item_by_id(None) is None
+
+        # Checks and actions are found as soon as they are added
+        self._scheduler.schedule()
+        check = self._scheduler.checks[host.checks_in_progress[0]]
+        assert self._scheduler.find_item_by_id(check.uuid) is check
+        del self._scheduler.checks[check.uuid]
+        assert self._scheduler.find_item_by_id(check.uuid) is None
+
+    def test_typed_getters(self):
+        """ The typed getters only find the objects of their type
+
+        :return: None
+        """
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                     "test_ok_0")
+        assert self._scheduler.get_host(host.uuid) is host
+        assert self._scheduler.get_host(svc.uuid) is None
+        assert self._scheduler.get_host(None) is None
+        assert self._scheduler.get_service(svc.uuid) is svc
+        assert self._scheduler.get_service(host.uuid) is None
+
+        self._scheduler.schedule()
+        check = self._scheduler.checks[host.checks_in_progress[0]]
+        assert self._scheduler.get_check(check.uuid) is check
+        assert self._scheduler.get_check(host.uuid) is None
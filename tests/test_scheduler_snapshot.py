@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the scheduler snapshot used by the scheduler HTTP interface
+"""
+import threading
+from .alignak_test import AlignakTest
+
+from alignak.http.scheduler_interface import SchedulerInterface
+from alignak.snapshot import SchedulerSnapshot
+
+
+class TestSchedulerSnapshot(AlignakTest):
+    """This class tests the scheduler snapshot
+    """
+    def setUp(self):
+        super(TestSchedulerSnapshot, self).setUp()
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+        assert self.conf_is_correct
+
+        self.host = self._scheduler.hosts.find_by_name("test_host_0")
+        self.host.checks_in_progress = []
+        self.host.act_depend_of = []  # ignore the router
+        self.host.event_handler_enabled = False
+        self.svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                          "test_ok_0")
+        self.svc.checks_in_progress = []
+        self.svc.act_depend_of = []
+        self.svc.event_handler_enabled = False
+
+    def get_object_published(self, interface, o_type, o_name):
+        """Get an object while the scheduler publishes a new snapshot"""
+        publisher = threading.Timer(0.1, self._scheduler.publish_snapshot)
+        publisher.start()
+        response = interface.object(o_type, o_name)
+        publisher.join()
+        return response
+
+    def test_dump(self):
+        """ The dump is the same from the live objects and from the snapshot
+
+        :return: None
+        """
+        interface = SchedulerInterface(self._scheduler_daemon)
+        assert self._scheduler.snapshot is None
+        live = {}
+        for args in [(None, False, False), (None, True, False), (None, False, True),
+                     ('test_host_0', False, False), (self.host.uuid, False, True)]:
+            live[args] = interface.dump(*args)
+        assert 'test_host_0' in [host['name'] for host in live[(None, False, False)]]
+        assert interface.dump('unknown')['_status'] == u'ERR'
+
+        self._scheduler.publish_snapshot()
+        snapshot = self._scheduler.snapshot
+        assert snapshot.version == 1
+        for args, expected in live.items():
+            assert interface.dump(*args) == expected
+        assert interface.dump('unknown')['_status'] == u'ERR'
+
+        # The responses are cached with the snapshot
+        assert interface.dump() is interface.dump()
+        assert interface.monitoring_problems()['problems'] == snapshot.problems['problems']
+
+        # A requested object is copied in the next published snapshot
+        host = self.get_object_published(interface, 'host', 'test_host_0')
+        assert self._scheduler.snapshot.version == 2
+        assert host['content']['host_name'] == 'test_host_0'
+        assert interface.object('host', 'test_host_0') is host
+
+    def test_lazy_snapshot(self):
+        """ The snapshot is only built when some queries requested it
+
+        :return: None
+        """
+        interface = SchedulerInterface(self._scheduler_daemon)
+        self._scheduler.publish_snapshot()
+        assert self._scheduler.snapshot is None
+
+        # Not yet published, the query gets the live information and requests a snapshot
+        interface.monitoring_problems()
+        self._scheduler.publish_snapshot()
+        assert self._scheduler.snapshot.version == 1
+
+        # No more queries
+        self._scheduler.publish_snapshot()
+        assert self._scheduler.snapshot.version == 1
+
+        # The snapshot is not rebuilt before its maximum age...
+        interface.dump()
+        self._scheduler.publish_snapshot()
+        assert self._scheduler.snapshot.version == 1
+
+        # ... except when an object it does not hold is requested
+        response = self.get_object_published(interface, 'host', 'unknown')
+        assert self._scheduler.snapshot.version == 2
+        assert response['_status'] == u'ERR'
+        assert interface.object('host', 'unknown')['_status'] == u'ERR'
+        self._scheduler.publish_snapshot()
+        assert self._scheduler.snapshot.version == 2
+
+        # The snapshot is rebuilt once too old
+        self._scheduler.snapshot.timestamp -= SchedulerSnapshot.max_age
+        self._scheduler.publish_snapshot()
+        assert self._scheduler.snapshot.version == 3
+
+    def test_snapshot_is_read_only(self):
+        """ The snapshot is not updated with the live objects
+
+        :return: None
+        """
+        interface = SchedulerInterface(self._scheduler_daemon)
+        self.scheduler_loop(1, [[self.host, 0, 'UP'], [self.svc, 0, 'OK']])
+        # A query requests the snapshot
+        interface.dump('test_host_0')
+        self._scheduler.publish_snapshot()
+        host = interface.dump('test_host_0')[0]
+        assert host['state'] == 'UP'
+        assert host['services'][0]['output'] == 'OK'
+
+        self.scheduler_loop(3, [[self.host, 2, 'DOWN'], [self.svc, 2, 'CRITICAL']])
+        assert self.host.state == 'DOWN'
+        host = interface.dump('test_host_0')[0]
+        assert host['state'] == 'UP'
+        problems = interface.monitoring_problems()['problems']
+        assert not [p for p in problems.values() if p['host'] == 'test_host_0']
+
+        # A new snapshot is published once the snapshot is too old
+        self._scheduler.snapshot.timestamp -= SchedulerSnapshot.max_age
+        self._scheduler.publish_snapshot()
+        assert self._scheduler.snapshot.version == 2
+        host = interface.dump('test_host_0')[0]
+        assert host['state'] == 'DOWN'
+        assert host['services'][0]['output'] == 'CRITICAL'
+        problems = interface.monitoring_problems()['problems']
+        assert [p for p in problems.values() if p['host'] == 'test_host_0']
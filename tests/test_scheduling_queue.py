@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the scheduler hosts and services scheduling queue
+"""
+import time
+from .alignak_test import AlignakTest
+from alignak.schedulingqueue import SchedulingQueue
+
+
+class TestSchedulingQueue(AlignakTest):
+    """This class tests the hosts and services scheduling queue
+    """
+    def setUp(self):
+        super(TestSchedulingQueue, self).setUp()
+
+    def test_pop_due(self):
+        """ Only the due items are popped, ordered by due time
+
+        :return: None
+        """
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        router = self._scheduler.hosts.find_by_name("test_router_0")
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                     "test_ok_0")
+        now = time.time()
+        queue = SchedulingQueue()
+        queue.push(host, now + 10)
+        queue.push(router, now - 10)
+        queue.push(svc)
+        assert len(queue) == 3
+        assert host in queue
+
+        assert queue.pop_due(now) == [svc, router]
+        assert queue.pop_due(now) == []
+        assert len(queue) == 1
+
+        # Pushed again, the former entry is not valid anymore
+        queue.push(host, now - 1)
+        queue.push(host, now + 60)
+        assert queue.pop_due(now) == []
+        assert queue.pop_due(now + 60) == [host]
+
+        # A removed item is not popped
+        queue.push(host, now)
+        queue.remove(host)
+        assert host not in queue
+        assert queue.pop_due(now) == []
+
+    def test_scheduler_schedule(self):
+        """ The scheduler only visits the due items
+
+        :return: None
+        """
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        host.checks_in_progress = []
+        host.act_depend_of = []  # ignore the router
+        host.event_handler_enabled = False
+
+        # All the items are to be scheduled
+        assert len(self._scheduler.scheduling_queue) == \
+            len(self._scheduler.hosts) + len(self._scheduler.services)
+        self._scheduler.schedule()
+        assert len(self._scheduler.scheduling_queue) == 0
+        assert host.in_checking
+        assert len(host.checks_in_progress) == 1
+
+        # Nothing to schedule until a check result is consumed
+        self._scheduler.schedule()
+        assert len(host.checks_in_progress) == 1
+
+        # The check result is consumed, the host is due again and gets a new check
+        self.scheduler_loop(1, [[host, 0, 'UP']])
+        assert host in self._scheduler.scheduling_queue
+        self._scheduler.schedule()
+        assert len(host.checks_in_progress) == 1
+        assert self._scheduler.checks[host.checks_in_progress[0]].t_to_go > time.time()
+        assert host not in self._scheduler.scheduling_queue
+
+        # An external command pushes the host again
+        host.checks_in_progress = []
+        host.update_in_checking()
+        excmd = '[%d] DISABLE_HOST_CHECK;test_host_0' % time.time()
+        self._scheduler.run_external_commands([excmd])
+        self.external_command_loop()
+        assert not host.active_checks_enabled
+        assert host.checks_in_progress == []
+        excmd = '[%d] ENABLE_HOST_CHECK;test_host_0' % time.time()
+        self._scheduler.run_external_commands([excmd])
+        assert host in self._scheduler.scheduling_queue
+        self._scheduler.schedule()
+        assert len(host.checks_in_progress) == 1
+
+    def test_scheduler_schedule_check_dependency(self):
+        """ An item that did not get a check because of a check dependency is visited again
+
+        :return: None
+        """
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+        host = self._scheduler.hosts.find_by_name("test_host_0")
+        host.checks_in_progress = []
+        host.act_depend_of = []  # ignore the router
+        host.event_handler_enabled = False
+        svc = self._scheduler.services.find_srv_by_name_and_hostname("test_host_0",
+                                                                     "test_ok_0")
+        svc.checks_in_progress = []
+        svc.act_depend_of = []
+        svc.event_handler_enabled = False
+        # The service is not checked while its host is DOWN
+        svc.chk_depend_of = [(host.uuid, ['d'], 'logic_dep', '', False)]
+
+        self.scheduler_loop(3, [[host, 2, 'DOWN']])
+        assert 'DOWN' == host.state
+        svc.checks_in_progress = []
+        svc.update_in_checking()
+        self._scheduler.schedule([svc])
+        assert svc.checks_in_progress == []
+        # Still in the queue, at its next check time
+        assert svc in self._scheduler.scheduling_queue
+        assert svc.next_chk > time.time()
+
+        # The host recovers, the service gets a check when it is due again
+        self.scheduler_loop(1, [[host, 0, 'UP']])
+        assert 'UP' == host.state
+        assert svc in self._scheduler.scheduling_queue
+        self._scheduler.schedule(self._scheduler.scheduling_queue.pop_due(svc.next_chk))
+        assert len(svc.checks_in_progress) == 1
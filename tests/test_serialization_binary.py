@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the binary format of the serialized data exchanged between the daemons
+"""
+
+import json
+import pytest
+import requests
+from .alignak_test import AlignakTest
+from alignak.check import Check
+from alignak.brok import Brok
+from alignak.external_command import ExternalCommand
+from alignak.http.client import HTTPClient
+from alignak.misc.serialization import (serialize, unserialize, binary_codec_available,
+                                        encode_binary, decode_binary,
+                                        JSON_CONTENT_TYPE, BINARY_CONTENT_TYPE)
+
+
+@pytest.mark.skipif(not binary_codec_available(), reason="The msgpack library is not installed")
+class TestSerializationBinary(AlignakTest):
+    """
+    This class test the binary serialization format
+    """
+    def setUp(self):
+        super(TestSerializationBinary, self).setUp()
+
+    def test_binary_round_trip(self):
+        """ Serialized objects are the same when encoded as json or as binary
+
+        :return: None
+        """
+        check = Check({'command': 'check_me', 'ref': 'host_uuid', 't_to_go': 1.5,
+                       'module_type': 'nrpe'})
+        brok = Brok({'type': 'log', 'data': {'level': 'info', 'message': u'Hello é'}})
+        command = ExternalCommand('[123] DISABLE_HOST_CHECK;test_host_0')
+        data = serialize([check, brok, command], no_json=True)
+
+        payload = encode_binary(data)
+        assert isinstance(payload, bytes)
+        assert len(payload) < len(json.dumps(data))
+        assert decode_binary(payload) == json.loads(json.dumps(data))
+
+        objects = unserialize(decode_binary(payload), no_json=True)
+        assert isinstance(objects[0], Check)
+        assert objects[0].uuid == check.uuid
+        assert objects[0].module_type == 'nrpe'
+        assert objects[0].t_to_go == 1.5
+        assert isinstance(objects[1], Brok)
+        assert objects[1].prepare() == {'level': 'info', 'message': u'Hello é'}
+        assert isinstance(objects[2], ExternalCommand)
+        assert objects[2].cmd_line == command.cmd_line
+
+    def test_binary_objects(self):
+        """ Objects are packed in the binary format without being serialized before
+
+        :return: None
+        """
+        check = Check({'command': 'check_me', 'ref': 'host_uuid', 't_to_go': 1.5,
+                       'module_type': 'nrpe'})
+        brok = Brok({'type': 'log', 'data': {'level': 'info', 'message': u'Hello é'}})
+        command = ExternalCommand('[123] DISABLE_HOST_CHECK;test_host_0')
+
+        payload = encode_binary({'objects': [check, brok, command]})
+        assert len(payload) < len(encode_binary(serialize([check, brok, command])))
+
+        # The known classes objects are restored, the other ones are still serialized
+        data = decode_binary(payload)
+        assert isinstance(data['objects'][0], Check)
+        assert data['objects'][0].uuid == check.uuid
+        assert data['objects'][0].module_type == 'nrpe'
+        assert data['objects'][0].t_to_go == 1.5
+        # The brok data is not json encoded
+        assert isinstance(data['objects'][1], Brok)
+        assert data['objects'][1].uuid == brok.uuid
+        assert data['objects'][1].data == {'level': 'info', 'message': u'Hello é'}
+        assert data['objects'][1].prepare() == {'level': 'info', 'message': u'Hello é'}
+        assert data['objects'][2]['__sys_python_module__'] == \
+            'alignak.external_command.ExternalCommand'
+
+        objects = unserialize(data['objects'], no_json=True)
+        assert isinstance(objects[0], Check)
+        assert isinstance(objects[1], Brok)
+        assert isinstance(objects[2], ExternalCommand)
+        assert objects[2].cmd_line == command.cmd_line
+
+    def test_client_negotiation(self):
+        """ The HTTP client decodes the response according to its content type and
+        sends binary data only to a server that announced it is able to get some
+
+        :return: None
+        """
+        client = HTTPClient(address='localhost', port=7768)
+        assert client.binary is False
+
+        data = {'checks': [1, 2, 3]}
+        rsp = requests.Response()
+        rsp.status_code = 200
+        rsp.headers['Content-Type'] = JSON_CONTENT_TYPE
+        rsp._content = json.dumps(data).encode('utf-8')
+        assert client.get_response_data(rsp) == data
+        assert client.binary is False
+
+        rsp = requests.Response()
+        rsp.status_code = 200
+        rsp.headers['Content-Type'] = BINARY_CONTENT_TYPE
+        rsp.headers['X-Alignak-Codecs'] = BINARY_CONTENT_TYPE
+        rsp._content = encode_binary(data)
+        assert client.get_response_data(rsp) == data
+        assert client.binary is True
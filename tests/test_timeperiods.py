@@ -53,6 +53,7 @@
 import datetime
 from .alignak_test import *
 from alignak.objects.timeperiod import Timeperiod
+from alignak.daterange import get_day
 
 
 class TestTimeperiods(AlignakTest):
@@ -643,3 +644,67 @@ class TestTimeperiods(AlignakTest):
             },
         ]
         self.assertItemsEqual(ref, mydateranges)
+
+    def test_compiled_periods(self):
+        """
+        The compiled valid periods give the same results as the dateranges
+
+        :return: None
+        """
+        timeperiod = Timeperiod({})
+        timeperiod.timeperiod_name = 'T1'
+        for entry in ['monday 08:00-12:00,14:00-18:00', 'tuesday 00:00-24:00',
+                      'wednesday 00:00-24:00', 'thursday 09:30-17:45',
+                      'friday 22:00-24:00', 'saturday 00:00-06:00']:
+            timeperiod.resolve_daterange(timeperiod.dateranges, entry)
+        excluded = Timeperiod({})
+        excluded.timeperiod_name = 'T2'
+        excluded.resolve_daterange(excluded.dateranges, 'wednesday 10:00-11:00')
+        timeperiod.exclude = [excluded]
+
+        def is_valid(timestamp):
+            """Validity according to the dateranges"""
+            if excluded.dateranges[0].is_time_valid(timestamp):
+                return False
+            return any(daterange.is_time_valid(timestamp)
+                       for daterange in timeperiod.dateranges)
+
+        now = int(time.time())
+        start = get_day(now)
+        validity = []
+        for timestamp in range(start, start + 6 * 86400, 60):
+            validity.append((timestamp, is_valid(timestamp)))
+            assert timeperiod.is_time_valid(timestamp) == validity[-1][1]
+        assert timeperiod.compiled_horizon == (start, start + 7 * 86400)
+        assert len(timeperiod.compiled_starts) > 0
+
+        for index in range(0, len(validity) - 1440, 17):
+            timestamp, valid = validity[index]
+            t_next = timeperiod.get_next_valid_time_from_t(timestamp)
+            if valid:
+                assert t_next == timestamp
+            else:
+                assert t_next > timestamp
+                assert timeperiod.is_time_valid(t_next)
+                assert not timeperiod.is_time_valid(t_next - 1)
+                # No valid minute before
+                assert not any(v for (t, v) in validity[index:index + 1440] if t < t_next)
+
+            t_next = timeperiod.get_next_invalid_time_from_t(timestamp)
+            if not valid:
+                assert t_next == timestamp
+            else:
+                assert t_next > timestamp
+                assert not timeperiod.is_time_valid(t_next)
+                assert timeperiod.is_time_valid(t_next - 1)
+
+        # Too far from now, the dateranges are searched
+        horizon = timeperiod.compiled_horizon
+        assert timeperiod.get_compiled_index(now + 30 * 86400) is None
+        assert timeperiod.compiled_horizon == horizon
+        assert timeperiod.is_time_valid(now + 30 * 86400) == is_valid(now + 30 * 86400)
+
+        # Changing the dateranges compiles the periods again
+        timeperiod.dateranges = []
+        assert not timeperiod.is_time_valid(now)
+        assert timeperiod.compiled_starts == []
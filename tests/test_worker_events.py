@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the event driven poller/reactionner workers
+"""
+import os
+import time
+from multiprocessing import Queue
+
+from .alignak_test import AlignakTest
+
+from alignak.action import ACT_STATUS_QUEUED, ACT_STATUS_DONE, ACT_STATUS_TIMEOUT
+from alignak.check import Check
+from alignak.message import Message
+from alignak.worker import Worker
+
+
+class TestWorkerEvents(AlignakTest):
+    """This class tests the event driven workers
+    """
+    def setUp(self):
+        super(TestWorkerEvents, self).setUp()
+
+    @staticmethod
+    def get_check(command, timeout=5):
+        """Get a check to launch"""
+        check = Check({'command': command, 'timeout': timeout, 'module_type': 'fork',
+                       't_to_go': time.time()})
+        check.status = ACT_STATUS_QUEUED
+        check.env = {}
+        return check
+
+    def test_event_driven_worker(self):
+        """ The event driven worker finishes the checks as soon as they exit
+
+        :return: None
+        """
+        libexec = os.path.join(self._test_dir, 'libexec')
+        to_queue = Queue()
+        from_queue = Queue()
+        worker = Worker('fork', to_queue, from_queue, 4, event_driven=True)
+        assert worker.event_driven
+        worker.start()
+        try:
+            checks = [self.get_check('%s/sleep_command.sh 0' % libexec) for _ in range(3)]
+            checks.append(self.get_check('%s/sleep_command.sh 0.5' % libexec))
+            checks.append(self.get_check('%s/sleep_command.sh 10' % libexec, timeout=1))
+            start = time.time()
+            for check in checks:
+                to_queue.put(Message(_type='Do', data=check))
+
+            results = {}
+            durations = {}
+            while len(results) < len(checks):
+                msg = from_queue.get(timeout=5)
+                results[msg.get_data().uuid] = msg.get_data()
+                durations[msg.get_data().uuid] = time.time() - start
+        finally:
+            worker.terminate()
+            worker.join(5)
+
+        for check in checks[:3]:
+            assert results[check.uuid].status == ACT_STATUS_DONE
+            assert results[check.uuid].exit_status == 0
+            assert results[check.uuid].output == 'I start sleeping for 0 seconds...'
+            assert results[check.uuid].long_output == 'I awoke after sleeping 0 seconds'
+            assert durations[check.uuid] < 1.0
+        # Finished when it exits
+        assert results[checks[3].uuid].status == ACT_STATUS_DONE
+        assert 0.5 <= durations[checks[3].uuid] < 1.5
+        # Killed on timeout
+        assert results[checks[4].uuid].status == ACT_STATUS_TIMEOUT
+        assert results[checks[4].uuid].exit_status == 3
+        assert 1 <= durations[checks[4].uuid] < 2
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2018: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+ This file is used to test the satellites workers scaling
+"""
+import time
+from .alignak_test import AlignakTest
+
+from alignak.check import Check
+from alignak.daemons.pollerdaemon import Poller
+
+
+class TestWorkerPool(AlignakTest):
+    """This class tests the satellites workers scaling
+    """
+    def setUp(self):
+        super(TestWorkerPool, self).setUp()
+        self.setup_with_file('cfg/cfg_default.cfg', dispatching=True)
+        assert self.conf_is_correct
+
+        self.poller = Poller(env_file=self.env_filename, daemon_name='poller-master')
+        self.poller.do_post_daemon_init()
+        self.poller.min_workers = 1
+        self.poller.max_workers = 2
+        self.poller.processes_by_worker = 2
+        self.poller.workers_scaler.scaling_delay = 0
+
+    def tearDown(self):
+        self.poller.do_stop_workers()
+        super(TestWorkerPool, self).tearDown()
+
+    @staticmethod
+    def get_check():
+        """Get a check to execute"""
+        return Check({'command': 'echo "Ok"', 'module_type': 'fork'})
+
+    def test_least_loaded(self):
+        """ The actions are assigned to the least loaded worker
+
+        :return: None
+        """
+        poller = self.poller
+        poller.create_and_launch_worker()
+        poller.create_and_launch_worker()
+        first, second = list(poller.workers.values())
+
+        for _ in range(3):
+            first.load.action_assigned(self.get_check())
+        for _ in range(3):
+            worker_id, _ = poller._get_queue_for_the_action(self.get_check())
+            assert worker_id == second.get_id()
+            second.load.action_assigned(self.get_check())
+
+        # The worker latency is the time the action waited before being executed
+        check = self.get_check()
+        check.execution_time = 1.0
+        first.load.action_assigned(check, now=100.0)
+        first.load.action_returned(check, now=106.0)
+        assert first.load.get_load() == 3
+        assert first.load.get_utilisation() == 1.5
+        assert first.load.latency == 1.0
+
+        stats = poller.get_daemon_stats()
+        assert stats['workers'][first.get_id()]['load'] == 3
+        assert stats['workers'][second.get_id()]['load'] == 3
+        assert stats['workers_scaling']['fork']['load'] == 6
+        assert stats['workers_scaling']['fork']['capacity'] == 4
+
+    def test_scaling(self):
+        """ A worker is added when the workers are overloaded and retired when idle
+
+        :return: None
+        """
+        poller = self.poller
+        poller.adjust_worker_number_by_load()
+        assert len(poller.workers) == 1
+        worker = list(poller.workers.values())[0]
+
+        # Overloaded worker
+        checks = [self.get_check() for _ in range(3)]
+        for check in checks:
+            worker.load.action_assigned(check)
+        poller.adjust_worker_number_by_load()
+        assert len(poller.workers) == 2
+        assert poller.workers_scaler.nb_added == 1
+        stats = poller.get_daemon_stats()
+        assert stats['workers_scaling']['fork']['last_decision']['decision'] == 'add'
+
+        # No more workers than max_workers
+        poller.adjust_worker_number_by_load()
+        assert len(poller.workers) == 2
+
+        # The workers are idle, but not for long enough
+        for check in checks:
+            worker.load.action_returned(check)
+        poller.worker_idle_timeout = 60
+        poller.adjust_worker_number_by_load()
+        assert len(poller.workers) == 2
+
+        # Still busy workers are retired when they returned their actions
+        poller.worker_idle_timeout = 0
+        poller.processes_by_worker = 4
+        for retired in poller.workers.values():
+            retired.load.action_assigned(self.get_check())
+        poller.adjust_worker_number_by_load()
+        assert poller.workers_scaler.nb_retired == 1
+        assert len(poller.q_by_mod['fork']) == 1
+        assert len(poller.workers) == 2
+        retired = [w for w in poller.workers.values() if w.load.retiring][0]
+        assert retired.get_id() not in poller.q_by_mod['fork']
+
+        retired.load.in_flight.clear()
+        poller.adjust_worker_number_by_load()
+        assert len(poller.workers) == 1
+        assert retired.get_id() not in poller.workers
+        time.sleep(0.1)
+        assert not retired.is_alive()
+
+        # No less workers than min_workers
+        list(poller.workers.values())[0].load.in_flight.clear()
+        poller.adjust_worker_number_by_load()
+        assert len(poller.workers) == 1